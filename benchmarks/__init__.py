@@ -0,0 +1 @@
+"""Benchmarks for FastJson-DB. Run a module with 'python -m benchmarks.<name>'."""
@@ -0,0 +1,72 @@
+"""Compare the B+Tree index engine against the legacy classic B-Tree.
+
+Usage: python -m benchmarks.btree_bench --rows 1000000 --order 128
+"""
+import argparse
+import random
+import time
+from operator import itemgetter
+from fastjson_db.core.b_tree import BTree, DEFAULT_ORDER
+from benchmarks.legacy_btree import BTree as LegacyBTree
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def build_legacy(pairs):
+    tree = LegacyBTree()
+    for key, value in pairs:
+        tree.insert(key, value)
+    return tree
+
+def build_incremental(pairs, order):
+    tree = BTree(order)
+    for key, value in pairs:
+        tree.insert(key, value)
+    return tree
+
+def build_bulk(pairs, order):
+    groups = {}
+    for key, value in pairs:
+        groups.setdefault(key, []).append(value)
+    return BTree.bulk_load(sorted(groups.items(), key=itemgetter(0)), order=order)
+
+def range_scans(tree, ranges):
+    total = 0
+    for low, high in ranges:
+        total += len(tree.range_search(low, high))
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--order", type=int, default=DEFAULT_ORDER)
+    parser.add_argument("--scans", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    key_space = max(args.rows // 4, 1)
+    pairs = [(rng.randrange(key_space), i) for i in range(args.rows)]
+    width = max(key_space // 100, 1)
+    ranges = [(low, low + width) for low in (rng.randrange(key_space) for _ in range(args.scans))]
+
+    print(f"--- B-Tree benchmark: {args.rows} rows, {key_space} distinct keys, order={args.order} ---")
+    results = {}
+    for name, build in (
+        ("legacy B-Tree (t=3)", lambda: build_legacy(pairs)),
+        ("B+Tree insert", lambda: build_incremental(pairs, args.order)),
+        ("B+Tree bulk_load", lambda: build_bulk(pairs, args.order)),
+    ):
+        build_time, tree = timed(build)
+        scan_time, found = timed(range_scans, tree, ranges)
+        results[name] = (build_time, scan_time, found)
+        print(f"{name:<22} build {build_time:8.3f}s | {args.scans} range scans {scan_time:8.3f}s ({found} rows)")
+
+    legacy_build, legacy_scan, _ = results["legacy B-Tree (t=3)"]
+    bulk_build, bulk_scan, _ = results["B+Tree bulk_load"]
+    print(f"\nbulk_load build speedup: {legacy_build / bulk_build:.1f}x | range scan speedup: {legacy_scan / bulk_scan:.1f}x")
+
+if __name__ == "__main__":
+    main()
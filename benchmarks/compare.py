@@ -0,0 +1,59 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage: python -m benchmarks.compare baseline.json current.json --threshold 0.10
+Exits with status 1 when a benchmark regressed.
+"""
+import argparse
+import sys
+from typing import Any, Dict, List, Tuple
+from benchmarks.harness import format_seconds, load_results
+
+# (benchmark key, baseline median, current median, current / baseline)
+Change = Tuple[str, float, float, float]
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10,
+            metric: str = "median") -> Tuple[List[Change], List[Change]]:
+    """(regressions, improvements) between two result files.
+
+    A benchmark regressed when its 'metric' grew by more than 'threshold' (0.10: 10% slower)
+    and the slowdown is larger than the spread of the baseline samples, so noise is not flagged.
+    Peak memory entries are compared on their peak bytes the same way.
+    """
+    regressions, improvements = [], []
+    old_results, new_results = baseline["results"], current["results"]
+    for key in sorted(old_results.keys() & new_results.keys()):
+        old, new = old_results[key], new_results[key]
+        field = "peak_bytes" if "peak_bytes" in old else metric
+        if not old.get(field) or new.get(field) is None:
+            continue
+        ratio = new[field] / old[field]
+        noise = (old.get("p95", old[field]) - old.get("min", old[field]))
+        change = (key, old[field], new[field], ratio)
+        if ratio > 1 + threshold and new[field] - old[field] > noise:
+            regressions.append(change)
+        elif ratio < 1 - threshold:
+            improvements.append(change)
+    return regressions, improvements
+
+def report(regressions: List[Change], improvements: List[Change]):
+    def value(key, amount):
+        return f"{amount / 2**20:.1f}MiB" if "/memory_" in key else format_seconds(amount)
+    for title, changes in (("Regressions", regressions), ("Improvements", improvements)):
+        print(f"\n{title}: {len(changes)}")
+        for key, old, new, ratio in changes:
+            print(f"  {key:<48} {value(key, old):>12} -> {value(key, new):>12}  ({ratio:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10: 10%%)")
+    parser.add_argument("--metric", default="median", choices=("min", "median", "p95", "mean"))
+    args = parser.parse_args()
+    regressions, improvements = compare(load_results(args.baseline), load_results(args.current),
+                                        args.threshold, args.metric)
+    report(regressions, improvements)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Timing and memory helpers shared by the benchmark suite."""
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+Stats = Dict[str, Any]
+
+def percentile(samples: List[float], p: float) -> float:
+    """p-th percentile (0-100) of sorted samples, linearly interpolated."""
+    if len(samples) == 1:
+        return samples[0]
+    position = (len(samples) - 1) * p / 100
+    low = int(position)
+    high = min(low + 1, len(samples) - 1)
+    return samples[low] + (samples[high] - samples[low]) * (position - low)
+
+def measure(run: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+            warmup: int = 1, repeat: int = 5, ops: int = 1) -> Stats:
+    """Time 'run(setup())' 'warmup' + 'repeat' times and summarize the kept repetitions.
+
+    setup() runs outside the timed region (fresh state per repetition). Each repetition does
+    'ops' operations: the figures are seconds per operation. The GC is collected before and
+    disabled during each repetition, so one of its passes does not land in a single sample.
+    """
+    samples = []
+    for n in range(warmup + repeat):
+        state = setup() if setup is not None else None
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(state)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        if n >= warmup:
+            samples.append(elapsed / ops)
+    samples.sort()
+    median = statistics.median(samples)
+    return {"ops": ops, "repeat": repeat, "min": samples[0], "median": median,
+            "p95": percentile(samples, 95), "p99": percentile(samples, 99), "max": samples[-1],
+            "mean": statistics.fmean(samples), "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "ops_per_sec": 1 / median if median else None}
+
+def peak_memory(run: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None) -> Stats:
+    """Peak and retained bytes allocated by Python during 'run(setup())' (tracemalloc, one run).
+
+    Allocations made by C libraries outside the Python allocator (sqlite pages) are not seen.
+    """
+    state = setup() if setup is not None else None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = run(state)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_bytes": peak, "retained_bytes": current}
+
+def environment() -> Dict[str, Any]:
+    """Machine and interpreter description stored with the results."""
+    return {"python": sys.version.split()[0], "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "machine": platform.machine(), "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+def write_results(path: str, results: Dict[str, Any]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds >= 1 / scale:
+            return f"{seconds * scale:.3f}{unit}"
+    return f"{seconds * 1e9:.0f}ns"
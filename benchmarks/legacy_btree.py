@@ -0,0 +1,204 @@
+"""Classic B-Tree (t=3) used by JsonQuerier before the B+Tree engine, kept as a benchmark reference."""
+from bisect import bisect_left, bisect_right
+from typing import Any, List
+
+class BTreeNode:
+    def __init__(self, t: int, leaf: bool = True):
+        self.t = t                  # grau mínimo
+        self.leaf = leaf            # se é folha
+        self.keys: List[Any] = []   # lista de chaves
+        self.values: List[List[Any]] = []  # cada chave tem lista de objetos
+        self.children: List['BTreeNode'] = []
+
+class BTree:
+    def __init__(self, t: int = 3):
+        self.root = BTreeNode(t)
+        self.t = t
+
+    # ---------------- Inserção ---------------- #
+    def insert(self, key: Any, value: Any):
+        root = self.root
+        if len(root.keys) == (2 * self.t - 1):
+            new_root = BTreeNode(self.t, leaf=False)
+            new_root.children.append(root)
+            self._split_child(new_root, 0)
+            self.root = new_root
+            self._insert_non_full(new_root, key, value)
+        else:
+            self._insert_non_full(root, key, value)
+
+    def _insert_non_full(self, node: BTreeNode, key: Any, value: Any):
+        if node.leaf:
+            pos = bisect_left(node.keys, key)
+            if pos < len(node.keys) and node.keys[pos] == key:
+                node.values[pos].append(value)
+            else:
+                node.keys.insert(pos, key)
+                node.values.insert(pos, [value])
+        else:
+            i = bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                node.values[i].append(value)
+                return
+            if len(node.children[i].keys) == (2 * self.t - 1):
+                self._split_child(node, i)
+                if key == node.keys[i]:
+                    node.values[i].append(value)
+                    return
+                if key > node.keys[i]:
+                    i += 1
+            self._insert_non_full(node.children[i], key, value)
+
+    def _split_child(self, parent: BTreeNode, index: int):
+        t = self.t
+        node = parent.children[index]
+        new_node = BTreeNode(t, leaf=node.leaf)
+        parent.keys.insert(index, node.keys[t - 1])
+        parent.values.insert(index, node.values[t - 1])
+        parent.children.insert(index + 1, new_node)
+
+        new_node.keys = node.keys[t:]
+        new_node.values = node.values[t:]
+        node.keys = node.keys[:t - 1]
+        node.values = node.values[:t - 1]
+
+        if not node.leaf:
+            new_node.children = node.children[t:]
+            node.children = node.children[:t]
+
+    # ---------------- Busca ---------------- #
+    def search(self, key: Any) -> List[Any]:
+        return self._search(self.root, key)
+
+    def _search(self, node: BTreeNode, key: Any) -> List[Any]:
+        i = bisect_left(node.keys, key)
+        if i < len(node.keys) and node.keys[i] == key:
+            return node.values[i]
+        elif node.leaf:
+            return []
+        else:
+            return self._search(node.children[i], key)
+
+    # ---------------- Range Search ---------------- #
+    def range_search(self, start: Any = None, end: Any = None,
+                     include_start: bool = True, include_end: bool = True) -> List[Any]:
+        """Values of every key between 'start' and 'end' in key order. A None bound is unbounded."""
+        result: List[Any] = []
+        self._range_search(self.root, start, end, include_start, include_end, result)
+        return result
+
+    def _range_search(self, node: BTreeNode, start: Any, end: Any,
+                      include_start: bool, include_end: bool, result: List[Any]):
+        keys = node.keys
+        if start is None:
+            i = 0
+        elif include_start:
+            i = bisect_left(keys, start)
+        else:
+            i = bisect_right(keys, start)
+        while i < len(keys) and (end is None or keys[i] < end or (include_end and keys[i] == end)):
+            if not node.leaf:
+                self._range_search(node.children[i], start, end, include_start, include_end, result)
+            result.extend(node.values[i])
+            i += 1
+        if not node.leaf and i < len(node.children):
+            self._range_search(node.children[i], start, end, include_start, include_end, result)
+
+    # ---------------- Remoção ---------------- #
+    def delete(self, key: Any, value: Any = None) -> bool:
+        """Remove 'value' (by identity) from 'key', or the whole key if 'value' is None.
+
+        The key itself leaves the tree once its value list is empty. Returns False if nothing matched.
+        """
+        values = self.search(key)
+        if not values:
+            return False
+        if value is not None:
+            for i, item in enumerate(values):
+                if item is value:
+                    del values[i]
+                    break
+            else:
+                return False
+            if values:
+                return True
+
+        self._delete(self.root, key)
+        if not self.root.keys and not self.root.leaf:
+            self.root = self.root.children[0]
+        return True
+
+    def _delete(self, node: BTreeNode, key: Any):
+        t = self.t
+        i = bisect_left(node.keys, key)
+        if i < len(node.keys) and node.keys[i] == key:
+            if node.leaf:
+                del node.keys[i]
+                del node.values[i]
+                return
+            left, right = node.children[i], node.children[i + 1]
+            if len(left.keys) >= t:
+                pred = left
+                while not pred.leaf:
+                    pred = pred.children[-1]
+                node.keys[i], node.values[i] = pred.keys[-1], pred.values[-1]
+                self._delete(left, node.keys[i])
+            elif len(right.keys) >= t:
+                succ = right
+                while not succ.leaf:
+                    succ = succ.children[0]
+                node.keys[i], node.values[i] = succ.keys[0], succ.values[0]
+                self._delete(right, node.keys[i])
+            else:
+                self._merge(node, i)
+                self._delete(left, key)
+            return
+
+        if node.leaf:
+            return
+        if len(node.children[i].keys) < t:
+            i = self._fill(node, i)
+        self._delete(node.children[i], key)
+
+    def _fill(self, node: BTreeNode, i: int) -> int:
+        """Make sure children[i] has at least t keys before descending into it."""
+        t = self.t
+        if i > 0 and len(node.children[i - 1].keys) >= t:
+            self._borrow_from_prev(node, i)
+        elif i < len(node.children) - 1 and len(node.children[i + 1].keys) >= t:
+            self._borrow_from_next(node, i)
+        elif i < len(node.children) - 1:
+            self._merge(node, i)
+        else:
+            self._merge(node, i - 1)
+            i -= 1
+        return i
+
+    def _borrow_from_prev(self, node: BTreeNode, i: int):
+        child, sibling = node.children[i], node.children[i - 1]
+        child.keys.insert(0, node.keys[i - 1])
+        child.values.insert(0, node.values[i - 1])
+        if not child.leaf:
+            child.children.insert(0, sibling.children.pop())
+        node.keys[i - 1] = sibling.keys.pop()
+        node.values[i - 1] = sibling.values.pop()
+
+    def _borrow_from_next(self, node: BTreeNode, i: int):
+        child, sibling = node.children[i], node.children[i + 1]
+        child.keys.append(node.keys[i])
+        child.values.append(node.values[i])
+        if not child.leaf:
+            child.children.append(sibling.children.pop(0))
+        node.keys[i] = sibling.keys.pop(0)
+        node.values[i] = sibling.values.pop(0)
+
+    def _merge(self, node: BTreeNode, i: int):
+        """Merge children[i + 1] and the separator key into children[i]."""
+        child, sibling = node.children[i], node.children[i + 1]
+        child.keys.append(node.keys.pop(i))
+        child.values.append(node.values.pop(i))
+        child.keys.extend(sibling.keys)
+        child.values.extend(sibling.values)
+        if not child.leaf:
+            child.children.extend(sibling.children)
+        node.children.pop(i + 1)
@@ -0,0 +1,52 @@
+"""Compare resident memory of dict-backed and slotted JsonModel rows.
+
+Usage: python -m benchmarks.model_memory --rows 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from fastjson_db import JsonModel, Field
+
+class DictUser(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    username = Field(field_name="username", type=str)
+    balance = Field(field_name="balance", type=float)
+
+class SlottedUser(JsonModel, slots=True):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    username = Field(field_name="username", type=str)
+    balance = Field(field_name="balance", type=float)
+
+def measure(model, rows):
+    """Hydrate 'rows' into a cache dict and return (bytes held, seconds)."""
+    hydrate = model._trusted_hydrate
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    cache = {row["id"]: hydrate(row) for row in rows}
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+    return current, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # Shared values so only the row objects (and the cache dict) are measured
+    username, balance = "User", 12.5
+    rows = [{"id": i, "username": username, "balance": balance} for i in range(args.rows)]
+
+    print(f"--- Model memory benchmark: {args.rows} rows ---")
+    results = {}
+    for model in (DictUser, SlottedUser):
+        size, elapsed = measure(model, rows)
+        results[model.__name__] = size
+        print(f"{model.__name__:<12} {size / 2**20:9.1f} MiB ({size / args.rows:6.1f} B/row) hydrated in {elapsed:.3f}s")
+    print(f"\nslots=True saves {1 - results['SlottedUser'] / results['DictUser']:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""sqlite3 reference for the benchmark suite: same rows, same columns, same cases.
+
+The table mirrors the benchmark model (id primary key, username, balance, level) in a file
+database in WAL mode. Secondary indexes on username, balance and level match the B-Trees a
+JsonQuerier builds. Rows come back as tuples, where FastJson-DB returns model objects.
+"""
+import os
+import sqlite3
+from typing import Any, Dict, List
+from benchmarks.harness import Stats, measure
+
+COLUMNS = ("id", "username", "balance", "level")
+INDEXES = {"username": "users_username", "balance": "users_balance", "level": "users_level"}
+
+def connect(path: str, synchronous: str = "NORMAL") -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None)  # Autocommit: explicit BEGIN / COMMIT only
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    return conn
+
+def create(path: str) -> sqlite3.Connection:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    conn = connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, balance REAL, level INTEGER)")
+    return conn
+
+def insert_all(conn: sqlite3.Connection, rows: List[Dict[str, Any]]):
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?)",
+                     ([row[c] for c in COLUMNS] for row in rows))
+    conn.execute("COMMIT")
+
+def create_indexes(conn: sqlite3.Connection):
+    for column, name in INDEXES.items():
+        conn.execute(f"CREATE INDEX {name} ON users ({column})")
+
+def drop_indexes(conn: sqlite3.Connection):
+    for name in INDEXES.values():
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+def run(rows: List[Dict[str, Any]], workdir: str, workload: Dict[str, Any], warmup: int, repeat: int) -> Dict[str, Stats]:
+    """Run every case on 'rows' and return {case: stats}. 'workload' holds the query arguments."""
+    n = len(rows)
+    path = os.path.join(workdir, "users.sqlite")
+    results: Dict[str, Stats] = {}
+
+    results["bulk_insert"] = measure(lambda conn: (insert_all(conn, rows), conn.close()),
+                                     setup=lambda: create(path), warmup=warmup, repeat=repeat, ops=n)
+
+    def load(_):
+        conn = connect(path)
+        loaded = conn.execute("SELECT * FROM users").fetchall()
+        conn.close()
+        return loaded
+    results["cold_load"] = measure(load, warmup=warmup, repeat=repeat)
+
+    conn = connect(path)
+    results["index_build"] = measure(lambda _: create_indexes(conn), setup=lambda: drop_indexes(conn),
+                                     warmup=warmup, repeat=repeat)
+
+    def queries(sql, params):
+        def run_queries(_):
+            execute = conn.execute
+            for p in params:
+                execute(sql, p).fetchall()
+        return run_queries
+    ids, names = workload["ids"], workload["usernames"]
+    cases = {
+        "eq_hash": ("SELECT * FROM users WHERE id = ?", [(i,) for i in ids]),
+        "eq_btree": ("SELECT * FROM users WHERE username = ?", [(u,) for u in names]),
+        "eq_unindexed": ("SELECT * FROM users NOT INDEXED WHERE username = ?", [(u,) for u in workload["scans"]]),
+        "range": ("SELECT * FROM users WHERE balance BETWEEN ? AND ?", workload["ranges"]),
+        "topk": ("SELECT * FROM users WHERE level = ? ORDER BY balance DESC LIMIT 10", [(lv,) for lv in workload["levels"]]),
+    }
+    for case, (sql, params) in cases.items():
+        results[case] = measure(queries(sql, params), warmup=warmup, repeat=repeat, ops=len(params))
+
+    def flush(_):
+        conn.execute("BEGIN")
+        conn.executemany("UPDATE users SET balance = ? WHERE id = ?",
+                         ((rows[i]["balance"], i) for i in workload["dirty"]))
+        conn.execute("COMMIT")
+    results["flush"] = measure(flush, warmup=warmup, repeat=repeat, ops=len(workload["dirty"]))
+    conn.close()
+
+    durable_rows = workload["durable_rows"]
+    def durable_inserts(conn):
+        for row in durable_rows:
+            conn.execute("INSERT INTO users VALUES (?, ?, ?, ?)", [row[c] for c in COLUMNS])
+        conn.close()
+    def durable_setup():
+        create(path).close()
+        return connect(path, synchronous="FULL")  # Each autocommit insert is fsynced, like sync_every=1
+    results["wal_insert"] = measure(durable_inserts, setup=durable_setup, warmup=warmup, repeat=repeat,
+                                    ops=len(durable_rows))
+    return results
@@ -0,0 +1,191 @@
+"""Reproducible FastJson-DB benchmark suite, with a like-for-like sqlite3 reference.
+
+Usage: python -m benchmarks.suite --sizes 10000 100000 1000000 --out results.json
+       python -m benchmarks.suite --sizes 10000 --baseline results.json   # Flag regressions
+
+Every case runs 'warmup' untimed and 'repeat' timed repetitions on seeded data in a temporary
+folder (nothing is left behind). Figures are seconds per operation: a row for inserts, hydration
+and flushes, a call for queries, the whole table for loads and index builds.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from typing import Any, Dict, List
+import orjson
+from fastjson_db import JsonModel, Field, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+from benchmarks import sqlite_reference
+from benchmarks.compare import compare, report
+from benchmarks.harness import Stats, environment, format_seconds, load_results, measure, peak_memory, write_results
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = 1000        # Point lookups per repetition
+SCANS = 10            # Full-scan queries per repetition
+DURABLE_ROWS = 1000   # Rows inserted one fsync at a time by wal_insert
+DIRTY_FRACTION = 0.01 # Rows changed before each flush
+
+class User(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    username = Field(field_name="username", type=str)
+    balance = Field(field_name="balance", type=float)
+    level = Field(field_name="level", type=int)
+
+# ------------------ Data ------------------ #
+def make_rows(n: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{"id": i, "username": f"user{i}", "balance": rng.randrange(10_000_000) / 100, "level": rng.randrange(10)}
+            for i in range(n)]
+
+def make_workload(rows: List[Dict[str, Any]], seed: int) -> Dict[str, Any]:
+    """Query arguments shared by both engines, so they answer the same questions."""
+    rng = random.Random(seed + 1)
+    n = len(rows)
+    width = 100_000 / 1000  # ~0.1% of the balance range per range query
+    lows = [rng.randrange(10_000_000) / 100 for _ in range(100)]
+    return {
+        "ids": [rng.randrange(n) for _ in range(QUERIES)],
+        "usernames": [f"user{rng.randrange(n)}" for _ in range(QUERIES)],
+        "scans": [f"user{rng.randrange(n)}" for _ in range(SCANS)],
+        "ranges": [(low, low + width) for low in lows],
+        "levels": [rng.randrange(10) for _ in range(100)],
+        "dirty": rng.sample(range(n), max(1, int(n * DIRTY_FRACTION))),
+        "durable_rows": [{"id": n + i, "username": f"new{i}", "balance": 1.0, "level": 0} for i in range(DURABLE_ROWS)],
+    }
+
+def remove_table_files(path: str):
+    folder, name = os.path.split(path)
+    for entry in os.listdir(folder):
+        if entry.startswith(name):
+            os.remove(os.path.join(folder, entry))
+
+# ------------------ FastJson-DB ------------------ #
+def measure_hydration(path: str, warmup: int, repeat: int, n: int) -> Dict[str, Stats]:
+    """Build model instances from the parsed rows of a table file, trusted and validated."""
+    with open(path, "rb") as f:
+        parsed = orjson.loads(f.read())  # Freed on return, before the index benchmarks
+    hydrate = User._trusted_hydrate
+    return {
+        "hydrate_trusted": measure(lambda _: {row["id"]: hydrate(row) for row in parsed},
+                                   warmup=warmup, repeat=repeat, ops=n),
+        "hydrate_validated": measure(lambda _: {row["id"]: User(**row) for row in parsed},
+                                     warmup=warmup, repeat=repeat, ops=n),
+    }
+
+def run_fastjson(rows: List[Dict[str, Any]], workdir: str, workload: Dict[str, Any], warmup: int, repeat: int) -> Dict[str, Stats]:
+    n = len(rows)
+    path = os.path.join(workdir, "users.json")
+    results: Dict[str, Stats] = {}
+
+    def new_table():
+        remove_table_files(path)
+        return JsonTable(User, path)
+    def bulk_insert(table):
+        for row in rows:
+            table.insert(User(**row))
+        table.checkpoint()
+    results["bulk_insert"] = measure(bulk_insert, setup=new_table, warmup=warmup, repeat=repeat, ops=n)
+
+    def load(_):
+        table = JsonTable(User, path)  # Written by checkpoint(): trusted through its crc32 sidecar
+        table._load_cache()
+        return table
+    results["cold_load"] = measure(load, warmup=warmup, repeat=repeat)
+    results["memory_load"] = peak_memory(load)
+
+    results.update(measure_hydration(path, warmup, repeat, n))
+
+    table = load(None)
+    def build(_):
+        querier = JsonQuerier(table)
+        querier._load_cache()
+        return querier
+    results["index_build"] = measure(build, warmup=warmup, repeat=repeat)
+    results["memory_indices"] = peak_memory(build)
+
+    querier = build(None)
+    scan_querier = JsonQuerier(table)  # Indices never built: every query is a compiled full scan
+    def queries(call, params):
+        def run_queries(_):
+            for p in params:
+                call(p)
+        return run_queries
+    cases = {
+        "eq_hash": (lambda i: querier.get(id=i), workload["ids"]),
+        "eq_btree": (lambda u: querier.get(username=u), workload["usernames"]),
+        "eq_unindexed": (lambda u: scan_querier.get(username=u), workload["scans"]),
+        "range": (lambda r: querier.get(balance__between=r), workload["ranges"]),
+        "topk": (lambda lv: querier.filter(level=lv).order_by("balance", desc=True).limit(10).get(), workload["levels"]),
+    }
+    for case, (call, params) in cases.items():
+        results[case] = measure(queries(call, params), warmup=warmup, repeat=repeat, ops=len(params))
+
+    table.compact_after = 0  # No background compaction landing in later samples
+    def dirty():
+        for i in workload["dirty"]:
+            table.update(i, User(**rows[i]))
+    results["flush"] = measure(lambda _: table.flush(), setup=dirty, warmup=warmup, repeat=repeat,
+                               ops=len(workload["dirty"]))
+    table.close()
+
+    wal_path = os.path.join(workdir, "durable.json")
+    def durable_table():
+        remove_table_files(wal_path)
+        return JsonTable(User, wal_path, wal=True, sync_every=1)
+    def durable_inserts(table):
+        for row in workload["durable_rows"]:
+            table.insert(User(**row))
+        table.close()
+    results["wal_insert"] = measure(durable_inserts, setup=durable_table, warmup=warmup, repeat=repeat,
+                                    ops=len(workload["durable_rows"]))
+    return results
+
+# ------------------ Runner ------------------ #
+def print_results(key: str, stats: Stats):
+    if "peak_bytes" in stats:
+        print(f"  {key:<40} peak {stats['peak_bytes'] / 2**20:9.1f}MiB  retained {stats['retained_bytes'] / 2**20:9.1f}MiB")
+    else:
+        print(f"  {key:<40} median {format_seconds(stats['median']):>10}  p95 {format_seconds(stats['p95']):>10}"
+              f"  min {format_seconds(stats['min']):>10}  ({stats['ops']} ops x {stats['repeat']})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-sqlite", action="store_true", help="Skip the sqlite3 reference")
+    parser.add_argument("--out", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Saved results to compare against (exit status 1 on regressions)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10: 10%%)")
+    args = parser.parse_args()
+    if args.repeat < 1 or args.warmup < 0:
+        parser.error("--repeat must be >= 1 and --warmup >= 0")
+
+    engines = [("fastjson", run_fastjson)]
+    if not args.no_sqlite:
+        engines.append(("sqlite", sqlite_reference.run))
+    results: Dict[str, Any] = {"environment": environment(), "results": {},
+                               "settings": {"warmup": args.warmup, "repeat": args.repeat, "seed": args.seed}}
+    for n in args.sizes:
+        rows = make_rows(n, args.seed)
+        workload = make_workload(rows, args.seed)
+        print(f"\n--- {n} rows ---")
+        for engine, run in engines:
+            with tempfile.TemporaryDirectory(prefix="fastjson-bench-") as workdir:
+                for case, stats in run(rows, workdir, workload, args.warmup, args.repeat).items():
+                    key = f"{engine}/{case}/{n}"
+                    results["results"][key] = stats
+                    print_results(key, stats)
+
+    if args.out:
+        write_results(args.out, results)
+        print(f"\nResults written to {args.out}")
+    if args.baseline:
+        regressions, improvements = compare(load_results(args.baseline), results, args.threshold)
+        report(regressions, improvements)
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,3 @@
 from .types import Field
-from .core import JsonModel, JsonTable
-__all__ = ["Field", "JsonModel", "JsonTable"]
\ No newline at end of file
+from .core import JsonModel, JsonTable, ColumnarTable, MmapTable, AsyncJsonTable, PartitionedTable
+__all__ = ["Field", "JsonModel", "JsonTable", "ColumnarTable", "MmapTable", "AsyncJsonTable", "PartitionedTable"]
@@ -0,0 +1,56 @@
+import asyncio
+import os
+from concurrent.futures import Executor
+from typing import Dict, Optional
+from fastjson_db.core import AsyncJsonTable, JsonTable
+from fastjson_db.json_app import JsonApp
+from fastjson_db.errors import OperationError
+
+class AsyncJsonApp(JsonApp):
+    """JsonApp for asyncio services: tables load, flush and checkpoint concurrently, off the loop."""
+
+    def __init__(self, executor: Optional[Executor] = None, data_dir: Optional[str | os.PathLike] = None,
+                 workers: Optional[int] = None):
+        self.executor = executor  # Shared by the tables registered as plain JsonTables
+        self._ASYNC_TABLES: Dict[type, AsyncJsonTable] = {}  # JsonModel -> AsyncJsonTable
+        super().__init__(data_dir, workers)
+
+    def registerTable(self, table: JsonTable | AsyncJsonTable) -> AsyncJsonTable:
+        """Add a table (wrapped in an AsyncJsonTable if needed) to the registry and return the wrapper."""
+        if not isinstance(table, AsyncJsonTable):
+            if not isinstance(table, JsonTable):
+                raise OperationError("Register Error", "'table' must be a JsonTable or an AsyncJsonTable")
+            table = AsyncJsonTable(table, self.executor)
+        super().registerTable(table.table)
+        self._ASYNC_TABLES[table.model] = table
+        return table
+
+    async def loadDatabase(self, pause_gc: bool = True, freeze_gc: bool = False):
+        """Check the data folder, then load every table (see AsyncJsonTable.load) and build the
+        registered queriers' indices, all at once in the executor."""
+        self._discoverTables()
+        tables = list(self._ASYNC_TABLES.values())
+        pool = self._parserPool([table.table for table in tables])
+        try:
+            await asyncio.gather(*(
+                table.load(*[q for q in self._QUERIERS if q.table is table.table], pause_gc=pause_gc,
+                           freeze_gc=freeze_gc, pool=pool)
+                for table in tables))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    async def flushDatabase(self) -> int:
+        """Flush every registered table concurrently, returns rows written."""
+        return sum(await asyncio.gather(*(table.flush() for table in self._ASYNC_TABLES.values())))
+
+    async def pollDatabase(self) -> int:
+        """Apply the changes other processes made to the shared tables, returns changes applied."""
+        return sum(await asyncio.gather(*(table.poll() for table in self._ASYNC_TABLES.values() if table.table.shared)))
+
+    async def checkpointDatabase(self):
+        await asyncio.gather(*(table.checkpoint() for table in self._ASYNC_TABLES.values()))
+
+    async def closeDatabase(self):
+        """Wait for pending flushes, then close every table."""
+        await asyncio.gather(*(table.close() for table in self._ASYNC_TABLES.values()))
@@ -1,4 +1,8 @@
 from .json_model import JsonModel
 from .json_table import JsonTable
+from .columnar_table import ColumnarTable
+from .mmap_table import MmapTable
+from .async_table import AsyncJsonTable
+from .partitioned_table import PartitionedTable
 
-__all__ = ["JsonModel", "JsonTable"]
\ No newline at end of file
+__all__ = ["JsonModel", "JsonTable", "ColumnarTable", "MmapTable", "AsyncJsonTable", "PartitionedTable"]
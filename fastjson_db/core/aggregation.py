@@ -0,0 +1,76 @@
+from typing import Any, Iterable, Tuple
+from fastjson_db.errors import OperationError
+
+AGGREGATES = ("sum", "avg", "min", "max", "count", "distinct")
+ALL_ROWS = "*"  # count="*" counts rows instead of non-null values
+
+Spec = Tuple[str, str]  # (function, field name)
+
+def result_name(func: str, field_name: str) -> str:
+    """Key of one aggregate in the result dict: 'balance__sum', or 'count' for count='*'."""
+    return "count" if field_name == ALL_ROWS else f"{field_name}__{func}"
+
+class Accumulator:
+    """Running aggregates of one field, fed one value at a time (None values are skipped)."""
+    __slots__ = ("count", "total", "low", "high", "seen", "_sums", "_orders")
+
+    def __init__(self, funcs: Iterable[str]):
+        funcs = set(funcs)
+        self.count = 0
+        self.total = 0
+        self.low = self.high = None
+        self.seen = set() if "distinct" in funcs else None
+        self._sums = "sum" in funcs or "avg" in funcs
+        self._orders = "min" in funcs or "max" in funcs
+
+    def add(self, value: Any):
+        if value is None:
+            return
+        self.count += 1
+        if self._sums:
+            self.total += value
+        if self._orders:
+            if self.low is None or value < self.low:
+                self.low = value
+            if self.high is None or value > self.high:
+                self.high = value
+        if self.seen is not None:
+            self.seen.add(value)
+
+    def result(self, func: str) -> Any:
+        if func == "sum":
+            return self.total
+        if func == "avg":
+            return self.total / self.count if self.count else None
+        if func == "min":
+            return self.low
+        if func == "max":
+            return self.high
+        if func == "count":
+            return self.count
+        return len(self.seen)
+
+def key_stats(func: str, pairs: Iterable[Tuple[Any, int]]) -> Any:
+    """sum / avg / count / distinct from the (key, row count) pairs of an index: rows are never read."""
+    keys = count = total = 0
+    for key, n in pairs:
+        keys += 1
+        count += n
+        if func in ("sum", "avg"):
+            total += key * n
+    if func == "distinct":
+        return keys
+    if func == "count":
+        return count
+    if func == "sum":
+        return total
+    return total / count if count else None
+
+def check_aggregate(func: str, field_name: str, fields: Iterable[str]):
+    if func not in AGGREGATES:
+        raise OperationError("Aggregate Error", f"Unknown aggregate '{func}' (expected one of {AGGREGATES})")
+    if field_name == ALL_ROWS:
+        if func != "count":
+            raise OperationError("Aggregate Error", f"'{ALL_ROWS}' is only valid for 'count'")
+    elif field_name not in fields:
+        raise OperationError("Aggregate Error", f"Field '{field_name}' does not exist in model")
@@ -0,0 +1,155 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+from fastjson_db.core.json_model import JsonModel
+from fastjson_db.core.json_table import JsonTable
+from fastjson_db.errors import HeritageError, OperationError
+from .gc_pause import paused_gc
+
+class AsyncJsonTable:
+    """asyncio front of a JsonTable: file I/O and parsing run in an executor, off the event loop.
+
+    load(), flush() and checkpoint() run in 'executor' (the loop's default thread pool when None).
+    Writes change the cache on the loop and then await the WAL fsync, which concurrent writers
+    share (group commit). Concurrent flush() calls are coalesced into as few flushes as possible.
+    The table must be created with thread_safe=True, as the executor thread and the loop share it,
+    and with sync_every=0 when it has a WAL, so no append fsyncs on the loop.
+    """
+
+    def __init__(self, table: JsonTable, executor: Optional[Executor] = None):
+        if not isinstance(table, JsonTable):
+            raise HeritageError("AsyncJsonTable Creation Error", "'table' must be a JsonTable")
+        if not table.thread_safe:
+            raise OperationError("AsyncJsonTable Creation Error", "'table' must be created with 'thread_safe=True'")
+        if table.journal is not None and table.journal.wal.sync_every:
+            # Writes run on the loop: an append that fsyncs would block it
+            raise OperationError("AsyncJsonTable Creation Error", "WAL tables must be created with 'sync_every=0', "
+                                                                   "commit() fsyncs in the executor")
+        self.table = table
+        self.executor = executor
+        self._sync: Optional[asyncio.Future] = None          # WAL fsync in flight
+        self._flushing: Optional[asyncio.Future] = None      # Flush running in the executor
+        self._flush_queued: Optional[asyncio.Future] = None  # Flush waiting for it, shared by new callers
+        self._exclusive = 0  # Executor calls holding the table write lock (load, flush, checkpoint)
+
+    @property
+    def model(self) -> type[JsonModel]:
+        return self.table.model
+
+    async def offload(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking call in the executor (e.g. JsonQuerier._load_cache)."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _offload_exclusive(self, func: Callable[[], Any]) -> Any:
+        self._exclusive += 1
+        try:
+            return await self.offload(func)
+        finally:
+            self._exclusive -= 1
+
+    # ------------------ Load / Save ------------------ #
+    async def load(self, *queriers: Any, pause_gc: bool = True, freeze_gc: bool = False,
+                   pool: Optional[Executor] = None):
+        """Load the table (snapshot, segments and WAL), then build the given queriers' indices,
+        without blocking the loop. A process 'pool' parses a large snapshot (see JsonTable._load_cache).
+
+        With pause_gc=True the cyclic GC is paused meanwhile: its full passes over the new objects
+        hold the GIL for ~100 ms each and stall the loop. freeze_gc=True then freezes the loaded
+        objects (gc.freeze) so later collections skip them (see paused_gc: they are never collected).
+        """
+        def load():
+            self.table._load_cache(pool)
+            for querier in queriers:
+                querier._load_cache()
+
+        def paused_load():
+            with paused_gc(freeze_gc):
+                load()
+        await self._offload_exclusive(paused_load if pause_gc else load)
+
+    async def flush(self) -> int:
+        """Flush the changed rows in the executor. Returns the number of rows written.
+
+        A call made while a flush runs joins the single flush queued behind it, so a burst of
+        requests costs at most two flushes.
+        """
+        if self._flush_queued is None:
+            self._flush_queued = asyncio.ensure_future(self._queued_flush(self._flushing))
+        return await asyncio.shield(self._flush_queued)
+
+    async def _queued_flush(self, previous: Optional[asyncio.Future]) -> int:
+        if previous is not None:
+            try:
+                await previous
+            except Exception:
+                pass  # Reported to the callers of that flush
+        self._flushing, self._flush_queued = self._flush_queued, None
+        try:
+            return await self._offload_exclusive(self.table.flush)
+        finally:
+            if self._flushing is asyncio.current_task():
+                self._flushing = None
+
+    async def checkpoint(self):
+        """Rewrite the base table file in the executor."""
+        await self._offload_exclusive(self.table.checkpoint)
+
+    async def poll(self) -> int:
+        """Apply the changes other processes made to a shared table (see JsonTable.poll), in the
+        executor. Returns the number of changes applied."""
+        table = self.table
+        if table.shared and table.feed.seq is not None and not table.feed.changed():
+            return 0  # Nothing new: no executor round trip
+        return await self._offload_exclusive(table.poll)
+
+    async def close(self):
+        """Wait for pending flushes, then close the table in the executor."""
+        for pending in (self._flush_queued, self._flushing):
+            if pending is not None:
+                await asyncio.gather(pending, return_exceptions=True)
+        await self.offload(self.table.close)
+
+    # ------------------ Writes ------------------ #
+    async def commit(self):
+        """Wait until every WAL record written so far is on disk.
+
+        One fsync runs at a time in the executor; writers arriving meanwhile wait for the next one
+        together. Returns at once on tables without a WAL.
+        """
+        if self.table.journal is None:
+            return
+        wal = self.table.journal.wal
+        seq = wal.seq
+        while wal.synced_seq < seq:
+            if self._sync is None:
+                self._sync = asyncio.ensure_future(self.offload(wal.sync))
+                self._sync.add_done_callback(self._sync_done)
+            await asyncio.shield(self._sync)
+
+    def _sync_done(self, future: asyncio.Future):
+        if self._sync is future:
+            self._sync = None
+
+    async def _write(self, method: Callable[..., Any], *args: Any, durable: bool):
+        if self._exclusive:
+            # The executor holds the write lock: wait for it there, not on the loop
+            await self.offload(method, *args)
+        else:
+            method(*args)
+        if durable:
+            await self.commit()
+
+    async def insert(self, model_instance: JsonModel, durable: bool = True):
+        """Insert a row; with durable=True, return once its WAL record is synced."""
+        await self._write(self.table.insert, model_instance, durable=durable)
+
+    async def update(self, query_id: Any, new_data: JsonModel, durable: bool = True):
+        await self._write(self.table.update, query_id, new_data, durable=durable)
+
+    async def remove(self, query_id: Any, durable: bool = True):
+        await self._write(self.table.remove, query_id, durable=durable)
+
+    # ------------------ Reads ------------------ #
+    def get(self, query_id: Any) -> JsonModel:
+        """In-memory lookup: does not block, so it is not a coroutine."""
+        return self.table.get(query_id)
@@ -1,94 +1,324 @@
-from bisect import bisect_left
-from typing import Any, List, Optional
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
-class BTreeNode:
-    def __init__(self, t: int, leaf: bool = True):
-        self.t = t                  # grau mínimo
-        self.leaf = leaf            # se é folha
-        self.keys: List[Any] = []   # lista de chaves
-        self.values: List[List[Any]] = []  # cada chave tem lista de objetos
-        self.children: List['BTreeNode'] = []
+DEFAULT_ORDER = 128  # Wide nodes amortize Python's per-object overhead (64-256 works well)
+
+class BTreeLeaf:
+    """Leaf node: holds the keys, their value lists and links to its neighbours."""
+    __slots__ = ("keys", "values", "next", "prev")
+
+    def __init__(self):
+        self.keys: List[Any] = []           # lista de chaves
+        self.values: List[List[Any]] = []   # cada chave tem lista de objetos
+        self.next: Optional['BTreeLeaf'] = None
+        self.prev: Optional['BTreeLeaf'] = None
+
+class BTreeInternal:
+    """Internal node: keys[i] is the smallest key reachable through children[i + 1]."""
+    __slots__ = ("keys", "children")
+
+    def __init__(self):
+        self.keys: List[Any] = []
+        self.children: List[Any] = []
 
 class BTree:
-    def __init__(self, t: int = 3):
-        self.root = BTreeNode(t)
-        self.t = t
+    """B+Tree index: values live in linked leaves, internal nodes only route."""
+
+    def __init__(self, order: int = DEFAULT_ORDER):
+        if order < 4:
+            raise ValueError("B+Tree order must be >= 4")
+        self.order = order              # max keys per node
+        self.min_keys = order // 2      # min keys per non-root node
+        self.root: Any = BTreeLeaf()
+        self._len = 0                   # number of distinct keys
+
+    def __len__(self) -> int:
+        return self._len
+
+    # ---------------- Bulk Load ---------------- #
+    @classmethod
+    def bulk_load(cls, items: Iterable[Tuple[Any, List[Any]]], order: int = DEFAULT_ORDER) -> 'BTree':
+        """Build a tree bottom-up in O(n) from (key, values) pairs sorted by unique key."""
+        tree = cls(order)
+        keys: List[Any] = []
+        values: List[List[Any]] = []
+        for key, vals in items:
+            keys.append(key)
+            values.append(vals)
+        if not keys:
+            return tree
+        tree._len = len(keys)
+
+        # Leaves, packed full with the remainder spread so none underflows
+        leaves: List[BTreeLeaf] = []
+        for start, end in tree._chunks(len(keys), order):
+            leaf = BTreeLeaf()
+            leaf.keys = keys[start:end]
+            leaf.values = values[start:end]
+            if leaves:
+                leaves[-1].next = leaf
+                leaf.prev = leaves[-1]
+            leaves.append(leaf)
+
+        # Internal levels, each holding up to order + 1 children
+        level: List[Any] = leaves
+        low_keys: List[Any] = [leaf.keys[0] for leaf in leaves]
+        while len(level) > 1:
+            parents, parent_low_keys = [], []
+            for start, end in tree._chunks(len(level), order + 1):
+                node = BTreeInternal()
+                node.children = level[start:end]
+                node.keys = low_keys[start + 1:end]
+                parents.append(node)
+                parent_low_keys.append(low_keys[start])
+            level, low_keys = parents, parent_low_keys
+        tree.root = level[0]
+        return tree
+
+    def _chunks(self, n: int, size: int) -> List[Tuple[int, int]]:
+        """Split n entries into ceil(n / size) near-equal slices of at most 'size'."""
+        count = -(-n // size)
+        base, extra = divmod(n, count)
+        bounds, start = [], 0
+        for i in range(count):
+            end = start + base + (1 if i < extra else 0)
+            bounds.append((start, end))
+            start = end
+        return bounds
+
+    # ---------------- Descent ---------------- #
+    def _find_leaf(self, key: Any) -> BTreeLeaf:
+        node = self.root
+        while type(node) is BTreeInternal:
+            node = node.children[bisect_right(node.keys, key)]
+        return node
+
+    def _find_path(self, key: Any) -> Tuple[BTreeLeaf, List[Tuple[BTreeInternal, int]]]:
+        """Leaf for 'key' plus the (parent, child index) pairs that lead to it."""
+        node, path = self.root, []
+        while type(node) is BTreeInternal:
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        return node, path
+
+    def _first_leaf(self) -> BTreeLeaf:
+        node = self.root
+        while type(node) is BTreeInternal:
+            node = node.children[0]
+        return node
+
+    def _last_leaf(self) -> BTreeLeaf:
+        node = self.root
+        while type(node) is BTreeInternal:
+            node = node.children[-1]
+        return node
 
     # ---------------- Inserção ---------------- #
     def insert(self, key: Any, value: Any):
-        root = self.root
-        if len(root.keys) == (2 * self.t - 1):
-            new_root = BTreeNode(self.t, leaf=False)
-            new_root.children.append(root)
-            self._split_child(new_root, 0)
-            self.root = new_root
-            self._insert_non_full(new_root, key, value)
-        else:
-            self._insert_non_full(root, key, value)
-
-    def _insert_non_full(self, node: BTreeNode, key: Any, value: Any):
-        i = len(node.keys) - 1
-        if node.leaf:
-            pos = bisect_left(node.keys, key)
-            if pos < len(node.keys) and node.keys[pos] == key:
-                node.values[pos].append(value)
-            else:
-                node.keys.insert(pos, key)
-                node.values.insert(pos, [value])
-        else:
-            while i >= 0 and key < node.keys[i]:
-                i -= 1
-            i += 1
-            if len(node.children[i].keys) == (2 * self.t - 1):
-                self._split_child(node, i)
-                if key > node.keys[i]:
-                    i += 1
-            self._insert_non_full(node.children[i], key, value)
-
-    def _split_child(self, parent: BTreeNode, index: int):
-        t = self.t
-        node = parent.children[index]
-        new_node = BTreeNode(t, leaf=node.leaf)
-        parent.keys.insert(index, node.keys[t - 1])
-        parent.values.insert(index, node.values[t - 1])
-        parent.children.insert(index + 1, new_node)
-
-        new_node.keys = node.keys[t:]
-        new_node.values = node.values[t:]
-        node.keys = node.keys[:t - 1]
-        node.values = node.values[:t - 1]
-
-        if not node.leaf:
-            new_node.children = node.children[t:]
-            node.children = node.children[:t]
+        leaf, path = self._find_path(key)
+        pos = bisect_left(leaf.keys, key)
+        if pos < len(leaf.keys) and leaf.keys[pos] == key:
+            leaf.values[pos].append(value)
+            return
+        leaf.keys.insert(pos, key)
+        leaf.values.insert(pos, [value])
+        self._len += 1
+        if len(leaf.keys) > self.order:
+            self._split(leaf, path)
+
+    def _split(self, leaf: BTreeLeaf, path: List[Tuple[BTreeInternal, int]]):
+        mid = len(leaf.keys) // 2
+        right = BTreeLeaf()
+        right.keys, leaf.keys = leaf.keys[mid:], leaf.keys[:mid]
+        right.values, leaf.values = leaf.values[mid:], leaf.values[:mid]
+        right.next, right.prev = leaf.next, leaf
+        if leaf.next is not None:
+            leaf.next.prev = right
+        leaf.next = right
+
+        separator, new_node = right.keys[0], right
+        while path:
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, new_node)
+            if len(parent.keys) <= self.order:
+                return
+            mid = len(parent.keys) // 2
+            sibling = BTreeInternal()
+            separator = parent.keys[mid]
+            sibling.keys, parent.keys = parent.keys[mid + 1:], parent.keys[:mid]
+            sibling.children, parent.children = parent.children[mid + 1:], parent.children[:mid + 1]
+            new_node = sibling
+
+        root = BTreeInternal()
+        root.keys = [separator]
+        root.children = [self.root, new_node]
+        self.root = root
 
     # ---------------- Busca ---------------- #
     def search(self, key: Any) -> List[Any]:
-        return self._search(self.root, key)
-
-    def _search(self, node: BTreeNode, key: Any) -> List[Any]:
-        i = bisect_left(node.keys, key)
-        if i < len(node.keys) and node.keys[i] == key:
-            return node.values[i]
-        elif node.leaf:
-            return []
+        leaf = self._find_leaf(key)
+        i = bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            return leaf.values[i]
+        return []
+
+    def min_key(self) -> Any:
+        """Smallest key, or None if the tree is empty."""
+        leaf = self._first_leaf()
+        return leaf.keys[0] if leaf.keys else None
+
+    def max_key(self) -> Any:
+        """Largest key, or None if the tree is empty."""
+        leaf = self._last_leaf()
+        return leaf.keys[-1] if leaf.keys else None
+
+    # ---------------- Ordered Iteration ---------------- #
+    def items(self, start: Any = None, end: Any = None, include_start: bool = True,
+              include_end: bool = True, reverse: bool = False) -> Iterator[Tuple[Any, List[Any]]]:
+        """Yield (key, values) in key order along the leaf chain. A None bound is unbounded."""
+        if reverse:
+            yield from self._items_reverse(start, end, include_start, include_end)
+            return
+        if start is None:
+            leaf, i = self._first_leaf(), 0
+        else:
+            leaf = self._find_leaf(start)
+            i = bisect_left(leaf.keys, start) if include_start else bisect_right(leaf.keys, start)
+        while leaf is not None:
+            keys, values = leaf.keys, leaf.values
+            if end is not None:
+                stop = bisect_right(keys, end) if include_end else bisect_left(keys, end)
+                for j in range(i, stop):
+                    yield keys[j], values[j]
+                if stop < len(keys):
+                    return
+            else:
+                for j in range(i, len(keys)):
+                    yield keys[j], values[j]
+            leaf, i = leaf.next, 0
+
+    def _items_reverse(self, start: Any, end: Any, include_start: bool,
+                       include_end: bool) -> Iterator[Tuple[Any, List[Any]]]:
+        if end is None:
+            leaf = self._last_leaf()
+            i = len(leaf.keys)
         else:
-            return self._search(node.children[i], key)
+            leaf = self._find_leaf(end)
+            i = bisect_right(leaf.keys, end) if include_end else bisect_left(leaf.keys, end)
+        while leaf is not None:
+            keys, values = leaf.keys, leaf.values
+            if start is not None:
+                low = bisect_left(keys, start) if include_start else bisect_right(keys, start)
+                for j in range(i - 1, low - 1, -1):
+                    yield keys[j], values[j]
+                if low > 0:
+                    return
+            else:
+                for j in range(i - 1, -1, -1):
+                    yield keys[j], values[j]
+            leaf = leaf.prev
+            if leaf is not None:
+                i = len(leaf.keys)
+
+    def __iter__(self) -> Iterator[Any]:
+        for key, _ in self.items():
+            yield key
 
     # ---------------- Range Search ---------------- #
-    def range_search(self, start: Any, end: Any) -> List[Any]:
+    def range_search(self, start: Any = None, end: Any = None,
+                     include_start: bool = True, include_end: bool = True) -> List[Any]:
+        """Values of every key between 'start' and 'end' in key order. A None bound is unbounded."""
         result: List[Any] = []
-        self._range_search(self.root, start, end, result)
+        for _, values in self.items(start, end, include_start, include_end):
+            result.extend(values)
         return result
 
-    def _range_search(self, node: BTreeNode, start: Any, end: Any, result: List[Any]):
-        i = 0
-        while i < len(node.keys) and node.keys[i] < start:
-            i += 1
-        while i < len(node.keys) and node.keys[i] <= end:
-            if not node.leaf:
-                self._range_search(node.children[i], start, end, result)
-            result.extend(node.values[i])
-            i += 1
-        if not node.leaf and i < len(node.children):
-            self._range_search(node.children[i], start, end, result)
+    # ---------------- Remoção ---------------- #
+    def delete(self, key: Any, value: Any = None) -> bool:
+        """Remove 'value' (by identity) from 'key', or the whole key if 'value' is None.
+
+        The key itself leaves the tree once its value list is empty. Returns False if nothing matched.
+        """
+        leaf, path = self._find_path(key)
+        pos = bisect_left(leaf.keys, key)
+        if pos == len(leaf.keys) or leaf.keys[pos] != key:
+            return False
+        if value is not None:
+            values = leaf.values[pos]
+            for i, item in enumerate(values):
+                if item is value:
+                    del values[i]
+                    break
+            else:
+                return False
+            if values:
+                return True
+
+        del leaf.keys[pos]
+        del leaf.values[pos]
+        self._len -= 1
+        if path and len(leaf.keys) < self.min_keys:
+            self._rebalance_leaf(leaf, path)
+        return True
+
+    def _rebalance_leaf(self, leaf: BTreeLeaf, path: List[Tuple[BTreeInternal, int]]):
+        parent, i = path[-1]
+        left = parent.children[i - 1] if i > 0 else None
+        right = parent.children[i + 1] if i + 1 < len(parent.children) else None
+
+        if left is not None and len(left.keys) > self.min_keys:
+            leaf.keys.insert(0, left.keys.pop())
+            leaf.values.insert(0, left.values.pop())
+            parent.keys[i - 1] = leaf.keys[0]
+            return
+        if right is not None and len(right.keys) > self.min_keys:
+            leaf.keys.append(right.keys.pop(0))
+            leaf.values.append(right.values.pop(0))
+            parent.keys[i] = right.keys[0]
+            return
+
+        # Merge into the left node of the pair and unlink the right one
+        if left is not None:
+            leaf, right, i = left, leaf, i - 1
+        leaf.keys.extend(right.keys)
+        leaf.values.extend(right.values)
+        leaf.next = right.next
+        if right.next is not None:
+            right.next.prev = leaf
+        del parent.keys[i]
+        del parent.children[i + 1]
+        self._rebalance_internal(path[:-1], parent)
+
+    def _rebalance_internal(self, path: List[Tuple[BTreeInternal, int]], node: BTreeInternal):
+        while True:
+            if not path:
+                if not node.keys:
+                    self.root = node.children[0]
+                return
+            if len(node.keys) >= self.min_keys:
+                return
+
+            parent, i = path.pop()
+            left = parent.children[i - 1] if i > 0 else None
+            right = parent.children[i + 1] if i + 1 < len(parent.children) else None
+
+            if left is not None and len(left.keys) > self.min_keys:
+                node.keys.insert(0, parent.keys[i - 1])
+                node.children.insert(0, left.children.pop())
+                parent.keys[i - 1] = left.keys.pop()
+                return
+            if right is not None and len(right.keys) > self.min_keys:
+                node.keys.append(parent.keys[i])
+                node.children.append(right.children.pop(0))
+                parent.keys[i] = right.keys.pop(0)
+                return
+
+            if left is not None:
+                node, right, i = left, node, i - 1
+            node.keys.append(parent.keys.pop(i))
+            node.keys.extend(right.keys)
+            node.children.extend(right.children)
+            del parent.children[i + 1]
+            node = parent
@@ -0,0 +1,501 @@
+import os
+import orjson
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from fastjson_db.core.json_model import JsonModel
+from fastjson_db.core.json_table import JsonTable
+from fastjson_db.errors import OperationError
+from fastjson_db.log.parallel_load import snapshot_ranges
+from fastjson_db.types import Field
+from .rw_lock import compaction_locked, read_locked, write_locked
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency: pip install fastjson-db[columnar]
+    np = None
+
+NUMERIC_DTYPES = {int: "int64", float: "float64"}
+NUMERIC_CONSTANTS = (int, float)
+MATERIALIZE_CHUNK = 1024
+
+Condition = Tuple[str, str, Any]  # (field, lookup, serialized value), as parsed by JsonQuerier
+
+class Column:
+    """One field stored contiguously: a NumPy array for int/float, dictionary-encoded codes for str,
+    an object array for anything else. Values are kept in their serialized (JSON) form."""
+
+    def __init__(self, name: str, field: Field, capacity: int):
+        self.name = name
+        self.field = field
+        if field.type in NUMERIC_DTYPES:
+            self.kind = "numeric"
+            self.data = np.zeros(capacity, dtype=NUMERIC_DTYPES[field.type])
+        elif field.type is str:
+            self.kind = "str"
+            self.data = np.zeros(capacity, dtype=np.int32)
+            self.dictionary: List[str] = []     # code -> string
+            self.codes: Dict[str, int] = {}     # string -> code
+        else:
+            self.kind = "object"
+            self.data = np.empty(capacity, dtype=object)
+        self.valid = np.zeros(capacity, dtype=bool)  # False where the value is None
+
+    def grow(self, capacity: int):
+        data = np.empty(capacity, dtype=self.data.dtype) if self.kind == "object" else np.zeros(capacity, dtype=self.data.dtype)
+        data[:len(self.data)] = self.data
+        valid = np.zeros(capacity, dtype=bool)
+        valid[:len(self.valid)] = self.valid
+        self.data, self.valid = data, valid
+
+    def _encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.dictionary)
+            self.dictionary.append(value)
+        return code
+
+    # ------------------ Writes ------------------ #
+    def set(self, i: int, value: Any):
+        if value is None:
+            self.valid[i] = False
+            return
+        self.valid[i] = True
+        self.data[i] = self._encode(value) if self.kind == "str" else value
+
+    def load(self, values: List[Any]):
+        """Fill rows [0, len(values)) in one pass."""
+        n = len(values)
+        self.valid[:n] = np.fromiter((v is not None for v in values), dtype=bool, count=n)
+        if self.kind == "numeric":
+            self.data[:n] = np.array([0 if v is None else v for v in values], dtype=self.data.dtype)
+        elif self.kind == "str":
+            encode = self._encode
+            self.data[:n] = np.fromiter((0 if v is None else encode(v) for v in values), dtype=np.int32, count=n)
+        else:
+            for i, v in enumerate(values):
+                self.data[i] = v
+
+    # ------------------ Reads ------------------ #
+    def values(self, rows: Any) -> List[Any]:
+        """Python values (None where missing) for a slice or an array of row ids."""
+        valid = self.valid[rows].tolist()
+        if self.kind == "str":
+            dictionary = self.dictionary
+            return [dictionary[c] if ok else None for c, ok in zip(self.data[rows].tolist(), valid)]
+        values = self.data[rows].tolist()
+        if all(valid):
+            return values
+        return [v if ok else None for v, ok in zip(values, valid)]
+
+    def mask(self, lookup: str, value: Any, rows: Any, predicate) -> "np.ndarray":
+        """Vectorized boolean mask of the rows matching 'field__lookup=value'."""
+        valid = self.valid[rows]
+        if value is None:
+            return ~valid if lookup == "exact" else np.zeros(len(valid), dtype=bool)
+
+        if self.kind == "numeric" and self._numeric_constant(lookup, value):
+            data = self.data[rows]
+            if lookup == "exact":
+                mask = data == value
+            elif lookup == "gt":
+                mask = data > value
+            elif lookup == "gte":
+                mask = data >= value
+            elif lookup == "lt":
+                mask = data < value
+            elif lookup == "lte":
+                mask = data <= value
+            elif lookup == "between":
+                mask = (data >= value[0]) & (data <= value[1])
+            else:
+                mask = np.isin(data, [v for v in value if isinstance(v, NUMERIC_CONSTANTS)])
+            return mask & valid
+
+        if self.kind == "str":
+            data = self.data[rows]
+            if lookup == "exact":
+                code = self.codes.get(value)
+                return (data == code) & valid if code is not None else np.zeros(len(data), dtype=bool)
+            if lookup == "in":
+                codes = [self.codes[v] for v in value if v in self.codes]
+                return np.isin(data, codes) & valid
+            # Evaluate once per distinct string, then gather by code
+            if not self.dictionary:
+                return np.zeros(len(data), dtype=bool)
+            per_code = np.fromiter((predicate(s, value) for s in self.dictionary), dtype=bool, count=len(self.dictionary))
+            return per_code[data] & valid
+
+        # Fallback: Python predicate per row
+        values = self.values(rows)
+        return np.fromiter((v is not None and predicate(v, value) for v in values), dtype=bool, count=len(values))
+
+    def _numeric_constant(self, lookup: str, value: Any) -> bool:
+        if lookup == "between":
+            return all(isinstance(v, NUMERIC_CONSTANTS) for v in value)
+        if lookup == "in":
+            return True
+        return lookup != "startswith" and isinstance(value, NUMERIC_CONSTANTS)
+
+    def order(self, rows: "np.ndarray", desc: bool, stop: Optional[int]) -> "np.ndarray":
+        """Positions in 'rows' sorted by value, None last. Only the first 'stop' are sorted (top-k)."""
+        if stop == 0:
+            return np.zeros(0, dtype=np.int64)
+        valid = self.valid[rows]
+        present, missing = np.flatnonzero(valid), np.flatnonzero(~valid)
+        if self.kind == "object":
+            values = self.values(rows)
+            ordered = np.array(sorted(present.tolist(), key=values.__getitem__, reverse=desc), dtype=np.int64)
+            return np.concatenate([ordered, missing])[:stop]
+
+        keys = self.data[rows][present]
+        if self.kind == "str":
+            # Codes follow insertion order: rank them by the strings they stand for
+            rank = np.empty(len(self.dictionary), dtype=np.int64)
+            rank[sorted(range(len(self.dictionary)), key=self.dictionary.__getitem__)] = np.arange(len(self.dictionary))
+            keys = rank[keys]
+        n = len(keys)
+        if stop is not None and stop < n:
+            # argpartition picks the k best in O(n), only those are sorted
+            chosen = np.argpartition(keys, n - stop)[n - stop:] if desc else np.argpartition(keys, stop)[:stop]
+        else:
+            chosen = np.arange(n)
+        ranked = chosen[np.argsort(keys[chosen], kind="stable")]
+        if desc:
+            ranked = ranked[::-1]
+        return np.concatenate([present[ranked], missing])[:stop]
+
+    def aggregate(self, func: str, rows: Any) -> Any:
+        """sum / avg / min / max / count / distinct over the non-null values of 'rows'."""
+        valid = self.valid[rows]
+        if func == "count":
+            return int(np.count_nonzero(valid))
+        if func == "distinct":
+            if self.kind == "object":
+                return len({orjson.dumps(v) for v in self.values(rows) if v is not None})
+            return len(np.unique(self.data[rows][valid]))
+        if self.kind == "numeric":
+            data = self.data[rows][valid]
+            if func == "sum":
+                return data.sum().item()
+            if not len(data):
+                return None
+            if func == "avg":
+                return data.mean().item()
+            return (data.min() if func == "min" else data.max()).item()
+
+        if func in ("sum", "avg"):
+            raise OperationError("Aggregate Error", f"'{func}' needs a numeric field, '{self.name}' is not")
+        if self.kind == "str":
+            present = [self.dictionary[c] for c in np.unique(self.data[rows][valid]).tolist()]
+        else:
+            present = [v for v in self.values(rows) if v is not None]
+        if not present:
+            return None
+        result = min(present) if func == "min" else max(present)
+        return self.field.deserializer(result) if self.field.deserializer else result
+
+    def groups(self, rows: "np.ndarray") -> List[Tuple[Any, "np.ndarray"]]:
+        """(value, row ids) per distinct value of 'rows', plus (None, ...) for missing values."""
+        valid = self.valid[rows]
+        present, missing = rows[valid], rows[~valid]
+        if self.kind == "object":
+            by_value: Dict[Any, List[int]] = {}
+            for row, value in zip(present.tolist(), self.values(present)):
+                by_value.setdefault(value, []).append(row)
+            groups = [(value, np.array(ids, dtype=np.int64)) for value, ids in by_value.items()]
+        else:
+            keys, inverse = np.unique(self.data[present], return_inverse=True)
+            # One stable sort splits the rows into contiguous runs, one per key
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.cumsum(np.bincount(inverse, minlength=len(keys)))[:-1]
+            values = keys.tolist()
+            if self.kind == "str":
+                values = [self.dictionary[code] for code in values]
+            groups = list(zip(values, np.split(present[order], bounds)))
+        if self.field.deserializer:
+            groups = [(self.field.deserializer(value), ids) for value, ids in groups]
+        if len(missing):
+            groups.append((None, missing))
+        return groups
+
+class ColumnarResult(Sequence):
+    """Lazy query result: rows are hydrated only when read."""
+
+    def __init__(self, table: "ColumnarTable", rows: "np.ndarray"):
+        self.table = table
+        self.rows = rows
+        self._epoch = table._epoch
+
+    def _check(self):
+        if self._epoch != self.table._epoch:
+            raise OperationError("Result Error", "Table was reloaded or vacuumed, run the query again")
+
+    def __len__(self) -> int:
+        self._check()
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        self._check()
+        if isinstance(index, slice):
+            return self.table._materialize(self.rows[index])
+        if index < 0:
+            index += len(self.rows)
+        if not 0 <= index < len(self.rows):
+            raise IndexError("result index out of range")
+        return self.table._materialize(self.rows[index:index + 1])[0]
+
+    def __iter__(self) -> Iterator[JsonModel]:
+        for start in range(0, len(self.rows), MATERIALIZE_CHUNK):
+            self._check()
+            yield from self.table._materialize(self.rows[start:start + MATERIALIZE_CHUNK])
+
+    def __repr__(self):
+        return f"<ColumnarResult of {len(self.rows)} {self.table.model.__name__} rows>"
+
+class ColumnarRows(Mapping):
+    """Read-only {id: instance} view over a ColumnarTable (stands in for JsonTable.cache)."""
+
+    def __init__(self, table: "ColumnarTable"):
+        self.table = table
+
+    def __getitem__(self, query_id: Any) -> JsonModel:
+        row = self.table._row_of[query_id]
+        return self.table._materialize(np.array([row]))[0]
+
+    def __contains__(self, query_id: Any) -> bool:
+        return query_id in self.table._row_of
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.table._row_of)
+
+    def __len__(self) -> int:
+        return len(self.table._row_of)
+
+    def values(self) -> ColumnarResult:
+        return self.table.result(self.table._live_rows())
+
+class ColumnarTable(JsonTable):
+    """JsonTable storing each field in a contiguous column, for vectorized filters and aggregates.
+
+    Instances returned by reads are materialized copies: change rows through update().
+    """
+    columnar = True
+
+    def __init__(self, model: type[JsonModel], path: str | os.PathLike, capacity: int = 1024, **kwargs):
+        if np is None:
+            raise OperationError("ColumnarTable Creation Error", "NumPy is required: pip install fastjson-db[columnar]")
+        super().__init__(model, path, **kwargs)
+        self._epoch = 0  # Bumped whenever row ids are reassigned
+        self._reset(capacity)
+        self.cache = ColumnarRows(self)
+
+    def _reset(self, capacity: int):
+        self._size = 0                                  # Rows used, including removed ones
+        self._capacity = max(capacity, 16)
+        self.columns: Dict[str, Column] = {
+            name: Column(name, field, self._capacity) for name, field in self.model._fields.items()
+        }
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        self._row_of: Dict[Any, int] = {}              # id -> row
+        self._epoch += 1
+
+    def _ensure_capacity(self, size: int):
+        if size <= self._capacity:
+            return
+        while self._capacity < size:
+            self._capacity *= 2
+        for column in self.columns.values():
+            column.grow(self._capacity)
+        alive = np.zeros(self._capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._alive = alive
+
+    def _live_rows(self) -> "np.ndarray":
+        return np.flatnonzero(self._alive[:self._size])
+
+    # ------------------ Row Storage ------------------ #
+    def _put_row(self, query_id: Any, row: Dict[str, Any]):
+        i = self._row_of.get(query_id)
+        if i is None:
+            self._ensure_capacity(self._size + 1)
+            i = self._size
+            self._size += 1
+            self._row_of[query_id] = i
+            self._alive[i] = True
+        for name, column in self.columns.items():
+            column.set(i, row.get(name))
+
+    def _delete_row(self, query_id: Any):
+        i = self._row_of.pop(query_id, None)
+        if i is not None:
+            self._alive[i] = False
+
+    def _materialize(self, rows: "np.ndarray") -> List[JsonModel]:
+        names = list(self.columns)
+        columns = [self.columns[name].values(rows) for name in names]
+        hydrate = self.model._trusted_hydrate
+        return [hydrate(dict(zip(names, values))) for values in zip(*columns)]
+
+    @write_locked
+    def vacuum(self):
+        """Drop removed rows and renumber the rest (invalidates pending lazy results)."""
+        keep = self._live_rows()
+        for column in self.columns.values():
+            column.data[:len(keep)] = column.data[keep]
+            column.valid[:len(keep)] = column.valid[keep]
+            column.valid[len(keep):] = False
+        self._alive[:] = False
+        self._alive[:len(keep)] = True
+        self._row_of = {query_id: new for new, query_id in
+                        enumerate(sorted(self._row_of, key=self._row_of.__getitem__))}
+        self._size = len(keep)
+        self._epoch += 1
+        self.version += 1  # Cached query results hold the old row numbers
+
+    # ------------------ Load / Save ------------------ #
+    @write_locked
+    @compaction_locked
+    def _load_cache(self, pool: Optional[Executor] = None):
+        """Load the .json snapshot straight into columns, then replay the WAL on top.
+
+        With a process 'pool', large JSON Lines snapshots are parsed by its workers, whose column-shaped
+        results load as they are (see JsonTable._load_cache).
+        """
+        self._dirty.clear()
+        names = list(self.model._fields)
+        ranges = snapshot_ranges(self.path, self.file_format, os.cpu_count() or 1) if pool is not None else []
+        if ranges:
+            values: Dict[str, List[Any]] = {name: [] for name in names}
+            for columns in self._parse_parallel(pool, ranges):
+                for name, column in zip(names, columns):
+                    values[name].extend(column)
+        else:
+            data, trusted = self._read_snapshot()
+            if not trusted:
+                data = [self.model.from_json(item).to_json() for item in data]
+            values = {name: [item.get(name) for item in data] for name in names}
+
+        n = len(values["id"])
+        self._reset(n)
+        for name, column in self.columns.items():
+            column.load(values[name])
+        for i, query_id in enumerate(values["id"]):
+            self._row_of[query_id] = i  # Last duplicate wins, as in JsonTable
+        self._size = n
+        if len(self._row_of) == n:
+            self._alive[:n] = True
+        else:
+            self._alive[list(self._row_of.values())] = True
+
+        for op, key, row in self._replay_changes():
+            if op == "put":
+                self._put_row(key, row)
+            else:
+                self._delete_row(key)
+
+        self._publish("reload", None, None, None)
+
+    def _apply_change(self, op: str, query_id: Any, row: Optional[Dict[str, Any]]):
+        old = self.cache[query_id] if query_id in self._row_of else None
+        if op == "put":
+            self._put_row(query_id, row)
+            self._publish("insert" if old is None else "update", query_id, old, self.model._trusted_hydrate(row))
+        elif old is not None:
+            self._delete_row(query_id)
+            self._publish("remove", query_id, old, None)
+
+    def _dump_rows(self) -> Iterator[Dict[str, Any]]:
+        names = list(self.columns)
+        rows = self._live_rows()
+        for start in range(0, len(rows), MATERIALIZE_CHUNK):
+            chunk = rows[start:start + MATERIALIZE_CHUNK]
+            columns = [self.columns[name].values(chunk) for name in names]
+            for values in zip(*columns):
+                yield dict(zip(names, values))
+
+    def _row_json(self, query_id: Any) -> Dict[str, Any]:
+        row = self._row_of[query_id]
+        return {name: column.values(slice(row, row + 1))[0] for name, column in self.columns.items()}
+
+    # ------------------ CRUD ------------------ #
+    @write_locked
+    def insert(self, model_instance: JsonModel):
+        """Insert a model instance into the columns with validation."""
+        if not isinstance(model_instance, self.model):
+            raise OperationError("Insert Error", f"Expected instance of {self.model}")
+        if self.shared:
+            self._follow()
+        self._log_put(model_instance.id, model_instance)
+        old = self.cache[model_instance.id] if model_instance.id in self._row_of else None
+        self._put_row(model_instance.id, model_instance.to_json())
+        self._publish("insert", model_instance.id, old, model_instance)
+
+    @write_locked
+    def remove(self, query_id: int):
+        """Remove a row with validation."""
+        if self.shared:
+            self._follow()
+        if query_id not in self._row_of:
+            raise OperationError("Remove Error", f"ID {query_id} not found")
+        self._log_delete(query_id)
+        old = self.cache[query_id]
+        self._delete_row(query_id)
+        self._publish("remove", query_id, old, None)
+
+    @write_locked
+    def update(self, query_id: int, new_data: JsonModel):
+        """Update a row in place with validation."""
+        if self.shared:
+            self._follow()
+        if query_id not in self._row_of:
+            raise OperationError("Update Error", f"ID {query_id} not found")
+        if not isinstance(new_data, self.model):
+            raise OperationError("Update Error", f"Expected instance of {self.model}")
+        self._log_put(query_id, new_data)
+        old = self.cache[query_id]
+        self._put_row(query_id, new_data.to_json())
+        self._publish("update", query_id, old, new_data)
+
+    @read_locked
+    def get(self, query_id: int):
+        """Materialize a row by ID with validation."""
+        if query_id not in self._row_of:
+            raise OperationError("Get Error", f"ID {query_id} not found")
+        return self.cache[query_id]
+
+    # ------------------ Vectorized Queries ------------------ #
+    def select(self, conditions: List[Condition], predicates: Dict[str, Any]) -> "np.ndarray":
+        """Row ids matching every condition, computed as vectorized masks."""
+        rows: Any = slice(0, self._size)
+        for field_name, lookup, value in conditions:
+            if field_name == "id" and lookup == "exact":
+                # Primary key: a single row, no scan
+                row = self._row_of.get(value)
+                rows = np.array([] if row is None else [row], dtype=np.int64)
+                break
+
+        mask = self._alive[rows].copy()
+        for field_name, lookup, value in conditions:
+            if not mask.any():
+                break
+            mask &= self.columns[field_name].mask(lookup, value, rows, predicates[lookup])
+        if isinstance(rows, slice):
+            return np.flatnonzero(mask)
+        return rows[mask]
+
+    def result(self, rows: "np.ndarray") -> ColumnarResult:
+        """Wrap selected row ids in a lazy result."""
+        return ColumnarResult(self, rows)
+
+    def order(self, rows: "np.ndarray", field_name: str, desc: bool, stop: Optional[int]) -> "np.ndarray":
+        """Row ids sorted by a column (None last), keeping only the first 'stop'."""
+        return rows[self.columns[field_name].order(rows, desc, stop)]
+
+    def group(self, rows: "np.ndarray", field_name: str) -> List[Tuple[Any, "np.ndarray"]]:
+        """Split row ids by the value of a column."""
+        return self.columns[field_name].groups(rows)
+
+    def aggregate(self, func: str, field_name: str, rows: "np.ndarray") -> Any:
+        """sum / avg / min / max / count / distinct of a column over the given row ids."""
+        return self.columns[field_name].aggregate(func, rows)
@@ -0,0 +1,55 @@
+from typing import Any, Iterable, Optional, Tuple
+
+class _Bound:
+    """Sentinel ordered below (NULL) or above (MAX) every other value, so tuple keys holding
+    None stay comparable and prefix scans can bound the remaining columns."""
+    __slots__ = ("_rank", "_name")
+
+    def __init__(self, rank: int, name: str):
+        self._rank = rank
+        self._name = name
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return hash(self._name)
+
+    def __lt__(self, other):
+        if self is other:
+            return False
+        return self._rank < other._rank if isinstance(other, _Bound) else self._rank < 0
+
+    def __gt__(self, other):
+        if self is other:
+            return False
+        return self._rank > other._rank if isinstance(other, _Bound) else self._rank > 0
+
+    def __le__(self, other):
+        return self is other or self < other
+
+    def __ge__(self, other):
+        return self is other or self > other
+
+    def __repr__(self):
+        return self._name
+
+NULL = _Bound(-1, "NULL")  # Stored in place of None
+MAX = _Bound(1, "MAX")     # Never stored: closes a prefix range
+
+def composite_key(values: Iterable[Any]) -> Tuple[Any, ...]:
+    return tuple(NULL if v is None else v for v in values)
+
+def prefix_bounds(prefix: Tuple[Any, ...], bounds: Optional[Tuple[Any, Any, bool, bool]]) -> Tuple[Any, Any, bool, bool]:
+    """B-Tree bounds of every key starting with 'prefix', optionally with the next column
+    inside single-column 'bounds' (start, end, include_start, include_end; None is unbounded)."""
+    if bounds is None:
+        return prefix, prefix + (MAX,), True, True
+    start, end, include_start, include_end = bounds
+    # Range lookups never match None, so the NULL keys of the column are skipped
+    low = prefix + (NULL, MAX) if start is None else prefix + ((start,) if include_start else (start, MAX))
+    if end is None:
+        return low, prefix + (MAX,), True, True
+    if include_end:
+        return low, prefix + (end, MAX), True, True
+    return low, prefix + (end,), True, False
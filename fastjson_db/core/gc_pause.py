@@ -0,0 +1,37 @@
+import gc
+import threading
+from contextlib import contextmanager
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0          # Loads currently running with the cyclic GC paused
+_gc_was_enabled = False
+_gc_freeze = False      # A running load asked to freeze what was loaded
+
+@contextmanager
+def paused_gc(freeze: bool = False):
+    """Pause the cyclic GC while any load runs.
+
+    With freeze=True every object alive once the last load ends is frozen (gc.freeze), so later
+    collections skip them. Frozen objects are never collected, not even in garbage cycles: the
+    objects of a previous freeze are unfrozen first, so reloads do not pile up frozen copies.
+    """
+    global _gc_pauses, _gc_was_enabled, _gc_freeze
+    with _gc_lock:
+        if not _gc_pauses:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        if freeze and not _gc_freeze:
+            gc.unfreeze()
+            _gc_freeze = True
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if not _gc_pauses:
+                if _gc_freeze:
+                    gc.freeze()
+                    _gc_freeze = False
+                if _gc_was_enabled:
+                    gc.enable()
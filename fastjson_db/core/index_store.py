@@ -0,0 +1,48 @@
+import marshal
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from fastjson_db.log.json_journal import atomic_write
+
+MAGIC = b"FJDBIDX1"
+HEADER = struct.Struct("<8sI")  # magic, crc32 of the body
+
+class IndexStore:
+    """Saved indices of a table: '<path>.idx', a marshal body behind a magic and a crc32.
+
+    The body holds the table generation it was built from (see JsonTable.storage_generation),
+    the IDs changed since that generation (the WAL delta, whose saved entries may be outdated)
+    and, per field, the index kind, its sorted keys and the IDs under each key. Objects are
+    never stored: loading maps the IDs back to the instances already in the table cache.
+    """
+
+    def __init__(self, table_path: str):
+        self.path = f"{table_path}.idx"
+
+    def save(self, generation: List[Any], indices: Dict[str, Dict[str, Any]], delta: List[Any]):
+        """Atomically write the indices built from the given table generation plus the 'delta' IDs."""
+        body = marshal.dumps({"generation": generation, "marshal": marshal.version,
+                              "delta": delta, "indices": indices})
+        atomic_write(self.path, HEADER.pack(MAGIC, zlib.crc32(body)) + body)
+
+    def load(self, generation: List[Any]) -> Tuple[Dict[str, Dict[str, Any]], List[Any]]:
+        """(indices, delta IDs) saved for exactly this generation, or ({}, []) if the file is
+        missing, corrupt or stale."""
+        try:
+            with open(self.path, "rb") as f:
+                payload = f.read()
+        except FileNotFoundError:
+            return {}, []
+        if len(payload) < HEADER.size:
+            return {}, []
+        magic, crc = HEADER.unpack_from(payload)
+        body = payload[HEADER.size:]
+        if magic != MAGIC or zlib.crc32(body) != crc:
+            return {}, []
+        try:
+            saved: Optional[Dict[str, Any]] = marshal.loads(body)
+        except (EOFError, ValueError, TypeError):
+            return {}, []
+        if saved.get("marshal") != marshal.version or saved.get("generation") != generation:
+            return {}, []
+        return saved["indices"], saved["delta"]
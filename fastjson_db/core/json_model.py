@@ -1,11 +1,15 @@
-from typing import Dict
+from typing import Any, Callable, Dict, Tuple
 from fastjson_db.types import Field
 from fastjson_db.errors import BadTypingError
 from fastjson_db.core.json_model_meta import JsonModelMeta
 
 class JsonModel(metaclass=JsonModelMeta):
     """Base Model for all Models in FastJson-DB"""
+    __slots__ = ()  # Lets 'slots=True' subclasses drop the per-instance __dict__
     _fields: Dict[str, Field]
+    _indexes: Tuple[Tuple[str, ...], ...]  # Composite indices declared with 'indexes=[...]'
+    _trusted_hydrate: Callable[[Dict[str, Any]], "JsonModel"]  # Compiled by JsonModelMeta
+    _trusted_hydrate_values: Callable[..., "JsonModel"]  # Same, one positional value per field
 
     def __init__(self, **kwargs):
         for field_name, field in self._fields.items():
@@ -32,4 +36,16 @@ class JsonModel(metaclass=JsonModelMeta):
                 result[name] = field.serializer(value)
             else:
                 result[name] = value
-        return result
\ No newline at end of file
+        return result
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]):
+        """Build a validated instance from a stored row, applying every Field.deserializer."""
+        kwargs = {}
+        for name, field in cls._fields.items():
+            if name in data:
+                value = data[name]
+                if field.deserializer and value is not None:
+                    value = field.deserializer(value)
+                kwargs[name] = value
+        return cls(**kwargs)
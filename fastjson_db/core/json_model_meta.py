@@ -1,14 +1,80 @@
-from typing import Dict
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
 from fastjson_db.types import Field
+from fastjson_db.errors import HeritageError
+
+def _compile_hydrator(cls: type, fields: Dict[str, Field]) -> Callable[[Dict[str, Any]], Any]:
+    """Generate a per-model function building an instance straight from a trusted stored row.
+
+    It skips __init__ (type checks, validators, kwargs dict) and applies each Field.deserializer.
+    """
+    lines = ["def _hydrate(row):", "    obj = _new(_cls)", "    get = row.get"]
+    env: Dict[str, Any] = {"_new": object.__new__, "_cls": cls}
+    for i, (name, field) in enumerate(fields.items()):
+        if field.deserializer is not None:
+            env[f"_d{i}"] = field.deserializer
+            lines.append(f"    v = get({name!r})")
+            lines.append(f"    obj.{name} = None if v is None else _d{i}(v)")
+        else:
+            lines.append(f"    obj.{name} = get({name!r})")
+    lines.append("    return obj")
+    exec("\n".join(lines), env)
+    return env["_hydrate"]
+
+def _compile_values_hydrator(cls: type, fields: Dict[str, Field]) -> Callable[..., Any]:
+    """Same as _compile_hydrator, taking one positional value per field (in _fields order)
+    instead of a row dict: map(hydrate, *columns) builds a whole column-shaped chunk."""
+    params = ", ".join(f"v{i}" for i in range(len(fields)))
+    lines = [f"def _hydrate({params}):", "    obj = _new(_cls)"]
+    env: Dict[str, Any] = {"_new": object.__new__, "_cls": cls}
+    for i, (name, field) in enumerate(fields.items()):
+        if field.deserializer is not None:
+            env[f"_d{i}"] = field.deserializer
+            lines.append(f"    obj.{name} = None if v{i} is None else _d{i}(v{i})")
+        else:
+            lines.append(f"    obj.{name} = v{i}")
+    lines.append("    return obj")
+    exec("\n".join(lines), env)
+    return env["_hydrate"]
 
 class JsonModelMeta(type):
-    """Metaclass for JsonModel"""
-    def __new__(mcs, name, bases, namespace):
+    """Metaclass for JsonModel
+
+    Model options are given as class keywords, e.g. 'class User(JsonModel, slots=True)':
+    - slots: store fields in __slots__ instead of a per-instance __dict__ (several times smaller rows)
+    - indexes: composite indices for JsonQuerier, e.g. indexes=[("username", "balance")]
+    """
+    def __new__(mcs, name, bases, namespace, slots: bool = False,
+                indexes: Iterable[Sequence[str]] = ()):
         fields: Dict[str, Field] = {}
+        composite: List[Tuple[str, ...]] = []
+        for base in reversed(bases):
+            fields.update(getattr(base, "_fields", {}))
+            composite.extend(c for c in getattr(base, "_indexes", ()) if c not in composite)
+
+        own_fields = [attr_name for attr_name, attr_value in namespace.items() if isinstance(attr_value, Field)]
+        for attr_name in own_fields:
+            fields[attr_name] = namespace[attr_name]
+
+        if slots:
+            if "__slots__" in namespace:
+                raise HeritageError("JsonModel Creation Error", f"'{name}' declares __slots__ and 'slots=True'")
+            # Slot descriptors replace the Field class attributes (still available in _fields)
+            for attr_name in own_fields:
+                del namespace[attr_name]
+            namespace["__slots__"] = tuple(own_fields)
 
-        for attr_name, attr_value in list(namespace.items()):
-            if isinstance(attr_value, Field):
-                fields[attr_name] = attr_value
+        for columns in indexes:
+            if isinstance(columns, str) or len(columns) < 2:
+                raise HeritageError("JsonModel Creation Error", f"Composite index {columns!r} needs 2 or more fields")
+            for column in columns:
+                if column not in fields:
+                    raise HeritageError("JsonModel Creation Error", f"Index field '{column}' does not exist in '{name}'")
+            if tuple(columns) not in composite:
+                composite.append(tuple(columns))
 
         namespace["_fields"] = fields
-        return super().__new__(mcs, name, bases, namespace)
\ No newline at end of file
+        namespace["_indexes"] = tuple(composite)
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls._trusted_hydrate = staticmethod(_compile_hydrator(cls, fields))
+        cls._trusted_hydrate_values = staticmethod(_compile_values_hydrator(cls, fields))
+        return cls
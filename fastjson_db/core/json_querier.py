@@ -1,124 +1,871 @@
-from typing import List, Any, Dict, Callable
+import heapq
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import List, Any, Dict, Callable, Iterable, Iterator, Optional, Set, Tuple
 from fastjson_db.core.json_model import JsonModel
 from fastjson_db.types import Field
 from fastjson_db.core.json_table import JsonTable
 from fastjson_db.errors import OperationError
-from .b_tree import BTree
+from .b_tree import BTree, DEFAULT_ORDER
+from .query_cache import QueryCache, MISS
+from .index_store import IndexStore
+from .composite_index import NULL, composite_key
+from .aggregation import AGGREGATES, ALL_ROWS, Accumulator, Spec, check_aggregate, key_stats, result_name
+from .query import COMPARISONS, LOOKUPS, NO_WINDOW, Condition, Query, Window, hashable
+from .query_plan import QueryPlanner
+from .relations import Relations
 
-class JsonQuerier:
+class JsonQuerier(QueryPlanner, Relations):
     """High-performance Querier for JsonTable with chained queries and automatic indices."""
 
-    def __init__(self, table: JsonTable):
+    def __init__(self, table: JsonTable, btree_order: int = DEFAULT_ORDER, result_cache_size: int = 0,
+                 persist_indices: bool = False):
         self.table = table
-        self._filters: List[Callable[[JsonModel], bool]] = []
+        self.btree_order = btree_order  # Keys per B+Tree node
+        # Opt-in '<path>.idx' file: indices saved for the current table generation load without a rebuild
+        self.index_store: Optional[IndexStore] = IndexStore(table.path) if persist_indices else None
+        # Opt-in LRU of query results, invalidated by the table write version
+        self.result_cache: Optional[QueryCache] = QueryCache(result_cache_size) if result_cache_size else None
+        self._query = Query(self)  # Empty query: chaining starts from it and returns new Query objects
+        self._compiled: Dict[Tuple[Tuple[str, str], ...], Callable[..., Callable[[JsonModel], bool]]] = {}
         self._cache = table.cache
         self._fields_map: Dict[str, Field] = table.model._fields
 
         self._indices_hash: Dict[str, Dict[Any, JsonModel]] = {}
         self._indices_btree: Dict[str, BTree] = {}
+        # Composite B-Trees declared on the model ('indexes=[...]'), keyed by tuples of column values
+        self._indices_composite: Dict[Tuple[str, ...], BTree] = {}
+        self._version = table.version  # Table version the indices reflect
+        # ColumnarTable: filters and aggregates run as vectorized masks, no per-row indices
+        self._columnar = getattr(table, "columnar", False)
+        # MmapTable: rows are decoded on demand, so only its own ID index is used
+        self._lazy = getattr(table, "lazy", False)
+
+        # Keep indices in sync with every table write instead of rebuilding them
+        table.subscribe(self._on_table_change)
 
     # ------------------ Load Cache / Build Indices ------------------ #
     def _load_cache(self):
-        """Build hash maps and B-Trees for fast querying."""
+        """Build hash maps and B-Trees for fast querying, reusing saved indices that are still valid."""
+        with self.table.lock.write():  # Readers never see half-built indices
+            metrics = self.table.metrics
+            if metrics is None:
+                self._build_indices()
+            else:
+                metrics.timed("index", self._build_indices)()
+
+    def _build_indices(self):
+        self._cache = self.table.cache
         self._indices_hash.clear()
         self._indices_btree.clear()
+        self._indices_composite.clear()
+        if self._columnar:
+            return
+        if self._lazy:
+            # The table maps IDs to rows through its offset index: use it as the 'id' hash index
+            if "id" in self._fields_map:
+                self._indices_hash["id"] = self._cache
+            self._version = self.table.version
+            return
 
+        generation, saved, delta = None, {}, set()
+        if self.index_store is not None:
+            generation = self.table.storage_generation()
+            if generation is not None:
+                saved, saved_delta = self.index_store.load(generation)
+                # Rows logged since the generation, when the file was saved or now, are patched in
+                delta = self.table.dirty_ids.union(saved_delta)
+
+        objects: Optional[List[JsonModel]] = None
+        restored: List[str | Tuple[str, ...]] = []
         for field_name, field in self._fields_map.items():
-            if getattr(field, "primary_key", False) or getattr(field, "unique", False):
-                index = {}
-                for obj in self._cache.values():
-                    val = getattr(obj, field_name)
-                    if val is not None:
-                        key = field.serializer(val) if field.serializer else val
-                        index[key] = obj
+            entry = saved.get(field_name)
+            if entry is not None and entry["spec"] == self._index_spec(field) and \
+                    self._restore_index(field_name, entry, delta):
+                restored.append(field_name)
+                continue
+            if objects is None:
+                objects = list(self._cache.values())
+            self._build_index(field_name, field, objects)
+        for columns in self.table.model._indexes:
+            entry = saved.get(",".join(columns))
+            if entry is not None and entry["spec"] == self._composite_spec(columns) and \
+                    self._restore_composite(columns, entry, delta):
+                restored.append(columns)
+                continue
+            if objects is None:
+                objects = list(self._cache.values())
+            self._build_composite(columns, objects)
+        if restored and delta:
+            self._patch_restored(restored, [self._cache[key] for key in delta if key in self._cache])
+        self._version = self.table.version
+        rebuilt = objects is not None
+
+        if rebuilt and generation is not None:
+            self._write_indices(generation)
+
+    def _is_hash_indexed(self, field: Field) -> bool:
+        return getattr(field, "primary_key", False) or getattr(field, "unique", False)
+
+    def _build_index(self, field_name: str, field: Field, objects: List[JsonModel]):
+        """Build one index from the table objects."""
+        if self._is_hash_indexed(field):
+            index = {}
+            for obj in objects:
+                val = getattr(obj, field_name)
+                if val is not None:
+                    index[self._index_key(field, val)] = obj
+            self._indices_hash[field_name] = index
+        else:
+            # Group by key, sort once and bulk load bottom-up instead of n single inserts
+            groups: Dict[Any, List[JsonModel]] = {}
+            for obj in objects:
+                val = getattr(obj, field_name)
+                if val is not None:
+                    groups.setdefault(self._index_key(field, val), []).append(obj)
+            self._indices_btree[field_name] = BTree.bulk_load(
+                sorted(groups.items(), key=itemgetter(0)), order=self.btree_order
+            )
+
+    def _composite_key(self, columns: Tuple[str, ...], obj: JsonModel) -> Tuple[Any, ...]:
+        values = []
+        for column in columns:
+            val = getattr(obj, column)
+            values.append(None if val is None else self._index_key(self._fields_map[column], val))
+        return composite_key(values)
+
+    def _build_composite(self, columns: Tuple[str, ...], objects: List[JsonModel]):
+        """Bulk load one composite B-Tree. Rows with None columns are kept (as NULL, sorted first)."""
+        groups: Dict[Tuple[Any, ...], List[JsonModel]] = {}
+        for obj in objects:
+            groups.setdefault(self._composite_key(columns, obj), []).append(obj)
+        self._indices_composite[columns] = BTree.bulk_load(
+            sorted(groups.items(), key=itemgetter(0)), order=self.btree_order
+        )
+
+    # ------------------ Saved Indices ------------------ #
+    def _index_spec(self, field: Field) -> List[Any]:
+        """What a saved index was built with: a change in kind, type or serializer makes it stale."""
+        serializer = getattr(field.serializer, "__qualname__", None) if field.serializer else None
+        return ["hash" if self._is_hash_indexed(field) else "btree", repr(field.type), serializer]
+
+    def _restore_index(self, field_name: str, entry: Dict[str, Any], delta: Set[Any]) -> bool:
+        """Rebuild one index from saved keys and IDs, leaving out the 'delta' IDs (patched in
+        afterwards). False if another ID is no longer in the table."""
+        get = self._cache.__getitem__
+        try:
+            if entry["spec"][0] == "hash":
+                if not delta:
+                    index = dict(zip(entry["keys"], map(get, entry["ids"])))
+                else:
+                    index = {key: get(query_id) for key, query_id in zip(entry["keys"], entry["ids"])
+                             if query_id not in delta}
                 self._indices_hash[field_name] = index
             else:
-                btree = BTree()
-                for obj in self._cache.values():
-                    val = getattr(obj, field_name)
-                    if val is not None:
-                        key = field.serializer(val) if field.serializer else val
-                        btree.insert(key, obj)
-                self._indices_btree[field_name] = btree
-
-    def filter(self, **conditions):
-        """Add a filter condition. Supports chained calls."""
-        def condition_fn(item: JsonModel):
-            for key, value in conditions.items():
-                if key not in self._fields_map:
-                    raise OperationError("Filter Error", f"Field '{key}' does not exist in model")
-                field = self._fields_map[key]
-                obj_val = getattr(item, key)
-                if field.serializer:
-                    obj_val = field.serializer(obj_val)
-                    value = field.serializer(value)
-                if obj_val != value:
-                    return False
-            return True
-
-        self._filters.append(condition_fn)
-        return self
-
-    def _get_candidates(self, conditions: Dict[str, Any]) -> List[JsonModel]:
-        """Return a reduced set of objects using hash or B-Tree indices if possible."""
-        candidates = None
+                items = self._restored_items(entry["keys"], entry["ids"], delta)
+                self._indices_btree[field_name] = BTree.bulk_load(items, order=self.btree_order)
+        except KeyError:
+            return False
+        return True
 
-        for key, value in conditions.items():
-            if key in self._indices_hash:
-                field = self._fields_map[key]
-                if field.serializer:
-                    value = field.serializer(value)
-                obj = self._indices_hash[key].get(value)
-                if obj:
-                    candidates = [obj]
+    def _restored_items(self, keys: List[Any], ids: List[List[Any]], delta: Set[Any]) -> List[Tuple[Any, List[JsonModel]]]:
+        """(key, objects) pairs of a saved B-Tree without the 'delta' IDs. Raises KeyError on an unknown ID."""
+        get = self._cache.__getitem__
+        if not delta:
+            return list(zip(keys, [[get(query_id) for query_id in group] for group in ids]))
+        items = []
+        for key, group in zip(keys, ids):
+            values = [get(query_id) for query_id in group if query_id not in delta]
+            if values:
+                items.append((key, values))
+        return items
+
+    def _patch_restored(self, restored: List[str | Tuple[str, ...]], objects: List[JsonModel]):
+        """Add the current state of the 'delta' rows to the indices restored from disk."""
+        for name in restored:
+            if isinstance(name, tuple):
+                btree = self._indices_composite[name]
+                for obj in objects:
+                    btree.insert(self._composite_key(name, obj), obj)
+                continue
+            field = self._fields_map[name]
+            index = self._indices_hash.get(name)
+            btree = self._indices_btree.get(name)
+            for obj in objects:
+                val = getattr(obj, name)
+                if val is None:
+                    continue
+                if index is not None:
+                    index[self._index_key(field, val)] = obj
                 else:
-                    return []
-                break
+                    btree.insert(self._index_key(field, val), obj)
 
-        # After B-Tree
-        if candidates is None:
-            for key, value in conditions.items():
-                if key in self._indices_btree:
-                    field = self._fields_map[key]
-                    if field.serializer:
-                        value = field.serializer(value)
-                    candidates = self._indices_btree[key].search(value)
-                    break
+    def _composite_spec(self, columns: Tuple[str, ...]) -> List[Any]:
+        return ["composite", [self._index_spec(self._fields_map[column]) for column in columns]]
 
-        if candidates is None:
-            candidates = list(self._cache.values())
+    def _restore_composite(self, columns: Tuple[str, ...], entry: Dict[str, Any], delta: Set[Any]) -> bool:
+        keys = [composite_key(key) for key in entry["keys"]]
+        try:
+            items = self._restored_items(keys, entry["ids"], delta)
+        except KeyError:
+            return False
+        self._indices_composite[columns] = BTree.bulk_load(items, order=self.btree_order)
+        return True
 
-        return candidates
+    def _dump_indices(self) -> Dict[str, Dict[str, Any]]:
+        """Every index as {field: {"spec", "keys", "ids"}}, keys in index order."""
+        dumped = {}
+        for field_name, index in self._indices_hash.items():
+            dumped[field_name] = {"spec": self._index_spec(self._fields_map[field_name]),
+                                  "keys": list(index), "ids": [obj.id for obj in index.values()]}
+        for field_name, btree in self._indices_btree.items():
+            keys, ids = [], []
+            for key, objects in btree.items():
+                keys.append(key)
+                ids.append([obj.id for obj in objects])
+            dumped[field_name] = {"spec": self._index_spec(self._fields_map[field_name]), "keys": keys, "ids": ids}
+        for columns, btree in self._indices_composite.items():
+            keys, ids = [], []
+            for key, objects in btree.items():
+                keys.append(tuple(None if v is NULL else v for v in key))
+                ids.append([obj.id for obj in objects])
+            dumped[",".join(columns)] = {"spec": self._composite_spec(columns), "keys": keys, "ids": ids}
+        return dumped
 
-    # ------------------ Queries ------------------ #
-    def get(self, **conditions) -> List[JsonModel]:
+    def save_indices(self) -> bool:
+        """Write the current indices to '<table path>.idx' so the next start can skip rebuilding them.
+
+        Call it at shutdown (after flush() or close() on tables without a WAL). Returns False
+        when the table holds unflushed changes and no WAL, as the file would not match the disk.
+        """
+        if self.index_store is None:
+            raise OperationError("Index Save Error", "Querier was created with 'persist_indices=False'")
+        with self.table.lock.read():
+            generation = self.table.storage_generation()
+            if generation is None:
+                return False
+            self._write_indices(generation)
+        return True
+
+    def _write_indices(self, generation: List[Any]):
+        try:
+            self.index_store.save(generation, self._dump_indices(), list(self.table.dirty_ids))
+        except ValueError as e:
+            raise OperationError("Index Save Error", f"Index keys cannot be saved: {e}") from e
+
+    def _index_key(self, field: Field, val: Any) -> Any:
+        return field.serializer(val) if field.serializer else val
+
+    def _index_add(self, obj: JsonModel):
+        """Add one object to every index: O(1) per hash index, O(log n) per B-Tree."""
+        for field_name, index in self._indices_hash.items():
+            val = getattr(obj, field_name)
+            if val is not None:
+                index[self._index_key(self._fields_map[field_name], val)] = obj
+        for field_name, btree in self._indices_btree.items():
+            val = getattr(obj, field_name)
+            if val is not None:
+                btree.insert(self._index_key(self._fields_map[field_name], val), obj)
+        for columns, btree in self._indices_composite.items():
+            btree.insert(self._composite_key(columns, obj), obj)
+
+    def _index_remove(self, obj: JsonModel):
+        """Remove one object from every index: O(1) per hash index, O(log n) per B-Tree."""
+        for field_name, index in self._indices_hash.items():
+            val = getattr(obj, field_name)
+            if val is not None:
+                key = self._index_key(self._fields_map[field_name], val)
+                if index.get(key) is obj:
+                    del index[key]
+        for field_name, btree in self._indices_btree.items():
+            val = getattr(obj, field_name)
+            if val is not None:
+                btree.delete(self._index_key(self._fields_map[field_name], val), obj)
+        for columns, btree in self._indices_composite.items():
+            btree.delete(self._composite_key(columns, obj), obj)
+
+    def _on_table_change(self, op: str, query_id: Any, old: JsonModel | None, new: JsonModel | None):
+        """Apply a single table write to the indices (JsonTable change listener)."""
+        if op == "reload":
+            if self._indices_hash or self._indices_btree or self._indices_composite:
+                self._load_cache()
+            else:
+                self._cache = self.table.cache
+            return
+        if self._lazy:
+            self._version = self.table.version
+            return
+        if old is not None:
+            self._index_remove(old)
+        if new is not None:
+            self._index_add(new)
+        self._version = self.table.version
+
+    # ------------------ Conditions ------------------ #
+    def _parse_conditions(self, conditions: Dict[str, Any]) -> List[Condition]:
+        """Split 'field__lookup' keys, validate them and serialize the constants once."""
+        parsed = []
+        for key, value in conditions.items():
+            field_name, lookup = key, "exact"
+            if "__" in key:
+                field_name, lookup = key.rsplit("__", 1)
+                if lookup not in LOOKUPS:
+                    raise OperationError("Filter Error", f"Unknown lookup '{lookup}' in '{key}'")
+            if field_name not in self._fields_map:
+                raise OperationError("Filter Error", f"Field '{field_name}' does not exist in model")
+            field = self._fields_map[field_name]
+
+            if lookup == "between":
+                if not isinstance(value, (tuple, list)) or len(value) != 2:
+                    raise OperationError("Filter Error", f"'{key}' expects a (low, high) pair")
+                value = (self._index_key(field, value[0]), self._index_key(field, value[1]))
+            elif lookup == "in":
+                if isinstance(value, (str, bytes)) or not hasattr(value, "__iter__"):
+                    raise OperationError("Filter Error", f"'{key}' expects an iterable of values")
+                value = [self._index_key(field, v) for v in value]
+                try:
+                    value = frozenset(value)
+                except TypeError:
+                    value = tuple(value)
+            elif lookup == "startswith":
+                value = self._index_key(field, value)
+                if not isinstance(value, str):
+                    raise OperationError("Filter Error", f"'{key}' expects a 'str' prefix")
+            else:
+                value = self._index_key(field, value)
+            parsed.append((field_name, lookup, value))
+        return parsed
+
+    def filter(self, **conditions) -> Query:
+        """Start a query with filter conditions. Supports chained calls and 'field__lookup' keys."""
+        return self._query.filter(**conditions)
+
+    def _check_field(self, error: str, field_name: str):
+        if field_name not in self._fields_map:
+            raise OperationError(error, f"Field '{field_name}' does not exist in model")
+
+    # ------------------ Compiled Predicates ------------------ #
+    def _compile(self, conditions: List[Condition]) -> Optional[Callable[[JsonModel], bool]]:
+        """One specialized predicate for all conditions (None when there is nothing to check).
+
+        Code is generated once per query shape (fields and lookups) and reused with new constants.
+        """
+        if not conditions:
+            return None
+        shape = tuple((field_name, lookup) for field_name, lookup, _ in conditions)
+        factory = self._compiled.get(shape)
+        if factory is None:
+            factory = self._compiled[shape] = self._build_predicate_factory(shape)
+        return factory(*[value for _, _, value in conditions])
+
+    def _build_predicate_factory(self, shape: Tuple[Tuple[str, str], ...]) -> Callable[..., Callable[[JsonModel], bool]]:
+        env: Dict[str, Any] = {}
+        params = ", ".join(f"c{i}" for i in range(len(shape)))
+        lines = [f"def _factory({params}):"]
+        for i, (field_name, lookup) in enumerate(shape):
+            if lookup == "between":
+                lines.append(f"    lo{i}, hi{i} = c{i}")
+        lines.append("    def _predicate(obj):")
+        for i, (field_name, lookup) in enumerate(shape):
+            field = self._fields_map[field_name]
+            if field.serializer:
+                env[f"_s{i}"] = field.serializer
+                lines.append(f"        v = _s{i}(obj.{field_name})")
+            else:
+                lines.append(f"        v = obj.{field_name}")
+            if lookup == "exact":
+                test = f"v != c{i}"
+            elif lookup in COMPARISONS:
+                test = f"v is None or not v {COMPARISONS[lookup]} c{i}"
+            elif lookup == "between":
+                test = f"v is None or not lo{i} <= v <= hi{i}"
+            elif lookup == "in":
+                test = f"v is None or v not in c{i}"
+            else:
+                test = f"v is None or not v.startswith(c{i})"
+            lines.append(f"        if {test}:")
+            lines.append("            return False")
+        lines.append("        return True")
+        lines.append("    return _predicate")
+        exec("\n".join(lines), env)
+        return env["_factory"]
+
+    # ------------------ Running Queries ------------------ #
+    def _run(self, conditions: List[Condition]) -> Iterable[JsonModel]:
+        """Lazily yield every object matching the conditions."""
+        candidates, rest = self._get_candidates(conditions)
+        predicate = self._compile(rest)
+        return candidates if predicate is None else filter(predicate, candidates)
+
+    def _conditions(self, query: Query, conditions: Dict[str, Any]) -> List[Condition]:
+        """Conditions of a query plus the ones passed to the call that runs it."""
+        merged = list(query.filters)
         if conditions:
-            self.filter(**conditions)
+            merged.extend(self._parse_conditions(conditions))
+        return merged
+
+    def _window(self, query: Query, limit: Optional[int] = None, offset: Optional[int] = None) -> Window:
+        """(order, limit, offset) of a query, with explicit arguments overriding the chained ones."""
+        order, query_limit, query_offset = query.window
+        limit = query_limit if limit is None else limit
+        offset = query_offset if offset is None else offset
+        self._check_window(limit, offset)
+        return order, limit, offset
+
+    def _check_window(self, limit: Optional[int], offset: int):
+        if limit is not None and (not isinstance(limit, int) or limit < 0):
+            raise OperationError("Query Error", "'limit' must be an 'int' >= 0 or None")
+        if not isinstance(offset, int) or offset < 0:
+            raise OperationError("Query Error", "'offset' must be an 'int' >= 0")
+
+    # ------------------ Ordering / Pagination ------------------ #
+    def order_by(self, field_name: str, desc: bool = False) -> Query:
+        """Sort the results by one field. None values come last in both directions."""
+        return self._query.order_by(field_name, desc)
+
+    def limit(self, n: Optional[int]) -> Query:
+        """Return at most 'n' results (None removes the limit)."""
+        return self._query.limit(n)
+
+    def offset(self, n: int) -> Query:
+        """Skip the first 'n' results."""
+        return self._query.offset(n)
+
+    def _select(self, conditions: List[Condition], window: Window) -> Iterable[JsonModel]:
+        """Lazily yield the matches inside the window, in the requested order.
+
+        An ordered query walks the field's B-Tree and stops once the window is full, unless another
+        index is expected to be cheaper. Otherwise matches go through a bounded heap (top-k).
+        """
+        order, limit, offset = window
+        stop = None if limit is None else offset + limit
+        if order is None:
+            return islice(self._run(conditions), offset, stop)
+
+        field_name, desc = order
+        if field_name in self._indices_btree and self._walk_is_cheaper(conditions, field_name, stop):
+            return islice(self._walk_ordered(conditions, field_name, desc), offset, stop)
+
+        key = self._sort_key(field_name, desc)
+        matches = self._run(conditions)
+        if stop is None:
+            ordered = sorted(matches, key=key, reverse=desc)
+        elif desc:
+            ordered = heapq.nlargest(stop, matches, key=key)
+        else:
+            ordered = heapq.nsmallest(stop, matches, key=key)
+        return islice(ordered, offset, None)
+
+    def _sort_key(self, field_name: str, desc: bool) -> Callable[[JsonModel], Tuple[bool, Any]]:
+        """Key on the serialized value (as indexed), placing None last for either direction."""
+        serializer = self._fields_map[field_name].serializer
+        get = attrgetter(field_name)
+        def key(obj):
+            v = get(obj)
+            if v is None:
+                return (not desc, None)
+            return (desc, serializer(v) if serializer else v)
+        return key
+
+    # ------------------ Result Cache ------------------ #
+    def _cached(self, key: Tuple[Any, ...], merged: List[Condition], compute: Callable[[], Any]) -> Any:
+        """Serve 'compute()' from the result cache when enabled. The key is the query kind plus
+        the normalized conditions, so the same query written in any order hits the same entry.
+        Runs under the table read lock, so it never sees a write half applied."""
+        return self._timed(self._lookup, key, merged, compute)
 
-        merged_filters = self._filters.copy()
-        self._filters.clear()
+    def _timed(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a query, recorded as "query" when the table has metrics enabled."""
+        metrics = self.table.metrics
+        if metrics is None:
+            return func(*args)
+        return metrics.timed("query", func)(*args)
 
-        index_conditions = {k: v for k, v in conditions.items()
-                            if k in self._indices_hash or k in self._indices_btree}
-        candidates = self._get_candidates(index_conditions)
+    def _lookup(self, key: Tuple[Any, ...], merged: List[Condition], compute: Callable[[], Any]) -> Any:
+        with self.table.lock.read():
+            if self.result_cache is None:
+                return compute()
+            key = key + tuple(sorted(merged, key=lambda c: (c[0], c[1], repr(c[2]))))
+            if not hashable(key):
+                return compute()
+            version = self.table.version
+            value = self.result_cache.get(key, version)
+            if value is MISS:
+                value = compute()
+                self.result_cache.put(key, version, value)
+            return value
 
-        return [obj for obj in candidates if all(f(obj) for f in merged_filters)]
+    # ------------------ Queries ------------------ #
+    def get(self, **conditions) -> List[JsonModel]:
+        return self._get(self._query, conditions)
 
     def first(self, **conditions) -> JsonModel | None:
-        if conditions:
-            self.filter(**conditions)
+        """First match, streaming candidates and stopping at the first hit."""
+        return self._first(self._query, conditions)
 
-        merged_filters = self._filters.copy()
-        self._filters.clear()
+    def iter(self, limit: Optional[int] = None, offset: Optional[int] = None, **conditions) -> Iterator[JsonModel]:
+        """Lazily yield matches, skipping 'offset' and stopping after 'limit' of them.
 
-        index_conditions = {k: v for k, v in conditions.items()
-                            if k in self._indices_hash or k in self._indices_btree}
-        candidates = self._get_candidates(index_conditions)
+        Nothing is materialized (except the top-k heap of an order_by() without a usable index):
+        peak memory stays bounded however many rows match. The table must not be changed while
+        the iterator is consumed (hold 'table.lock.read()' around the loop on a shared table).
+        """
+        return self._iter(self._query, limit, offset, conditions)
 
-        for obj in candidates:
-            if all(f(obj) for f in merged_filters):
-                return obj
-        return None
+    def values(self, *field_names: str, **conditions) -> List[Tuple[Any, ...]]:
+        """Tuples of the given fields for every match (respecting order_by / limit / offset).
+
+        Without ordering or paging, a composite index holding every requested and filtered field
+        answers from its keys alone: no row object is touched.
+        """
+        return self._values(self._query, field_names, conditions)
 
     def count(self, **conditions) -> int:
-        return len(self.get(**conditions))
+        """Number of matches inside the limit / offset window (if any)."""
+        return self._count(self._query, conditions)
+
+    def _get(self, query: Query, conditions: Dict[str, Any]) -> List[JsonModel]:
+        window = self._window(query)
+        merged = self._conditions(query, conditions)
+        if self._columnar:
+            # Lazy sequence: rows are only materialized when read
+            return self._cached(("get",) + window, merged, lambda: self.table.result(self._columnar_rows(merged, window)))
+        result = self._cached(("get",) + window, merged, lambda: list(self._select(merged, window)))
+        return list(result) if self.result_cache is not None else result
+
+    def _first(self, query: Query, conditions: Dict[str, Any]) -> JsonModel | None:
+        order, _, offset = self._window(query)
+        window = (order, 1, offset)
+        merged = self._conditions(query, conditions)
+        if self._columnar:
+            def compute():
+                result = self.table.result(self._columnar_rows(merged, window))
+                return result[0] if len(result) else None
+            return self._cached(("first",) + window, merged, compute)
+        return self._cached(("first",) + window, merged, lambda: next(iter(self._select(merged, window)), None))
+
+    def _iter(self, query: Query, limit: Optional[int], offset: Optional[int],
+              conditions: Dict[str, Any]) -> Iterator[JsonModel]:
+        window = self._window(query, limit, offset)
+        merged = self._conditions(query, conditions)
+        return iter(self._matches(merged, window))
+
+    def _values(self, query: Query, field_names: Tuple[str, ...], conditions: Dict[str, Any]) -> List[Tuple[Any, ...]]:
+        if not field_names:
+            raise OperationError("Query Error", "values() needs at least one field")
+        for field_name in field_names:
+            self._check_field("Query Error", field_name)
+        window = self._window(query)
+        merged = self._conditions(query, conditions)
+
+        def compute():
+            if window == NO_WINDOW:
+                covered = self._covering_values(field_names, merged)
+                if covered is not None:
+                    return covered
+            getters = [attrgetter(field_name) for field_name in field_names]
+            if self._columnar:
+                rows = self.table.result(self._columnar_rows(merged, window))
+            else:
+                rows = self._select(merged, window)
+            return [tuple(get(obj) for get in getters) for obj in rows]
+        result = self._cached(("values", field_names) + window, merged, compute)
+        return list(result) if self.result_cache is not None else result
+
+    def _covering_values(self, field_names: Tuple[str, ...], conditions: List[Condition]) -> Optional[List[Tuple[Any, ...]]]:
+        """Projection read from the keys of a composite index covering every field involved."""
+        needed = set(field_names) | {c[0] for c in conditions}
+        for columns, btree in self._indices_composite.items():
+            if not needed <= set(columns) or any(self._fields_map[c].serializer for c in columns):
+                continue
+            plan = self._plan_composite(conditions, [columns])
+            bounds, used = (plan[3], plan[2]) if plan is not None else ((None, None, True, True), [])
+            position = {column: i for i, column in enumerate(columns)}
+            checks = [(position[c[0]], c[1], c[2]) for c in conditions if not any(c is u for u in used)]
+            picks = [position[f] for f in field_names]
+            result: List[Tuple[Any, ...]] = []
+            for key, objects in btree.items(*bounds):
+                if checks and not all(self._key_matches(key[i], lookup, value) for i, lookup, value in checks):
+                    continue
+                result.extend([tuple(None if key[i] is NULL else key[i] for i in picks)] * len(objects))
+            return result
+        return None
+
+    def _key_matches(self, key: Any, lookup: str, value: Any) -> bool:
+        """One condition checked against a composite key column (NULL stands for None)."""
+        if key is NULL:
+            return (lookup == "exact" and value is None) or (lookup == "in" and None in value)
+        if value is None:
+            return False
+        return LOOKUPS[lookup](key, value)
+
+    def _count(self, query: Query, conditions: Dict[str, Any]) -> int:
+        _, limit, offset = self._window(query)
+        merged = self._conditions(query, conditions)
+        if self._columnar:
+            total = self._cached(("count",), merged, lambda: len(self.table.select(merged, LOOKUPS)))
+        else:
+            total = self._cached(("count",), merged, lambda: self._count_matches(merged))
+        total = max(total - offset, 0)
+        return total if limit is None else min(total, limit)
+
+    def _columnar_rows(self, conditions: List[Condition], window: Window) -> Any:
+        """Row numbers of a ColumnarTable query, ordered and cut to the window."""
+        order, limit, offset = window
+        stop = None if limit is None else offset + limit
+        rows = self.table.select(conditions, LOOKUPS)
+        if order is not None:
+            rows = self.table.order(rows, order[0], order[1], stop)
+        return rows[offset:stop]
+
+    def _matches(self, merged: List[Condition], window: Window) -> Iterable[JsonModel]:
+        if self._columnar:
+            return self.table.result(self._columnar_rows(merged, window))
+        return self._select(merged, window)
+
+    def _count_matches(self, conditions: List[Condition]) -> int:
+        """Count from index cardinalities when one index answers the whole query."""
+        if not conditions:
+            return len(self._cache)
+        if self._indices_composite:
+            composite = self._plan_composite(conditions)
+            if composite is not None and len(composite[2]) == len(conditions):
+                # Covering count: value-list lengths of the slice
+                btree = self._indices_composite[composite[1]]
+                return sum(len(values) for _, values in btree.items(*composite[3]))
+        if len(conditions) == 1:
+            plan = self._plan(conditions)
+            if plan is not None:
+                return self._index_count(plan[1])
+        return sum(1 for _ in self._run(conditions))
+
+    def _index_count(self, cond: Condition) -> int:
+        """Rows matching one indexed condition, read from value-list lengths (no row is touched)."""
+        field_name, lookup, value = cond
+        if field_name in self._indices_hash:
+            index = self._indices_hash[field_name]
+            return sum(1 for k in ([value] if lookup == "exact" else value) if k in index)
+        btree = self._indices_btree[field_name]
+        if lookup == "exact":
+            return len(btree.search(value))
+        if lookup == "in":
+            return sum(len(btree.search(v)) for v in value)
+        return sum(len(values) for _, values in btree.items(*self._range_bounds(lookup, value)))
+
+    # ------------------ Aggregates ------------------ #
+    def sum(self, field_name: str, **conditions) -> Any:
+        return self._aggregate(self._query, "sum", field_name, conditions)
+
+    def avg(self, field_name: str, **conditions) -> Any:
+        return self._aggregate(self._query, "avg", field_name, conditions)
+
+    def min(self, field_name: str, **conditions) -> Any:
+        return self._aggregate(self._query, "min", field_name, conditions)
+
+    def max(self, field_name: str, **conditions) -> Any:
+        return self._aggregate(self._query, "max", field_name, conditions)
+
+    def _aggregate(self, query: Query, func: str, field_name: str, conditions: Dict[str, Any]) -> Any:
+        """Aggregate a field over the matching rows (None values are skipped)."""
+        check_aggregate(func, field_name, self._fields_map)
+        merged = self._conditions(query, conditions)
+        name = result_name(func, field_name)
+        return self._cached((func, field_name), merged, lambda: self._compute_aggregates([(func, field_name)], merged)[name])
+
+    def group_by(self, field_name: str) -> Query:
+        """Make aggregate() return one result per distinct value of 'field_name'."""
+        return self._query.group_by(field_name)
+
+    def aggregate(self, **specs: str | Iterable[str]) -> Dict[Any, Any]:
+        """Several aggregates of the filtered rows in a single streaming pass.
+
+        Keywords are functions (sum, avg, min, max, count, distinct), values a field name or a list
+        of them ('*' counts rows): aggregate(sum="balance", count="*") -> {"balance__sum": ..., "count": ...}.
+        After group_by(field) the result maps each value of that field to such a dict.
+        """
+        return self._aggregates(self._query, specs)
+
+    def _aggregates(self, query: Query, specs: Dict[str, str | Iterable[str]]) -> Dict[Any, Any]:
+        parsed: List[Spec] = []
+        for func, field_names in specs.items():
+            for field_name in ([field_names] if isinstance(field_names, str) else field_names):
+                check_aggregate(func, field_name, self._fields_map)
+                parsed.append((func, field_name))
+        if not parsed:
+            raise OperationError("Aggregate Error", f"aggregate() needs at least one of {AGGREGATES}")
+
+        group = query.group
+        merged = self._conditions(query, {})
+        key = ("aggregate", group, tuple(parsed))
+        if group is None:
+            return dict(self._cached(key, merged, lambda: self._compute_aggregates(parsed, merged)))
+        result = self._cached(key, merged, lambda: self._compute_groups(group, parsed, merged))
+        return {value: dict(results) for value, results in result.items()}
+
+    def _compute_aggregates(self, specs: List[Spec], merged: List[Condition]) -> Dict[str, Any]:
+        try:
+            if self._columnar:
+                return self._columnar_results(specs, self.table.select(merged, LOOKUPS))
+            results = self._index_aggregates(specs, merged)
+            if results is None:
+                results = self._fold(self._run(merged), specs)
+            return results
+        except TypeError as e:
+            raise OperationError("Aggregate Error", f"Cannot aggregate these values: {e}") from e
+
+    def _compute_groups(self, group: str, specs: List[Spec], merged: List[Condition]) -> Dict[Any, Dict[str, Any]]:
+        try:
+            if self._columnar:
+                rows = self.table.select(merged, LOOKUPS)
+                return {value: self._columnar_results(specs, sub) for value, sub in self.table.group(rows, group)}
+            results = self._index_groups(group, specs, merged)
+            if results is None:
+                results = self._fold_groups(group, self._run(merged), specs)
+            return results
+        except TypeError as e:
+            raise OperationError("Aggregate Error", f"Cannot aggregate or group these values: {e}") from e
+
+    def _columnar_results(self, specs: List[Spec], rows: Any) -> Dict[str, Any]:
+        return {result_name(func, field_name): len(rows) if field_name == ALL_ROWS
+                else self.table.aggregate(func, field_name, rows) for func, field_name in specs}
+
+    # ------------------ Streaming Folds ------------------ #
+    def _accumulators(self, specs: List[Spec]) -> Dict[str, Accumulator]:
+        funcs: Dict[str, List[str]] = {}
+        for func, field_name in specs:
+            if field_name != ALL_ROWS:
+                funcs.setdefault(field_name, []).append(func)
+        return {field_name: Accumulator(field_funcs) for field_name, field_funcs in funcs.items()}
+
+    def _results(self, specs: List[Spec], rows: int, accumulators: Dict[str, Accumulator]) -> Dict[str, Any]:
+        return {result_name(func, field_name): rows if field_name == ALL_ROWS
+                else accumulators[field_name].result(func) for func, field_name in specs}
+
+    def _fold(self, objects: Iterable[JsonModel], specs: List[Spec]) -> Dict[str, Any]:
+        """Every aggregate in one pass over the objects, nothing materialized."""
+        accumulators = self._accumulators(specs)
+        feeds = [(attrgetter(field_name), acc.add) for field_name, acc in accumulators.items()]
+        rows = 0
+        for obj in objects:
+            rows += 1
+            for get, add in feeds:
+                add(get(obj))
+        return self._results(specs, rows, accumulators)
+
+    def _fold_groups(self, group: str, objects: Iterable[JsonModel], specs: List[Spec]) -> Dict[Any, Dict[str, Any]]:
+        """One pass, one set of accumulators per group value (None values form their own group)."""
+        get_group = attrgetter(group)
+        getters = {field_name: attrgetter(field_name) for field_name in self._accumulators(specs)}
+        groups: Dict[Any, List[Any]] = {}  # value -> [rows, accumulators]
+        for obj in objects:
+            value = get_group(obj)
+            state = groups.get(value)
+            if state is None:
+                state = groups[value] = [0, self._accumulators(specs)]
+            state[0] += 1
+            for field_name, acc in state[1].items():
+                acc.add(getters[field_name](obj))
+        return {value: self._results(specs, rows, accumulators) for value, (rows, accumulators) in groups.items()}
+
+    # ------------------ Index-Only Aggregates ------------------ #
+    def _index_pairs(self, field_name: str, cond: Optional[Condition], reverse: bool = False) -> Optional[Iterable[Tuple[Any, int]]]:
+        """(value, row count) pairs read from the field's index, narrowed by a condition on the same
+        field. B-Tree pairs come in key order. None when the index cannot answer."""
+        field = self._fields_map[field_name]
+        if field.serializer:
+            return None  # Index keys are serialized values, not the model values
+        if cond is not None and (cond[0] != field_name or cond[2] is None):
+            return None
+        lookup, value = (None, None) if cond is None else cond[1:]
+
+        if field_name in self._indices_btree:
+            btree = self._indices_btree[field_name]
+            if lookup == "exact":
+                values = btree.search(value)
+                return [(value, len(values))] if values else []
+            if lookup == "in":
+                return [(v, len(btree.search(v))) for v in value if v is not None and btree.search(v)]
+            bounds = (None, None, True, True) if cond is None else self._range_bounds(lookup, value)
+            return ((key, len(values)) for key, values in btree.items(*bounds, reverse=reverse))
+
+        if field_name in self._indices_hash:
+            index = self._indices_hash[field_name]
+            if cond is None:
+                return ((key, 1) for key in index)
+            if lookup not in ("exact", "in") or not hashable(value):
+                return None
+            return [(v, 1) for v in ([value] if lookup == "exact" else value) if v is not None and v in index]
+        return None
+
+    def _index_value(self, func: str, field_name: str, cond: Optional[Condition]) -> Any:
+        """One aggregate from the index alone (MISS if it cannot answer): min / max from the
+        B-Tree ends, counts from value-list lengths, distinct counts from the number of keys."""
+        if func in ("min", "max"):
+            ordered = field_name in self._indices_btree and (cond is None or cond[1] != "in")
+            pairs = self._index_pairs(field_name, cond, reverse=func == "max" and ordered)
+            if pairs is None:
+                return MISS
+            if ordered:
+                first = next(iter(pairs), None)
+                return None if first is None else first[0]
+            keys = [key for key, _ in pairs]
+            return (min if func == "min" else max)(keys, default=None)
+        pairs = self._index_pairs(field_name, cond)
+        return MISS if pairs is None else key_stats(func, pairs)
+
+    def _index_aggregates(self, specs: List[Spec], merged: List[Condition]) -> Optional[Dict[str, Any]]:
+        """Aggregates answered without touching rows, or None."""
+        if self._columnar or len(merged) > 1:
+            return None
+        cond = merged[0] if merged else None
+        results = {}
+        for func, field_name in specs:
+            if field_name == ALL_ROWS:
+                if cond is None:
+                    value = len(self._cache)
+                elif self._plan([cond]) is not None:
+                    value = self._index_count(cond)
+                else:
+                    return None
+            else:
+                value = self._index_value(func, field_name, cond)
+                if value is MISS:
+                    return None
+            results[result_name(func, field_name)] = value
+        return results
+
+    def _index_groups(self, group: str, specs: List[Spec], merged: List[Condition]) -> Optional[Dict[Any, Dict[str, Any]]]:
+        """Groups read from the group field's index: row counts are value-list lengths. Only when
+        every aggregate is on '*' or on the group field itself, and any condition is on it too."""
+        if len(merged) > 1 or any(field_name not in (ALL_ROWS, group) for _, field_name in specs):
+            return None
+        cond = merged[0] if merged else None
+        pairs = self._index_pairs(group, cond)
+        if pairs is None:
+            return None
+        groups, indexed = {}, 0
+        for value, rows in pairs:
+            indexed += rows
+            groups[value] = self._key_results(specs, value, rows)
+        if cond is None and len(self._cache) > indexed:
+            groups[None] = self._key_results(specs, None, len(self._cache) - indexed)  # Not indexed
+        return groups
+
+    def _key_results(self, specs: List[Spec], value: Any, rows: int) -> Dict[str, Any]:
+        """Aggregates of 'rows' rows that all hold 'value' in the aggregated field."""
+        results = {}
+        for func, field_name in specs:
+            if field_name == ALL_ROWS:
+                result = rows
+            elif value is None:
+                result = 0 if func in ("sum", "count", "distinct") else None
+            elif func == "count":
+                result = rows
+            elif func == "distinct":
+                result = 1
+            elif func == "sum":
+                result = value * rows
+            else:
+                result = value
+            results[result_name(func, field_name)] = result
+        return results
@@ -1,55 +1,520 @@
 import os
+import time
+import threading
+import weakref
+from contextlib import nullcontext
 import orjson
 from fastjson_db.core import JsonModel
 from fastjson_db.errors import HeritageError, BadTypingError, OperationError
-from typing import Dict
+from fastjson_db.log import ChangeFeed, JsonJournal, SegmentStore, FlushStats
+from fastjson_db.log.json_journal import verify_snapshot, write_snapshot
+from fastjson_db.log.jsonl_file import DEFAULT_CHUNK, iter_jsonl, verify_jsonl, write_jsonl
+from fastjson_db.log.parallel_load import Columns, parse_range, snapshot_ranges
+from concurrent.futures import Executor
+from .rw_lock import NoLock, ProcessLock, RWLock, compaction_locked, write_locked
+from .metrics import Metrics, MetricsHook, instrument, uninstrument
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+FILE_FORMATS = ("json", "jsonl")  # One JSON array, or JSON Lines (one row per line, streamed)
+
+# Change listener signature: (op, id, old_instance, new_instance)
+# op is "insert", "update", "remove" or "reload" (whole cache replaced, id/old/new are None)
+ChangeListener = Callable[[str, Any, Optional[JsonModel], Optional[JsonModel]], None]
 
 class JsonTable:
     """Represents a Table of a specific Model with validated fast in-memory cache."""
 
-    def __init__(self, model: type[JsonModel], path: str | os.PathLike):
+    def __init__(self, model: type[JsonModel], path: str | os.PathLike, wal: bool = False,
+                 sync_every: int = 1, sync_interval_ms: Optional[float] = None,
+                 trusted: Optional[bool] = None, verify_sample: float = 0.0, compact_after: int = 8,
+                 file_format: str = "json", thread_safe: bool = False, shared: bool = False):
         if not issubclass(model, JsonModel):
             raise HeritageError("JsonTable Creation Error", "'model' field should be a JsonModel subclass")
         if not isinstance(path, (str, os.PathLike)):
             raise BadTypingError("JsonTable Creation Error", "'path' must be a 'str' or 'os.PathLike'")
+        if trusted not in (None, True, False):
+            raise BadTypingError("JsonTable Creation Error", "'trusted' must be a 'bool' or None")
+        if not 0.0 <= verify_sample <= 1.0:
+            raise OperationError("JsonTable Creation Error", "'verify_sample' must be between 0.0 and 1.0")
+        if not isinstance(compact_after, int) or compact_after < 0:
+            raise BadTypingError("JsonTable Creation Error", "'compact_after' must be an 'int' >= 0")
+        if file_format not in FILE_FORMATS:
+            raise OperationError("JsonTable Creation Error", f"'file_format' must be one of {FILE_FORMATS}")
+        if shared and not wal:
+            raise OperationError("JsonTable Creation Error", "'shared' tables need 'wal=True': the WAL is their change feed")
 
         self.model = model
         self.path = os.fspath(path)
+        self.file_format = file_format
         self.cache: Dict[int, JsonModel] = {}  # Store objects directly for speed
 
-    def _load_cache(self):
-        """Load JSON from file into cache (objects stored directly)."""
+        # Load-time hydration: trusted rows skip __init__ validation
+        # None trusts the snapshot only when its '.crc32' sidecar (written by the engine) matches
+        self.trusted = trusted
+        self.verify_sample = verify_sample  # Fraction of trusted rows still fully validated
+
+        # Write-ahead journal: every mutation is appended to '<path>.log' before touching the cache
+        self.journal: Optional[JsonJournal] = None
+        if wal:
+            self.journal = JsonJournal(self.path, sync_every=sync_every, sync_interval_ms=sync_interval_ms)
+
+        # Incremental flushes: rows changed since the last flush go to a new '<path>.seg.<N>' file
+        self.segments = SegmentStore(self.path, file_format)
+        self.compact_after = compact_after  # Compact in background once N segments exist (0 disables)
+        self.flush_stats = FlushStats()
+        self._dirty: Set[Any] = set()
+        # Held while the base file and segments are swapped, and by every load reading them
+        # (re-entrant: checkpoint() flushes under it, and a shared flush may reload)
+        self._compaction_lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+
+        # Write version, bumped on every mutation, plus change listeners (e.g. JsonQuerier indices)
+        self.version = 0
+        self._listeners: List[Callable[[], Optional[ChangeListener]]] = []
+
+        # Readers share 'lock.read()', writes (and the index updates they trigger) hold 'lock.write()'
+        self.thread_safe = thread_safe
+        self.lock = RWLock() if thread_safe else NoLock()
+
+        # Shared by several processes: writes hold a file lock ('<path>.lock'), and each process
+        # follows the others' WAL records (see poll) instead of reloading the table
+        self.shared = shared
+        self.feed: Optional[ChangeFeed] = None
+        if shared:
+            self.lock = ProcessLock(f"{self.path}.lock", self.lock)
+            self.feed = ChangeFeed(self.journal.wal.path)
+
+        # Opt-in operation counters and latency histograms (see enable_metrics)
+        self.metrics: Optional[Metrics] = None
+
+    # ------------------ Metrics ------------------ #
+    def enable_metrics(self, hook: Optional[MetricsHook] = None) -> Metrics:
+        """Count and time insert / update / remove / get / load / flush, and the queries of this
+        table's queriers. 'hook(table, op, seconds, ok)' is called after each one.
+
+        Disabled tables pay nothing: the timed methods are only wrapped while metrics are on.
+        """
+        if self.metrics is None:
+            self.metrics = Metrics(self.model.__name__, hook)
+            instrument(self, self.metrics)
+        else:
+            self.metrics.hook = hook
+        return self.metrics
+
+    def disable_metrics(self):
+        """Remove the timing wrappers. The last Metrics object keeps its figures."""
+        uninstrument(self)
+        self.metrics = None
+
+    # ------------------ Change Events ------------------ #
+    def subscribe(self, listener: ChangeListener):
+        """Register a listener called after every mutation. Bound methods are held weakly."""
+        if hasattr(listener, "__self__"):
+            self._listeners.append(weakref.WeakMethod(listener))
+        else:
+            self._listeners.append(lambda: listener)
+
+    def unsubscribe(self, listener: ChangeListener):
+        """Remove a listener registered with subscribe()."""
+        self._listeners = [ref for ref in self._listeners if ref() not in (None, listener)]
+
+    def _publish(self, op: str, query_id: Any, old: Optional[JsonModel], new: Optional[JsonModel]):
+        self.version += 1
+        if op != "reload":
+            self._dirty.add(query_id)
+        dead = False
+        for ref in self._listeners:
+            listener = ref()
+            if listener is None:
+                dead = True
+            else:
+                listener(op, query_id, old, new)
+        if dead:
+            self._listeners = [ref for ref in self._listeners if ref() is not None]
+
+    # ------------------ Change Feed ------------------ #
+    def poll(self) -> int:
+        """Apply the changes other processes made to a shared table since the last poll, updating
+        the cache and the queriers' indices. Returns the number of changes applied.
+
+        Costs one stat() when nothing changed. A table never loaded, or whose WAL was flushed twice
+        since the last poll, is reloaded from disk instead (counted as one change per row).
+        """
+        if not self.shared:
+            raise OperationError("Poll Error", "Only tables created with 'shared=True' have a change feed")
+        if self.feed.seq is not None and not self.feed.changed():
+            return 0
+        with self.lock.write():
+            return self._follow()
+
+    def _follow(self) -> int:
+        """Catch up with the WAL records of other processes (under the file lock)."""
+        records = self.feed.read() if self.feed.seq is not None else None
+        if records is None:
+            self._load_cache()
+            return len(self.cache)
+        applied = 0
+        for record in records:
+            if record["op"] == "checkpoint":
+                self._dirty.clear()  # Everything logged up to here was flushed by its writer
+            else:
+                self._apply_change(record["op"], record["id"], record.get("data"))
+                applied += 1
+        self.journal.wal.follow(self.feed.seq)  # Our next record follows theirs
+        return applied
+
+    def _apply_change(self, op: str, query_id: Any, row: Optional[Dict[str, Any]]):
+        """Apply one change read from the WAL, without logging it again."""
+        old = self.cache.get(query_id)
+        if op == "put":
+            # Log records are only ever written by the engine
+            new = self._hydrate(row) if self.trusted is False else self.model._trusted_hydrate(row)
+            self.cache[query_id] = new
+            self._publish("insert" if old is None else "update", query_id, old, new)
+        elif old is not None:
+            del self.cache[query_id]
+            self._publish("remove", query_id, old, None)
+
+    def _published(self, rewritten: bool = False):
+        """Make our WAL records readable by the other processes, and skip them in our own feed."""
+        self.journal.wal.flush()
+        self.feed.mark(self.journal.wal.seq, rewritten)
+
+    def _hydrate(self, item: Dict[str, Any]) -> JsonModel:
+        """Build a validated model instance from a stored row."""
+        return self.model.from_json(item)
+
+    def _hydrate_rows(self, data: List[Dict[str, Any]], trusted: bool) -> Dict[Any, JsonModel]:
+        """Hydrate every row, through the compiled trusted path when allowed."""
+        if not trusted:
+            hydrate = self.model.from_json
+            return {item['id']: hydrate(item) for item in data}
+
+        fast = self.model._trusted_hydrate
+        if not self.verify_sample:
+            return {item['id']: fast(item) for item in data}
+
+        # Fully validate every k-th row to catch a corrupted or foreign file
+        stride = max(1, round(1 / self.verify_sample))
+        cache = {}
+        for n, item in enumerate(data):
+            if n % stride:
+                cache[item['id']] = fast(item)
+            else:
+                try:
+                    cache[item['id']] = self.model.from_json(item)
+                except Exception as e:
+                    raise OperationError("Load Error", f"Row {item.get('id')!r} failed verification: {e}") from e
+        return cache
+
+    def _read_snapshot(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """Read the whole snapshot, returning its rows and whether they can be trusted."""
+        if self.file_format == "jsonl":
+            data, trusted = [], True
+            for chunk, trusted in self._iter_snapshot():
+                data.extend(chunk)
+            return data, trusted
         try:
             with open(self.path, 'rb') as f:
-                data = orjson.loads(f.read())
-                # Store model instances directly, avoiding extra dict creation
-                self.cache = {item['id']: self.model(**item) for item in data}
+                payload = f.read()
+            data = orjson.loads(payload)
         except FileNotFoundError:
             print(f"Warning: '{self.path}' not found. Starting empty table.")
-            self.cache = {}
+            return [], True
         except orjson.JSONDecodeError as e:
             print(f"Error decoding JSON: {e}")
-            self.cache = {}
+            return [], True
+        trusted = self.trusted
+        if trusted is None:
+            trusted = verify_snapshot(self.path, payload) is True
+        return data, trusted
+
+    def _iter_snapshot(self, chunk_size: int = DEFAULT_CHUNK) -> Iterator[Tuple[List[Dict[str, Any]], bool]]:
+        """Yield (rows, trusted) chunks of the snapshot. JSON Lines files are streamed, never read whole."""
+        if self.file_format == "json":
+            yield self._read_snapshot()
+            return
+        if not os.path.exists(self.path):
+            print(f"Warning: '{self.path}' not found. Starting empty table.")
+            return
+        trusted = self.trusted
+        if trusted is None:
+            trusted = verify_jsonl(self.path) is True
+        for chunk in iter_jsonl(self.path, chunk_size):
+            yield chunk, trusted
+
+    def _replay_journal(self) -> Iterator[Tuple[str, Any, Optional[Dict[str, Any]]]]:
+        """Yield (op, id, row) logged since the last flush, then reopen the log for appends."""
+        if self.journal is None:
+            return
+        self.journal.close()
+        for op, key, row in self.journal.replay():
+            self._dirty.add(key)  # Only in the log: the next flush must persist it
+            yield op, key, row
+        if self.feed is not None:
+            self.feed.mark(self.journal.wal.seq)
+        self.journal.open()
+
+    def _replay_changes(self) -> Iterator[Tuple[str, Any, Optional[Dict[str, Any]]]]:
+        """Every change newer than the base table: flushed segments, then the WAL."""
+        return chain(self.segments.replay(), self._replay_journal())
+
+    @write_locked
+    @compaction_locked
+    def _load_cache(self, pool: Optional[Executor] = None):
+        """Load JSON from file into cache (objects stored directly), then replay the WAL on top.
+
+        With a process 'pool', a large JSON Lines snapshot is split into byte ranges parsed and
+        validated by its workers, which send columns back instead of pickled objects.
+        """
+        self._dirty.clear()
+        # Store model instances directly, avoiding extra dict creation
+        self.cache = {}
+        ranges = snapshot_ranges(self.path, self.file_format, os.cpu_count() or 1) if pool is not None else []
+        if ranges:
+            id_column = list(self.model._fields).index("id")
+            hydrate = self.model._trusted_hydrate_values  # Rows were validated by the workers
+            for columns in self._parse_parallel(pool, ranges):
+                self.cache.update(zip(columns[id_column], map(hydrate, *columns)))
+        else:
+            for data, trusted in self._iter_snapshot():
+                self.cache.update(self._hydrate_rows(data, trusted))
+
+        # Segments and log records are only ever written by the engine
+        hydrate = self._hydrate if self.trusted is False else self.model._trusted_hydrate
+        for op, key, row in self._replay_changes():
+            if op == "put":
+                self.cache[key] = hydrate(row)
+            else:
+                self.cache.pop(key, None)
+
+        self._publish("reload", None, None, None)
+
+    def _parse_parallel(self, pool: Executor, ranges: List[Tuple[int, int]]) -> Iterator[Columns]:
+        """Columns of each byte range of the snapshot, parsed by 'pool' and yielded in file order."""
+        trusted = self.trusted
+        if trusted is None:
+            trusted = verify_jsonl(self.path) is True  # Streams the file against its '.crc32'
+        if not trusted:
+            stride = 1
+        else:
+            stride = max(1, round(1 / self.verify_sample)) if self.verify_sample else 0
+        names = list(self.model._fields)
+        futures = [pool.submit(parse_range, self.path, start, end, names,
+                               self.model if stride else None, stride) for start, end in ranges]
+        for future in futures:
+            try:
+                yield future.result()
+            except ValueError as e:
+                raise OperationError("Load Error", str(e)) from e
+
+    def _dump_rows(self) -> Iterator[Dict[str, Any]]:
+        """Serialized rows, as written to the .json table."""
+        return (obj.to_json() for obj in self.cache.values())
+
+    def _row_json(self, query_id: Any) -> Dict[str, Any]:
+        """Serialized row of one ID."""
+        return self.cache[query_id].to_json()
+
+    # ------------------ Flush / Compaction ------------------ #
+    @property
+    def dirty_count(self) -> int:
+        """Rows changed since the last flush."""
+        return len(self._dirty)
+
+    @property
+    def dirty_ids(self) -> Set[Any]:
+        """IDs changed since the last flush: the rows that differ from the storage generation."""
+        return set(self._dirty)
+
+    @write_locked
+    def flush(self) -> int:
+        """Persist only the rows changed since the last flush as a new segment file.
+
+        Cost scales with the number of changes, not with the table size. The WAL is
+        truncated afterwards. Returns the number of rows written.
+        """
+        if self.shared:
+            self._follow()
+        start = time.perf_counter()
+        dirty, self._dirty = self._dirty, set()
+        if dirty:
+            records = []
+            for key in dirty:
+                if key in self.cache:
+                    records.append({"op": "put", "id": key, "data": self._row_json(key)})
+                else:
+                    records.append({"op": "delete", "id": key})
+            self.segments.write(records)
+        if self.journal is not None:
+            self._truncate_journal()
+        self.flush_stats.record_flush(len(dirty), time.perf_counter() - start)
+
+        if self.compact_after and len(self.segments.segment_numbers()) >= self.compact_after:
+            self.compact(background=True)
+        return len(dirty)
+
+    def _truncate_journal(self):
+        # Shared tables keep the last generation of records for the processes following them
+        self.journal.truncate(keep=self.shared)
+        if self.shared:
+            self._published(rewritten=True)
+
+    def compact(self, background: bool = False):
+        """Merge the base table and its segments on disk into a fresh base table.
+
+        With background=True it runs in a thread while the table keeps serving reads, writes and flushes.
+        """
+        if not background:
+            self._run_compaction()
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._run_compaction, name=f"compact:{self.path}", daemon=True)
+        self._compactor.start()
+
+    def _run_compaction(self):
+        # Loads of this process wait on the compaction lock; shared tables also hold the file
+        # lock, so no other process flushes or loads while the base file is rewritten
+        with self.lock.exclusive() if self.shared else nullcontext(), self._compaction_lock:
+            numbers = self.segments.segment_numbers()
+            if not numbers:
+                return
+            start = time.perf_counter()
+            self._compact_segments(numbers)
+            self.flush_stats.record_compaction(time.perf_counter() - start)
+
+    def _compact_segments(self, numbers: List[int]):
+        """Fold the given segment files into the base table file (runs under the compaction lock)."""
+        self.segments.compact(numbers)
+
+    def _write_base(self):
+        """Rewrite the base table file from the cache."""
+        if self.file_format == "jsonl":
+            write_jsonl(self.path, self._dump_rows(), checksum=True)
+        else:
+            write_snapshot(self.path, orjson.dumps(list(self._dump_rows())))
+
+    def wait_compaction(self):
+        """Block until a background compaction (if any) is done."""
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    @compaction_locked
+    def storage_generation(self) -> Optional[List[Any]]:
+        """Token identifying the flushed state the cache is built on: base file and segments.
+
+        Rows logged to the WAL since the last flush are not part of it (see dirty_ids), so logged
+        writes leave it unchanged. None when the cache holds changes that only live in memory
+        (no WAL and unflushed rows).
+        """
+        if self._dirty and self.journal is None:
+            return None
+        try:
+            stat = os.stat(self.path)
+            base = [stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            base = None
+        try:
+            with open(f"{self.path}.crc32", "rb") as f:
+                crc = f.read().strip().decode()
+        except FileNotFoundError:
+            crc = None
+        return [base, crc, self.segments.segment_numbers()]
+
+    @write_locked
+    def checkpoint(self):
+        """Rewrite the .json table from the cache, dropping every segment and the WAL."""
+        if self.shared:
+            self._follow()
+        with self._compaction_lock:
+            if self._dirty and self.segments.segment_numbers():
+                # Make every segment older than the new base, so replaying one that
+                # survives a crash below cannot roll a row back
+                compact_after, self.compact_after = self.compact_after, 0
+                try:
+                    self.flush()
+                finally:
+                    self.compact_after = compact_after
+            numbers = self.segments.segment_numbers()
+            self._write_base()
+            self.segments.discard(numbers)
+            if self.journal is not None:
+                self._truncate_journal()
+            self._dirty.clear()
+
+    def close(self):
+        """Wait for background compaction, then sync and close the WAL (if any)."""
+        self.wait_compaction()
+        if self.journal is not None:
+            self.journal.close()
+        if self.shared:
+            self.lock.close()
+
+    # ------------------ Import / Export ------------------ #
+    def export_jsonl(self, path: str | os.PathLike, chunk_size: int = DEFAULT_CHUNK) -> int:
+        """Stream every row to a JSON Lines file, 'chunk_size' rows per write. Returns the row count."""
+        return write_jsonl(os.fspath(path), self._dump_rows(), chunk_size)
+
+    def import_jsonl(self, path: str | os.PathLike, chunk_size: int = DEFAULT_CHUNK) -> int:
+        """Insert every row of a JSON Lines file, fully validated, reading 'chunk_size' rows at a time."""
+        count = 0
+        for chunk in iter_jsonl(os.fspath(path), chunk_size):
+            for item in chunk:
+                self.insert(self._hydrate(item))
+            count += len(chunk)
+        return count
+
+    def _log_put(self, query_id: int, model_instance: JsonModel):
+        if self.journal is not None:
+            self.journal.record_put(query_id, model_instance.to_json())
+            if self.shared:
+                self._published()
+
+    def _log_delete(self, query_id: int):
+        if self.journal is not None:
+            self.journal.record_delete(query_id)
+            if self.shared:
+                self._published()
 
+    @write_locked
     def insert(self, model_instance: JsonModel):
         """Insert a model instance into cache with validation."""
         if not isinstance(model_instance, self.model):
             raise OperationError("Insert Error", f"Expected instance of {self.model}")
+        if self.shared:
+            self._follow()
+        self._log_put(model_instance.id, model_instance)
+        old = self.cache.get(model_instance.id)
         self.cache[model_instance.id] = model_instance
+        self._publish("insert", model_instance.id, old, model_instance)
 
+    @write_locked
     def remove(self, query_id: int):
         """Remove a model instance from cache with validation."""
+        if self.shared:
+            self._follow()
         if query_id not in self.cache:
             raise OperationError("Remove Error", f"ID {query_id} not found")
-        del self.cache[query_id]
+        self._log_delete(query_id)
+        old = self.cache.pop(query_id)
+        self._publish("remove", query_id, old, None)
 
+    @write_locked
     def update(self, query_id: int, new_data: JsonModel):
         """Update a model instance in cache with validation."""
+        if self.shared:
+            self._follow()
         if query_id not in self.cache:
             raise OperationError("Update Error", f"ID {query_id} not found")
         if not isinstance(new_data, self.model):
             raise OperationError("Update Error", f"Expected instance of {self.model}")
+        self._log_put(query_id, new_data)
+        old = self.cache[query_id]
         self.cache[query_id] = new_data
+        self._publish("update", query_id, old, new_data)
 
     def get(self, query_id: int):
         """Get a model instance by ID with validation."""
@@ -0,0 +1,132 @@
+import threading
+import time
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from fastjson_db.core.json_table import JsonTable
+
+# Table methods timed by an enabled Metrics (method -> op). JsonQuerier records "query" and "index"
+TABLE_OPS = {"insert": "insert", "update": "update", "remove": "remove", "get": "get",
+             "_load_cache": "load", "flush": "flush"}
+BUCKETS = 32  # Bucket k counts latencies under 2**k microseconds (the last one takes the rest)
+
+# Export hook signature: (table name, op, seconds, ok)
+MetricsHook = Callable[[str, str, float, bool], None]
+
+class Histogram:
+    """Latency histogram with power-of-two microsecond buckets: constant memory and O(1) adds."""
+
+    def __init__(self):
+        self.buckets = [0] * BUCKETS
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds: float):
+        k = int(seconds * 1e6).bit_length()
+        self.buckets[k if k < BUCKETS else BUCKETS - 1] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    def percentile(self, p: float) -> float:
+        """Upper bound (in seconds) of the bucket holding the p-th percentile (0 < p <= 100)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for k, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min((1 << k) / 1e6, self.max_seconds)
+        return self.max_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "total_seconds": self.total_seconds, "max_seconds": self.max_seconds,
+                "avg_seconds": self.total_seconds / self.count if self.count else 0.0,
+                "p50_seconds": self.percentile(50), "p99_seconds": self.percentile(99),
+                "buckets_us": {1 << k: n for k, n in enumerate(self.buckets) if n}}
+
+class Metrics:
+    """Operation counters and latency histograms of one table.
+
+    Enabled with JsonTable.enable_metrics(): the timed methods are then wrapped on that table
+    instance only. While disabled nothing is wrapped, so the operations run at full speed.
+    'hook' is called after every operation, in the calling thread, to export to another system.
+    """
+
+    def __init__(self, name: str, hook: Optional[MetricsHook] = None):
+        self.name = name
+        self.hook = hook
+        self.errors: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Calls per operation (failed ones included)."""
+        return {op: histogram.count for op, histogram in self.histograms.items()}
+
+    def _histogram(self, op: str) -> Histogram:
+        with self._lock:
+            histogram = self.histograms.get(op)
+            if histogram is None:
+                histogram = self.histograms[op] = Histogram()
+            return histogram
+
+    def record(self, op: str, seconds: float, ok: bool = True):
+        histogram = self.histograms.get(op) or self._histogram(op)
+        with self._lock:
+            histogram.add(seconds)
+            if not ok:
+                self.errors[op] = self.errors.get(op, 0) + 1
+        if self.hook is not None:
+            self.hook(self.name, op, seconds, ok)
+
+    def timed(self, op: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap 'func' so each call is recorded as 'op' (failed calls count as errors)."""
+        clock = time.perf_counter
+        add = self._histogram(op).add
+        lock = self._lock
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                self.record(op, clock() - start, False)
+                raise
+            seconds = clock() - start
+            with lock:
+                add(seconds)
+            if self.hook is not None:
+                self.hook(self.name, op, seconds, True)
+            return result
+        return wrapper
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the counters and histograms, for polling exporters."""
+        with self._lock:
+            return {"table": self.name, "counters": self.counters, "errors": dict(self.errors),
+                    "latency": {op: h.as_dict() for op, h in self.histograms.items()}}
+
+    def reset(self):
+        with self._lock:
+            self.errors.clear()
+            self.histograms.clear()
+
+    def __repr__(self):
+        return f"<Metrics {self.name} {self.counters}>"
+
+def instrument(table: "JsonTable", metrics: Metrics):
+    """Shadow the table's timed methods with instance attributes recording into 'metrics'."""
+    for method, op in TABLE_OPS.items():
+        # Bound through the class, so instrumenting twice never wraps a wrapper
+        table.__dict__[method] = metrics.timed(op, getattr(type(table), method).__get__(table))
+
+def uninstrument(table: "JsonTable"):
+    for method in TABLE_OPS:
+        table.__dict__.pop(method, None)
@@ -0,0 +1,199 @@
+import os
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterator, List, Optional, Set
+import orjson
+from fastjson_db.core.json_model import JsonModel
+from fastjson_db.core.json_table import JsonTable
+from fastjson_db.errors import OperationError
+from fastjson_db.log.record_file import RecordFile, merge_records, write_record_file
+from .rw_lock import compaction_locked, write_locked
+
+class MmapRows(MutableMapping):
+    """Mapping view of an MmapTable, standing in for JsonTable.cache.
+
+    Reads check the in-memory changes first, then decode the row from the mapped file.
+    """
+
+    def __init__(self, table: "MmapTable"):
+        self._table = table
+
+    def __getitem__(self, query_id: Any) -> JsonModel:
+        table = self._table
+        obj = table._changed.get(query_id)
+        if obj is not None:
+            return obj
+        if query_id in table._deleted:
+            raise KeyError(query_id)
+        return table._read_row(query_id)
+
+    def __contains__(self, query_id: Any) -> bool:
+        table = self._table
+        if query_id in table._changed:
+            return True
+        return query_id not in table._deleted and table._file.find(query_id) >= 0
+
+    def __setitem__(self, query_id: Any, obj: JsonModel):
+        self._table._put(query_id, obj)
+
+    def __delitem__(self, query_id: Any):
+        if query_id not in self:
+            raise KeyError(query_id)
+        self._table._delete(query_id)
+
+    def __iter__(self) -> Iterator[Any]:
+        table = self._table
+        changed, deleted = table._changed, table._deleted
+        for query_id in table._file.ids:
+            if query_id not in changed and query_id not in deleted:
+                yield query_id
+        yield from list(changed)
+
+    def __len__(self) -> int:
+        return self._table._size
+
+    def values(self) -> Iterator[JsonModel]:
+        """Stream every object. Rows decoded for a scan bypass the LRU so they do not evict hot ones."""
+        table = self._table
+        base, changed, deleted, lru = table._file, table._changed, table._deleted, table._lru
+        hydrate = table._row_hydrator()
+        for position, query_id in enumerate(base.ids):
+            if query_id in changed or query_id in deleted:
+                continue
+            obj = lru.get(query_id)
+            yield obj if obj is not None else hydrate(base.row(position))
+        yield from list(changed.values())
+
+class MmapTable(JsonTable):
+    """JsonTable over a memory-mapped binary file: rows are decoded only when read.
+
+    The file holds length-prefixed orjson rows sorted by ID plus an offset index, so opening
+    it only reads the index and get() decodes a single row. Hydrated objects are kept in an LRU
+    of 'lru_size' entries; changes live in memory (and in the WAL / segments) until checkpoint().
+    Tables larger than RAM work as long as the changes since the last checkpoint fit.
+    """
+    lazy = True
+
+    def __init__(self, model: type[JsonModel], path: str | os.PathLike, lru_size: int = 4096, **kwargs):
+        if not isinstance(lru_size, int) or lru_size < 0:
+            raise OperationError("MmapTable Creation Error", "'lru_size' must be an 'int' >= 0")
+        if kwargs.get("file_format", "json") != "json":
+            raise OperationError("MmapTable Creation Error", "MmapTable uses its own binary file format")
+        super().__init__(model, path, **kwargs)
+        self.lru_size = lru_size
+        self._file = RecordFile(self.path)
+        self._retired: List[RecordFile] = []           # Swapped out by a compaction, closed once no reader can hold them
+        self._changed: Dict[Any, JsonModel] = {}       # Rows put since the file was written
+        self._deleted: Set[Any] = set()                 # Rows removed since then
+        self._lru: "OrderedDict[Any, JsonModel]" = OrderedDict()
+        self._size = len(self._file)
+        self.cache = MmapRows(self)
+
+    # ------------------ Row Access ------------------ #
+    def _row_hydrator(self):
+        # The binary file is only ever written by the engine
+        return self.model.from_json if self.trusted is False else self.model._trusted_hydrate
+
+    def _read_row(self, query_id: Any) -> JsonModel:
+        obj = self._lru.get(query_id)
+        if obj is not None:
+            try:
+                self._lru.move_to_end(query_id)
+            except KeyError:
+                pass  # Evicted meanwhile by another reader
+            return obj
+        file = self._file  # Swapped by a background compaction
+        position = file.find(query_id)
+        if position < 0:
+            raise KeyError(query_id)
+        obj = self._row_hydrator()(file.row(position))
+        if self.lru_size:
+            self._lru[query_id] = obj
+            if len(self._lru) > self.lru_size:
+                try:
+                    self._lru.popitem(last=False)
+                except KeyError:
+                    pass
+        return obj
+
+    def _put(self, query_id: Any, obj: JsonModel):
+        if query_id not in self.cache:
+            self._size += 1
+        self._changed[query_id] = obj
+        self._deleted.discard(query_id)
+        self._lru.pop(query_id, None)
+
+    def _delete(self, query_id: Any):
+        self._size -= 1
+        self._changed.pop(query_id, None)
+        self._lru.pop(query_id, None)
+        # Recorded even when the row is not in the file yet: a background compaction may fold it in
+        self._deleted.add(query_id)
+
+    # ------------------ Load / Save ------------------ #
+    @write_locked
+    @compaction_locked
+    def _load_cache(self, pool: Optional[Executor] = None):
+        """Map the binary file (reading only its offset index), then replay segments and the WAL.
+
+        'pool' is accepted for JsonApp and unused: nothing is parsed up front.
+        """
+        self._dirty.clear()
+        self._swap_file()
+        self._changed.clear()
+        self._deleted.clear()
+        self._lru.clear()
+        self._size = len(self._file)
+
+        hydrate = self._hydrate if self.trusted is False else self.model._trusted_hydrate
+        for op, key, row in self._replay_changes():
+            if op == "put":
+                self.cache[key] = hydrate(row)
+            else:
+                self.cache.pop(key, None)
+
+        self._publish("reload", None, None, None)
+
+    def _compact_segments(self, numbers: List[int]):
+        """Merge segment files into a new binary file, from disk, while the table keeps serving."""
+        changes: Dict[Any, Optional[bytes]] = {}
+        for op, key, row in self.segments.replay(numbers):
+            changes[key] = orjson.dumps(row) if op == "put" else None
+        base = RecordFile(self.path)
+        try:
+            write_record_file(self.path, merge_records(base, changes))
+        finally:
+            base.close()
+        # Rows folded in stay in _changed too, which still holds their latest state. The swap is a
+        # single assignment: taking the table lock here would invert the load's lock order, so
+        # readers may still use the old mapping until the next swap under the write lock closes it
+        old, self._file = self._file, RecordFile(self.path)
+        self._retired.append(old)
+        self.segments.discard(numbers)
+
+    def _write_base(self):
+        """Rewrite the binary file with every change applied; unchanged rows are copied undecoded."""
+        changes: Dict[Any, Optional[bytes]] = {key: None for key in self._deleted}
+        for key, obj in self._changed.items():
+            changes[key] = orjson.dumps(obj.to_json())
+        write_record_file(self.path, merge_records(self._file, changes))
+        self._swap_file()
+        self._changed.clear()
+        self._deleted.clear()
+
+    def _swap_file(self):
+        """Map the binary file again (under the write lock), closing the previous mappings."""
+        old, self._file = self._file, RecordFile(self.path)
+        self._close_files(old)
+
+    def _close_files(self, *files: RecordFile):
+        for file in (*self._retired, *files):
+            file.close()
+        self._retired.clear()
+
+    def close(self):
+        """Wait for background compaction, close the WAL and unmap the binary file."""
+        super().close()
+        self._lru.clear()
+        self._close_files(self._file)
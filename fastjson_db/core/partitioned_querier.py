@@ -0,0 +1,293 @@
+import heapq
+from dataclasses import replace
+from itertools import chain, islice
+from operator import attrgetter
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from fastjson_db.core.json_model import JsonModel
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.core.query_plan import describe_condition
+from fastjson_db.errors import HeritageError, OperationError
+from .aggregation import AGGREGATES, Spec, check_aggregate, result_name
+from .partitioned_table import PartitionedTable
+from .query import NO_WINDOW, Condition, Query, Window
+
+# Partial aggregates each shard computes for one requested aggregate (distinct merges value sets)
+PARTIALS = {"sum": ("sum",), "count": ("count",), "min": ("min",), "max": ("max",), "avg": ("sum", "count"), "distinct": ()}
+
+class PartitionedQuerier:
+    """JsonQuerier over a PartitionedTable: one JsonQuerier (cache and indices) per shard.
+
+    Queries with an 'id' condition only run on the shards that can hold those IDs. The others
+    fan out to every shard in the table executor and the partial results are merged: ordered
+    results with a k-way merge, counts and aggregates from per-shard partials. The chaining API
+    and the results are the same as JsonQuerier's.
+    """
+
+    def __init__(self, table: PartitionedTable, **querier_kwargs):
+        if not isinstance(table, PartitionedTable):
+            raise HeritageError("PartitionedQuerier Creation Error", "'table' must be a PartitionedTable")
+        self.table = table
+        self.queriers = [JsonQuerier(shard, **querier_kwargs) for shard in table.shards]
+        self._any = self.queriers[0]  # Parses and validates: every shard has the same model
+        self._query = Query(self)
+
+    # ------------------ Load Cache ------------------ #
+    def _load_cache(self):
+        """Build every shard's indices at once."""
+        self.table.fan_out(lambda querier: querier._load_cache(), self.queriers)
+
+    def save_indices(self) -> bool:
+        return all(self.table.fan_out(lambda querier: querier.save_indices(), self.queriers))
+
+    # ------------------ Conditions / Routing ------------------ #
+    def _parse_conditions(self, conditions: Dict[str, Any]) -> List[Condition]:
+        return self._any._parse_conditions(conditions)
+
+    def _check_field(self, error: str, field_name: str):
+        self._any._check_field(error, field_name)
+
+    def _check_window(self, limit: Optional[int], offset: int):
+        self._any._check_window(limit, offset)
+
+    def _route(self, conditions: List[Condition]) -> List[JsonQuerier]:
+        """Queriers of the shards that can hold matches: ID conditions prune the others."""
+        shards = set(range(self.table.partitions))
+        for field_name, lookup, value in conditions:
+            if field_name != "id" or value is None:
+                continue
+            try:
+                shards &= self._shards_for(lookup, value)
+            except TypeError:
+                continue  # Not comparable with the IDs: left to the shards' own checks
+        return [self.queriers[i] for i in sorted(shards)]
+
+    def _shards_for(self, lookup: str, value: Any) -> Set[int]:
+        table = self.table
+        if lookup == "exact":
+            return {table.shard_of(value)}
+        if lookup == "in":
+            return {table.shard_of(v) for v in value if v is not None}
+        last = table.partitions - 1
+        if table.scheme != "range" or lookup == "startswith":
+            return set(range(table.partitions))
+        if lookup in ("gt", "gte"):
+            return set(range(table.shard_of(value), last + 1))
+        if lookup in ("lt", "lte"):
+            return set(range(table.shard_of(value) + 1))
+        return set(range(table.shard_of(value[0]), table.shard_of(value[1]) + 1))  # between
+
+    def _fan_out(self, queriers: List[JsonQuerier], run) -> List[Any]:
+        return self.table.fan_out(run, queriers)
+
+    # ------------------ Chaining ------------------ #
+    def filter(self, **conditions) -> Query:
+        return self._query.filter(**conditions)
+
+    def order_by(self, field_name: str, desc: bool = False) -> Query:
+        return self._query.order_by(field_name, desc)
+
+    def limit(self, n: Optional[int]) -> Query:
+        return self._query.limit(n)
+
+    def offset(self, n: int) -> Query:
+        return self._query.offset(n)
+
+    def group_by(self, field_name: str) -> Query:
+        return self._query.group_by(field_name)
+
+    # ------------------ Queries ------------------ #
+    def get(self, **conditions) -> List[JsonModel]:
+        return self._get(self._query, conditions)
+
+    def first(self, **conditions) -> Optional[JsonModel]:
+        return self._first(self._query, conditions)
+
+    def iter(self, limit: Optional[int] = None, offset: Optional[int] = None, **conditions) -> Iterator[JsonModel]:
+        return self._iter(self._query, limit, offset, conditions)
+
+    def values(self, *field_names: str, **conditions) -> List[Tuple[Any, ...]]:
+        return self._values(self._query, field_names, conditions)
+
+    def count(self, **conditions) -> int:
+        return self._count(self._query, conditions)
+
+    def explain(self, **conditions) -> Dict[str, Any]:
+        return self._explain(self._query, conditions)
+
+    def _collect(self, merged: List[Condition], window: Window) -> List[JsonModel]:
+        """Run a query on the routed shards and merge their windows into the final one."""
+        order, limit, offset = window
+        stop = None if limit is None else offset + limit
+        shard_window = (order, stop, 0)  # Every shard may hold the whole final window
+        parts = self._fan_out(self._route(merged),
+                              lambda querier: querier._get(Query(querier, tuple(merged), shard_window), {}))
+        return list(islice(self._merge(parts, order), offset, stop))
+
+    def _merge(self, parts: List[Iterable[JsonModel]], order: Optional[Tuple[str, bool]]) -> Iterable[JsonModel]:
+        if order is None:
+            return chain.from_iterable(parts)
+        field_name, desc = order
+        return heapq.merge(*parts, key=self._any._sort_key(field_name, desc), reverse=desc)
+
+    def _get(self, query: Query, conditions: Dict[str, Any]) -> List[JsonModel]:
+        return self._collect(self._any._conditions(query, conditions), self._any._window(query))
+
+    def _first(self, query: Query, conditions: Dict[str, Any]) -> Optional[JsonModel]:
+        order, _, offset = self._any._window(query)
+        merged = self._any._conditions(query, conditions)
+        if order is None and not offset:
+            for querier in self._route(merged):  # Shard by shard: stops at the first hit
+                found = querier._first(Query(querier, tuple(merged)), {})
+                if found is not None:
+                    return found
+            return None
+        rows = self._collect(merged, (order, 1, offset))
+        return rows[0] if rows else None
+
+    def _iter(self, query: Query, limit: Optional[int], offset: Optional[int],
+              conditions: Dict[str, Any]) -> Iterator[JsonModel]:
+        """Lazy: unordered results go shard after shard, ordered ones through a k-way merge."""
+        order, limit, offset = self._any._window(query, limit, offset)
+        merged = self._any._conditions(query, conditions)
+        stop = None if limit is None else offset + limit
+        parts = [querier._iter(Query(querier, tuple(merged), (order, stop, 0)), None, None, {})
+                 for querier in self._route(merged)]
+        return islice(iter(self._merge(parts, order)), offset, stop)
+
+    def _count(self, query: Query, conditions: Dict[str, Any]) -> int:
+        _, limit, offset = self._any._window(query)
+        merged = self._any._conditions(query, conditions)
+        total = sum(self._fan_out(self._route(merged), lambda querier: querier._count(Query(querier, tuple(merged)), {})))
+        total = max(total - offset, 0)
+        return total if limit is None else min(total, limit)
+
+    def _values(self, query: Query, field_names: Tuple[str, ...], conditions: Dict[str, Any]) -> List[Tuple[Any, ...]]:
+        if not field_names:
+            raise OperationError("Query Error", "values() needs at least one field")
+        for field_name in field_names:
+            self._check_field("Query Error", field_name)
+        window = self._any._window(query)
+        merged = self._any._conditions(query, conditions)
+        if window == NO_WINDOW:
+            # Shards answer alone, from a covering index where they have one
+            parts = self._fan_out(self._route(merged),
+                                  lambda querier: querier._values(Query(querier, tuple(merged)), field_names, {}))
+            return list(chain.from_iterable(parts))
+        getters = [attrgetter(field_name) for field_name in field_names]
+        return [tuple(get(obj) for get in getters) for obj in self._collect(merged, window)]
+
+    # ------------------ Aggregates ------------------ #
+    def sum(self, field_name: str, **conditions) -> Any:
+        return self._aggregate(self._query, "sum", field_name, conditions)
+
+    def avg(self, field_name: str, **conditions) -> Any:
+        return self._aggregate(self._query, "avg", field_name, conditions)
+
+    def min(self, field_name: str, **conditions) -> Any:
+        return self._aggregate(self._query, "min", field_name, conditions)
+
+    def max(self, field_name: str, **conditions) -> Any:
+        return self._aggregate(self._query, "max", field_name, conditions)
+
+    def aggregate(self, **specs: str | Iterable[str]) -> Dict[Any, Any]:
+        return self._aggregates(self._query, specs)
+
+    def _aggregate(self, query: Query, func: str, field_name: str, conditions: Dict[str, Any]) -> Any:
+        check_aggregate(func, field_name, self._any._fields_map)
+        result = self._aggregates(replace(query.filter(**conditions), group=None), {func: field_name})
+        return result[result_name(func, field_name)]
+
+    def _aggregates(self, query: Query, specs: Dict[str, str | Iterable[str]]) -> Dict[Any, Any]:
+        """Per-shard partial aggregates (avg as sum and count, distinct as value sets), merged."""
+        parsed: List[Spec] = []
+        for func, field_names in specs.items():
+            for field_name in ([field_names] if isinstance(field_names, str) else field_names):
+                check_aggregate(func, field_name, self._any._fields_map)
+                parsed.append((func, field_name))
+        if not parsed:
+            raise OperationError("Aggregate Error", f"aggregate() needs at least one of {AGGREGATES}")
+
+        group = query.group
+        merged = self._any._conditions(query, {})
+        partials: Dict[str, List[str]] = {}
+        for func, field_name in parsed:
+            for partial in PARTIALS[func]:
+                if field_name not in partials.setdefault(partial, []):
+                    partials[partial].append(field_name)
+        distinct = [field_name for func, field_name in parsed if func == "distinct"]
+
+        def run(querier: JsonQuerier) -> Tuple[Dict[Any, Any], Dict[Any, Dict[str, Set[Any]]]]:
+            shard_query = Query(querier, tuple(merged), group=group)
+            results = querier._aggregates(shard_query, partials) if partials else {}
+            seen: Dict[Any, Dict[str, Set[Any]]] = {}
+            for field_name in distinct:
+                columns = (group, field_name) if group is not None else (field_name,)
+                for row in querier._values(Query(querier, tuple(merged)), columns, {}):
+                    key, value = (row[0], row[1]) if group is not None else (None, row[0])
+                    if value is not None:
+                        seen.setdefault(key, {}).setdefault(field_name, set()).add(value)
+            return results, seen
+
+        parts = self._fan_out(self._route(merged), run)
+        if group is None:
+            return self._merge_results(parsed, [results for results, _ in parts], [seen.get(None, {}) for _, seen in parts])
+        keys = {key: None for results, seen in parts for key in chain(results, seen)}
+        return {key: self._merge_results(parsed, [results[key] for results, _ in parts if key in results],
+                                         [seen[key] for _, seen in parts if key in seen])
+                for key in keys}
+
+    def _merge_results(self, specs: List[Spec], results: List[Dict[str, Any]],
+                       seen: List[Dict[str, Set[Any]]]) -> Dict[str, Any]:
+        def values(func, field_name):
+            name = result_name(func, field_name)
+            return [r[name] for r in results if r.get(name) is not None]
+        merged: Dict[str, Any] = {}
+        for func, field_name in specs:
+            name = result_name(func, field_name)
+            if func in ("sum", "count"):
+                merged[name] = sum(values(func, field_name))
+            elif func == "min":
+                merged[name] = min(values("min", field_name), default=None)
+            elif func == "max":
+                merged[name] = max(values("max", field_name), default=None)
+            elif func == "avg":
+                rows = sum(values("count", field_name))
+                merged[name] = sum(values("sum", field_name)) / rows if rows else None
+            else:
+                merged[name] = len(set().union(*(s.get(field_name, ()) for s in seen)))
+        return merged
+
+    # ------------------ Relations ------------------ #
+    def join(self, other: Any, on: str | Tuple[str, str] | None = None, **conditions) -> List[Tuple[JsonModel, JsonModel]]:
+        return self._join(self._query, other, on, conditions)
+
+    def prefetch_related(self, field_name: str, other: Any, objects: Optional[Iterable[JsonModel]] = None) -> Dict[Any, JsonModel]:
+        return self._prefetch_related(self._query, field_name, other, objects)
+
+    def _join(self, query: Query, other: Any, on: str | Tuple[str, str] | None,
+              conditions: Dict[str, Any]) -> List[Tuple[JsonModel, JsonModel]]:
+        """The matches of every shard, hash joined with 'other'."""
+        return self._any._join_objects(lambda: self._get(query, conditions), other, on)
+
+    def _prefetch_related(self, query: Query, field_name: str, other: Any,
+                          objects: Optional[Iterable[JsonModel]]) -> Dict[Any, JsonModel]:
+        if objects is None:
+            objects = self._get(query, {})
+        return self._any._prefetch_related(self._any._query, field_name, other, objects)
+
+    # ------------------ Explain ------------------ #
+    def _explain(self, query: Query, conditions: Dict[str, Any]) -> Dict[str, Any]:
+        """The routed shards and each one's own explain() report, plus the merge."""
+        window = self._any._window(query)
+        merged = self._any._conditions(query, conditions)
+        order, limit, offset = window
+        stop = None if limit is None else offset + limit
+        queriers = self._route(merged)
+        start = perf_counter()
+        shards = self._fan_out(queriers, lambda querier: querier._explain(Query(querier, tuple(merged), (order, stop, 0)), {}))
+        rows = len(self._collect(merged, window))
+        return {"conditions": [describe_condition(c) for c in merged], "order_by": order, "limit": limit, "offset": offset,
+                "partitions": self.table.partitions, "shards": [self.queriers.index(q) for q in queriers],
+                "merge": "chain" if order is None else "k-way", "rows": rows, "shard_plans": shards,
+                "timings_ms": {"total": round((perf_counter() - start) * 1e3, 4)}}
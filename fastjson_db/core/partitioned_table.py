@@ -0,0 +1,199 @@
+import os
+import zlib
+from bisect import bisect_right
+from collections.abc import Mapping
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import orjson
+from fastjson_db.core.json_model import JsonModel
+from fastjson_db.core.json_table import ChangeListener, JsonTable
+from fastjson_db.errors import BadTypingError, HeritageError, OperationError
+from .rw_lock import MultiLock
+
+SCHEMES = ("hash", "range")  # Row placement: hash of the ID, or ID ranges split at 'bounds'
+
+class PartitionedRows(Mapping):
+    """Read-only ID -> instance view over the caches of every shard."""
+
+    def __init__(self, table: "PartitionedTable"):
+        self._table = table
+
+    def __getitem__(self, query_id: Any) -> JsonModel:
+        return self._table.shard_for(query_id).cache[query_id]
+
+    def __contains__(self, query_id: Any) -> bool:
+        try:
+            return query_id in self._table.shard_for(query_id).cache
+        except TypeError:
+            return False
+
+    def __iter__(self) -> Iterator[Any]:
+        return chain.from_iterable(shard.cache for shard in self._table.shards)
+
+    def __len__(self) -> int:
+        return sum(len(shard.cache) for shard in self._table.shards)
+
+    def values(self):
+        return list(chain.from_iterable(shard.cache.values() for shard in self._table.shards))
+
+    def items(self):
+        return list(chain.from_iterable(shard.cache.items() for shard in self._table.shards))
+
+class PartitionedTable:
+    """Rows of one model split across 'partitions' shard tables, each with its own file and cache.
+
+    A row goes to the shard picked from its ID: by hash (scheme="hash") or by the ID ranges split
+    at 'bounds' (scheme="range", len(bounds) == partitions - 1). Shard i is stored in
+    '<path stem>.p<i><suffix>'. Point reads and writes touch one shard; loads, flushes and
+    checkpoints run on every shard at once in 'executor' (a thread pool by default).
+    Other keyword arguments (wal, thread_safe, file_format, ...) are passed to each shard.
+    """
+
+    def __init__(self, model: type[JsonModel], path: str | os.PathLike, partitions: int = 4,
+                 scheme: str = "hash", bounds: Optional[Sequence[Any]] = None,
+                 executor: Optional[Executor] = None, table_class: type[JsonTable] = JsonTable, **table_kwargs):
+        if not isinstance(model, type) or not issubclass(model, JsonModel):
+            raise HeritageError("PartitionedTable Creation Error", "'model' field should be a JsonModel subclass")
+        if not isinstance(table_class, type) or not issubclass(table_class, JsonTable):
+            raise HeritageError("PartitionedTable Creation Error", "'table_class' must be a JsonTable subclass")
+        if not isinstance(path, (str, os.PathLike)):
+            raise BadTypingError("PartitionedTable Creation Error", "'path' must be a 'str' or 'os.PathLike'")
+        if not isinstance(partitions, int) or partitions < 1:
+            raise BadTypingError("PartitionedTable Creation Error", "'partitions' must be an 'int' >= 1")
+        if scheme not in SCHEMES:
+            raise OperationError("PartitionedTable Creation Error", f"'scheme' must be one of {SCHEMES}")
+        if scheme == "range":
+            bounds = list(bounds or [])
+            if len(bounds) != partitions - 1 or any(a >= b for a, b in zip(bounds, bounds[1:])):
+                raise OperationError("PartitionedTable Creation Error",
+                                     "'bounds' must hold partitions - 1 strictly increasing IDs")
+        elif bounds is not None:
+            raise OperationError("PartitionedTable Creation Error", "'bounds' is only used with scheme='range'")
+
+        self.model = model
+        self.path = os.fspath(path)
+        self.partitions = partitions
+        self.scheme = scheme
+        self.bounds = bounds
+        self.layout_path = f"{self.path}.partitions"  # Layout the shard files were written with
+        self._check_layout()
+
+        stem, suffix = os.path.splitext(self.path)
+        self.shards: List[JsonTable] = [table_class(model, f"{stem}.p{i}{suffix}", **table_kwargs)
+                                        for i in range(partitions)]
+        self.thread_safe = self.shards[0].thread_safe
+        self.cache = PartitionedRows(self)
+        # Both sides of every shard lock: 'with table.lock.write():' makes several writes atomic
+        self.lock = MultiLock([shard.lock for shard in self.shards])
+        # Threads are only started on the first fan-out
+        self._own_executor = ThreadPoolExecutor(partitions, f"partitions:{self.path}") if executor is None else None
+        self.executor: Executor = executor or self._own_executor
+
+    # ------------------ Layout ------------------ #
+    def _layout(self) -> Dict[str, Any]:
+        return {"scheme": self.scheme, "partitions": self.partitions, "bounds": self.bounds}
+
+    def _check_layout(self):
+        """Refuse to open shard files written with another layout: their rows would be misrouted."""
+        try:
+            with open(self.layout_path, "rb") as f:
+                saved = orjson.loads(f.read())
+        except FileNotFoundError:
+            return
+        except orjson.JSONDecodeError as e:
+            raise OperationError("PartitionedTable Creation Error", f"'{self.layout_path}' is not a partition layout: {e}") from e
+        if saved != orjson.loads(orjson.dumps(self._layout())):
+            raise OperationError("PartitionedTable Creation Error",
+                                 f"'{self.path}' was written with another layout: {saved}")
+
+    def _write_layout(self):
+        if not os.path.exists(self.layout_path):
+            with open(self.layout_path, "wb") as f:
+                f.write(orjson.dumps(self._layout()))
+
+    def shard_of(self, query_id: Any) -> int:
+        """Index of the shard holding 'query_id'. Stable across processes (no randomized hash)."""
+        if self.scheme == "range":
+            return bisect_right(self.bounds, query_id)
+        if isinstance(query_id, int) and not isinstance(query_id, bool):
+            return query_id % self.partitions
+        return zlib.crc32(str(query_id).encode()) % self.partitions
+
+    def shard_for(self, query_id: Any) -> JsonTable:
+        return self.shards[self.shard_of(query_id)]
+
+    # ------------------ Fan-Out ------------------ #
+    def fan_out(self, func: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+        """func(item) for every item. All but the first run in the executor; the first runs in
+        the calling thread meanwhile, which saves a thread hop (and all of them for one item)."""
+        if not items:
+            return []
+        futures = [self.executor.submit(func, item) for item in items[1:]]
+        results = [func(items[0])]
+        results.extend(future.result() for future in futures)
+        return results
+
+    # ------------------ Load / Save ------------------ #
+    def _load_cache(self, pool: Optional[Executor] = None):
+        """Load every shard at once. A process 'pool' parses large shard files (see JsonTable._load_cache)."""
+        self.fan_out(lambda shard: shard._load_cache(pool), self.shards)
+
+    @property
+    def dirty_count(self) -> int:
+        return sum(shard.dirty_count for shard in self.shards)
+
+    def flush(self) -> int:
+        """Flush the shards with changes, at once. Returns the number of rows written.
+
+        Each shard keeps its own segments and WAL: 'table.shards[i].flush()' flushes one alone.
+        """
+        self._write_layout()
+        dirty = [shard for shard in self.shards if shard.dirty_count]
+        return sum(self.fan_out(lambda shard: shard.flush(), dirty)) if dirty else 0
+
+    def checkpoint(self):
+        self._write_layout()
+        self.fan_out(lambda shard: shard.checkpoint(), self.shards)
+
+    def close(self):
+        """Close every shard, then the thread pool created by the table (if any)."""
+        self.fan_out(lambda shard: shard.close(), self.shards)
+        if self._own_executor is not None:
+            self._own_executor.shutdown()
+
+    # ------------------ Change Events ------------------ #
+    @property
+    def version(self) -> int:
+        """Sum of the shard write versions: grows on every write to any shard."""
+        return sum(shard.version for shard in self.shards)
+
+    def subscribe(self, listener: ChangeListener):
+        for shard in self.shards:
+            shard.subscribe(listener)
+
+    def unsubscribe(self, listener: ChangeListener):
+        for shard in self.shards:
+            shard.unsubscribe(listener)
+
+    def poll(self) -> int:
+        """Apply other processes' changes to every shard (tables created with shared=True)."""
+        return sum(shard.poll() for shard in self.shards)
+
+    # ------------------ CRUD ------------------ #
+    def insert(self, model_instance: JsonModel):
+        if not isinstance(model_instance, self.model):
+            raise OperationError("Insert Error", f"Expected instance of {self.model}")
+        self.shard_for(model_instance.id).insert(model_instance)
+
+    def remove(self, query_id: Any):
+        self.shard_for(query_id).remove(query_id)
+
+    def update(self, query_id: Any, new_data: JsonModel):
+        self.shard_for(query_id).update(query_id, new_data)
+
+    def get(self, query_id: Any) -> JsonModel:
+        return self.shard_for(query_id).get(query_id)
+
+    def __len__(self) -> int:
+        return len(self.cache)
@@ -0,0 +1,117 @@
+import operator
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from fastjson_db.core.json_model import JsonModel
+    from fastjson_db.core.json_querier import JsonQuerier
+    from fastjson_db.core.json_table import JsonTable
+
+Condition = Tuple[str, str, Any]  # (field, lookup, serialized value)
+Window = Tuple[Optional[Tuple[str, bool]], Optional[int], int]  # ((field, desc) or None, limit, offset)
+NO_WINDOW: Window = (None, None, 0)
+
+# Django-style lookups: 'field__op=value' (a plain 'field=value' is 'exact')
+LOOKUPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "exact": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "between": lambda value, bounds: bounds[0] <= value <= bounds[1],
+    "in": lambda value, options: value in options,
+    "startswith": lambda value, prefix: value.startswith(prefix),
+}
+
+RANGE_LOOKUPS = ("gt", "gte", "lt", "lte", "between", "startswith")
+COMPARISONS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+def hashable(value: Any) -> bool:
+    """Whether 'value' can key a dict. Unlike isinstance(value, Hashable), this also checks the
+    items of a tuple, e.g. the 'in' options [[1], [2]]."""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+@dataclass(frozen=True)
+class Query:
+    """Immutable chained query of a JsonQuerier.
+
+    filter(), order_by(), limit(), offset() and group_by() return a new Query and never change
+    this one, so a Query can be shared between threads or kept as the base of several others.
+    """
+    querier: "JsonQuerier"
+    filters: Tuple[Condition, ...] = ()
+    window: Window = NO_WINDOW
+    group: Optional[str] = None
+
+    # ------------------ Chaining ------------------ #
+    def filter(self, **conditions) -> "Query":
+        """Add filter conditions ('field__lookup' keys)."""
+        return replace(self, filters=self.filters + tuple(self.querier._parse_conditions(conditions)))
+
+    def order_by(self, field_name: str, desc: bool = False) -> "Query":
+        """Sort the results by one field. None values come last in both directions."""
+        self.querier._check_field("Query Error", field_name)
+        return replace(self, window=((field_name, bool(desc)),) + self.window[1:])
+
+    def limit(self, n: Optional[int]) -> "Query":
+        """Return at most 'n' results (None removes the limit)."""
+        order, _, offset = self.window
+        self.querier._check_window(n, offset)
+        return replace(self, window=(order, n, offset))
+
+    def offset(self, n: int) -> "Query":
+        """Skip the first 'n' results."""
+        order, limit, _ = self.window
+        self.querier._check_window(limit, n)
+        return replace(self, window=(order, limit, n))
+
+    def group_by(self, field_name: str) -> "Query":
+        """Make aggregate() return one result per distinct value of 'field_name'."""
+        self.querier._check_field("Aggregate Error", field_name)
+        return replace(self, group=field_name)
+
+    # ------------------ Execution ------------------ #
+    def get(self, **conditions) -> List["JsonModel"]:
+        return self.querier._get(self, conditions)
+
+    def first(self, **conditions) -> Optional["JsonModel"]:
+        return self.querier._first(self, conditions)
+
+    def iter(self, limit: Optional[int] = None, offset: Optional[int] = None, **conditions) -> Iterator["JsonModel"]:
+        return self.querier._iter(self, limit, offset, conditions)
+
+    def count(self, **conditions) -> int:
+        return self.querier._count(self, conditions)
+
+    def values(self, *field_names: str, **conditions) -> List[Tuple[Any, ...]]:
+        return self.querier._values(self, field_names, conditions)
+
+    def sum(self, field_name: str, **conditions) -> Any:
+        return self.querier._aggregate(self, "sum", field_name, conditions)
+
+    def avg(self, field_name: str, **conditions) -> Any:
+        return self.querier._aggregate(self, "avg", field_name, conditions)
+
+    def min(self, field_name: str, **conditions) -> Any:
+        return self.querier._aggregate(self, "min", field_name, conditions)
+
+    def max(self, field_name: str, **conditions) -> Any:
+        return self.querier._aggregate(self, "max", field_name, conditions)
+
+    def aggregate(self, **specs: str | Iterable[str]) -> Dict[Any, Any]:
+        return self.querier._aggregates(self, specs)
+
+    def explain(self, **conditions) -> Dict[str, Any]:
+        return self.querier._explain(self, conditions)
+
+    def join(self, other: "JsonTable | JsonQuerier | Query", on: str | Tuple[str, str] | None = None,
+             **conditions) -> List[Tuple["JsonModel", "JsonModel"]]:
+        return self.querier._join(self, other, on, conditions)
+
+    def prefetch_related(self, field_name: str, other: "JsonTable | JsonQuerier | Query",
+                         objects: Optional[Iterable["JsonModel"]] = None) -> Dict[Any, "JsonModel"]:
+        return self.querier._prefetch_related(self, field_name, other, objects)
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+from fastjson_db.errors import OperationError
+
+MISS = object()  # Sentinel returned by QueryCache.get on a miss
+
+class QueryCache:
+    """Bounded LRU cache of query results, dropped as soon as the table write version moves."""
+
+    def __init__(self, maxsize: int = 256):
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise OperationError("QueryCache Creation Error", "'maxsize' must be an 'int' > 0")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._version = None    # Table version the entries were computed at
+        self._lock = threading.Lock()  # Queries may run from several threads
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: int) -> Any:
+        """Cached result for 'key' at table 'version', or MISS."""
+        with self._lock:
+            return self._get(key, version)
+
+    def _get(self, key: Hashable, version: int) -> Any:
+        if version != self._version:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self._version = version
+        value = self._entries.get(key, MISS)
+        if value is MISS:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key: Hashable, version: int, value: Any):
+        with self._lock:
+            self._put(key, version, value)
+
+    def _put(self, key: Hashable, version: int, value: Any):
+        if version != self._version:
+            return  # Computed against an older table
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
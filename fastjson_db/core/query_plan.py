@@ -0,0 +1,301 @@
+import heapq
+from itertools import chain, islice
+from operator import attrgetter
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from fastjson_db.core.json_model import JsonModel
+from .composite_index import prefix_bounds
+from .query import LOOKUPS, RANGE_LOOKUPS, Condition, Query, Window, hashable
+
+# Planner estimates (fraction of the table) for B-Tree range scans, as in classic cost-based optimizers
+RANGE_SELECTIVITY = {"gt": 1 / 3, "gte": 1 / 3, "lt": 1 / 3, "lte": 1 / 3, "between": 1 / 4, "startswith": 1 / 10}
+
+CompositePlan = Tuple[float, Tuple[str, ...], List[Condition], Tuple[Any, Any, bool, bool]]
+
+def describe_condition(cond: Condition) -> str:
+    """'field__lookup=value', as written in a filter() call."""
+    field_name, lookup, value = cond
+    return f"{field_name}={value!r}" if lookup == "exact" else f"{field_name}__{lookup}={value!r}"
+
+class _Tally:
+    """Iterator counting the items pulled through it (used by explain())."""
+    __slots__ = ("_items", "count")
+
+    def __init__(self, items: Iterable[Any]):
+        self._items = iter(items)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._items)
+        self.count += 1
+        return item
+class QueryPlanner:
+    """Access paths of a JsonQuerier: picks the cheapest hash, B-Tree or composite index (or a
+    scan) for a query, walks B-Trees in order for order_by(), and reports the choice in explain().
+
+    Mixed into JsonQuerier, whose indices, cache and compiled predicates it reads.
+    """
+
+    # ------------------ Planner ------------------ #
+    def _plan(self, conditions: List[Condition]) -> Optional[Tuple[float, Condition]]:
+        """Pick the most selective indexed condition as (estimated rows, condition)."""
+        best = None
+        table_size = len(self._cache)
+        for cond in conditions:
+            field_name, lookup, value = cond
+            if value is None or (lookup == "in" and None in value):
+                continue  # Indices do not store None values
+            if field_name in self._indices_hash:
+                if not hashable(value):
+                    continue
+                if lookup == "exact":
+                    cost = 1
+                elif lookup == "in":
+                    cost = len(value)
+                else:
+                    continue  # Hash indices cannot answer ranges
+            elif field_name in self._indices_btree:
+                btree = self._indices_btree[field_name]
+                if lookup == "exact":
+                    cost = len(btree.search(value))
+                elif lookup == "in":
+                    cost = sum(len(btree.search(v)) for v in value)
+                else:
+                    cost = table_size * RANGE_SELECTIVITY[lookup]
+            else:
+                continue
+            if best is None or cost < best[0]:
+                best = (cost, cond)
+                if cost == 0:
+                    break
+        return best
+
+    def _plan_composite(self, conditions: List[Condition],
+                        indices: Optional[Iterable[Tuple[str, ...]]] = None) -> Optional[CompositePlan]:
+        """Best composite index as (estimated rows, columns, answered conditions, B-Tree bounds).
+
+        An index applies to exact conditions on a prefix of its columns, optionally followed by a
+        range condition on the next column; together they select one contiguous slice of keys.
+        """
+        best = None
+        table_size = len(self._cache)
+        for columns in (self._indices_composite if indices is None else indices):
+            btree = self._indices_composite[columns]
+            used: List[Condition] = []
+            for column in columns:
+                cond = next((c for c in conditions if c[0] == column and c[1] == "exact"
+                             and c[2] is not None and hashable(c[2])), None)
+                if cond is None:
+                    break
+                used.append(cond)
+            prefix = tuple(c[2] for c in used)
+            ranged = None
+            if len(used) < len(columns):
+                column = columns[len(used)]
+                ranged = next((c for c in conditions if c[0] == column and c[1] in RANGE_LOOKUPS
+                               and c[2] is not None), None)
+            if not used and ranged is None:
+                continue
+
+            if len(prefix) == len(columns):
+                cost = len(btree.search(prefix))
+            else:
+                # Assume every column contributes evenly to the number of distinct keys
+                cost = table_size / max(len(btree), 1) ** (len(prefix) / len(columns))
+                if ranged is not None:
+                    cost *= RANGE_SELECTIVITY[ranged[1]]
+            if ranged is not None:
+                used.append(ranged)
+                bounds = prefix_bounds(prefix, self._range_bounds(ranged[1], ranged[2]))
+            else:
+                bounds = prefix_bounds(prefix, None)
+            if best is None or cost < best[0] or (cost == best[0] and len(used) > len(best[2])):
+                best = (cost, columns, used, bounds)
+        return best
+
+    def _range_bounds(self, lookup: str, value: Any) -> Tuple[Any, Any, bool, bool]:
+        """(start, end, include_start, include_end) of a B-Tree range lookup."""
+        if lookup == "between":
+            return value[0], value[1], True, True
+        if lookup == "gt":
+            return value, None, False, True
+        if lookup == "gte":
+            return value, None, True, True
+        if lookup == "lt":
+            return None, value, True, False
+        if lookup == "lte":
+            return None, value, True, True
+        # startswith: every key in [prefix, next prefix)
+        if not value:
+            return None, None, True, True
+        if ord(value[-1]) == 0x10FFFF:
+            return value, None, True, True
+        return value, value[:-1] + chr(ord(value[-1]) + 1), True, False
+
+    def _get_candidates(self, conditions: List[Condition],
+                        report: Optional[Dict[str, Any]] = None) -> Tuple[Iterable[JsonModel], List[Condition]]:
+        """Candidate objects from the cheapest hash or B-Tree index (or a full scan), plus the
+        conditions still to check. The indexed condition is answered exactly, so it is dropped.
+        Candidates are produced lazily where possible so first() can stop early.
+        explain() passes a 'report' dict, filled with the chosen access path."""
+        plan = self._plan(conditions)
+        composite = self._plan_composite(conditions) if self._indices_composite else None
+        if composite is not None and (plan is None or plan[1] in composite[2] or composite[0] < plan[0]):
+            # The composite slice answers all its conditions at once
+            cost, columns, used, bounds = composite
+            rest = [c for c in conditions if not any(c is u for u in used)]
+            if report is not None:
+                report.update(index="composite", field=columns, estimated=cost, indexed=used)
+            items = self._indices_composite[columns].items(*bounds)
+            return (obj for _, values in items for obj in values), rest
+        if plan is None:
+            if report is not None:
+                report.update(index="scan", estimated=len(self._cache))
+            return self._cache.values(), conditions
+
+        cond = plan[1]
+        rest = [c for c in conditions if c is not cond]
+        field_name, lookup, value = cond
+        if report is not None:
+            kind = "hash" if field_name in self._indices_hash else "btree"
+            report.update(index=kind, field=field_name, estimated=plan[0], indexed=[cond])
+        if field_name in self._indices_hash:
+            index = self._indices_hash[field_name]
+            keys = [value] if lookup == "exact" else value
+            return [index[k] for k in keys if k in index], rest
+
+        btree = self._indices_btree[field_name]
+        if lookup == "exact":
+            return btree.search(value), rest
+        if lookup == "in":
+            return (obj for v in value for obj in btree.search(v)), rest
+        items = btree.items(*self._range_bounds(lookup, value))
+        return (obj for _, values in items for obj in values), rest
+
+    # ------------------ Ordered Walks ------------------ #
+    def _walk_is_cheaper(self, conditions: List[Condition], field_name: str, stop: Optional[int]) -> bool:
+        """Compare the rows an in-order walk expects to visit with the cheapest index candidates."""
+        plan = self._plan(conditions)
+        if plan is None:
+            return True
+        cost, (plan_field, lookup, _) = plan
+        if plan_field == field_name and lookup != "in":
+            return True  # The walk itself is bounded by that condition
+        if stop is None or cost == 0:
+            return False  # Every match is needed: sorting the candidates visits fewer rows
+        # Matches are spread along the walk at a rate of cost / n
+        return stop * len(self._cache) / cost < cost
+
+    def _walk_ordered(self, conditions: List[Condition], field_name: str, desc: bool) -> Iterator[JsonModel]:
+        """Yield matches in B-Tree key order, then the rows whose value is None."""
+        candidates, rest = self._walk_candidates(conditions, field_name, desc)
+        predicate = self._compile(rest)
+        return iter(candidates) if predicate is None else filter(predicate, candidates)
+
+    def _walk_candidates(self, conditions: List[Condition], field_name: str,
+                         desc: bool) -> Tuple[Iterable[JsonModel], List[Condition]]:
+        """Rows in B-Tree key order (bounded by a condition on the field, if any), plus the
+        conditions still to check."""
+        bounds: Tuple[Any, Any, bool, bool] = (None, None, True, True)
+        rest = conditions
+        for cond in conditions:
+            if cond[0] == field_name and cond[1] != "in" and cond[2] is not None:
+                lookup, value = cond[1], cond[2]
+                bounds = (value, value, True, True) if lookup == "exact" else self._range_bounds(lookup, value)
+                rest = [c for c in conditions if c is not cond]
+                break
+        items = self._indices_btree[field_name].items(*bounds, reverse=desc)
+        candidates = (obj for _, values in items for obj in values)
+        if rest is not conditions:
+            return candidates, rest
+        # None values are not indexed: only reached once the whole tree was walked
+        get = attrgetter(field_name)
+        nones = (obj for obj in self._cache.values() if get(obj) is None)
+        return chain(candidates, nones), rest
+
+    # ------------------ Explain ------------------ #
+    def explain(self, **conditions) -> Dict[str, Any]:
+        """Run a query (bypassing the result cache) and report how it was answered.
+
+        'index' is the access path: "hash", "btree", "composite" (with the indexed conditions),
+        "btree_walk" (an ordered walk of the order_by() field), "scan" or "columnar". 'estimated'
+        is the planner's row estimate, 'candidates' the rows it actually read, 'filtered' those
+        rejected by the 'residual' conditions and 'rows' the size of the result. 'strategy' tells
+        how the window was produced ("stream", "walk", "top-k" or "sort") and 'timings_ms' the
+        time spent planning, reading candidates and ordering.
+        """
+        return self._explain(self._query, conditions)
+
+    def _explain(self, query: Query, conditions: Dict[str, Any]) -> Dict[str, Any]:
+        window = self._window(query)
+        merged = self._conditions(query, conditions)
+        order, limit, offset = window
+        report: Dict[str, Any] = {"conditions": [describe_condition(c) for c in merged],
+                                  "order_by": order, "limit": limit, "offset": offset,
+                                  "index": None, "field": None, "indexed": [], "estimated": None}
+        with self.table.lock.read():
+            timings = self._explain_columnar(merged, window, report) if self._columnar \
+                else self._explain_rows(merged, window, report)
+        report["indexed"] = [describe_condition(c) for c in report["indexed"]]
+        report["residual"] = [describe_condition(c) for c in report["residual"]]
+        report["timings_ms"] = {stage: round(seconds * 1e3, 4) for stage, seconds in timings.items()}
+        return report
+
+    def _explain_rows(self, merged: List[Condition], window: Window, report: Dict[str, Any]) -> Dict[str, float]:
+        """Replay _select() stage by stage, counting the rows pulled through each one."""
+        order, limit, offset = window
+        stop = None if limit is None else offset + limit
+        start = perf_counter()
+        walk = order is not None and order[0] in self._indices_btree and self._walk_is_cheaper(merged, order[0], stop)
+        if walk:
+            candidates, rest = self._walk_candidates(merged, *order)
+            report.update(index="btree_walk", field=order[0])
+        else:
+            candidates, rest = self._get_candidates(merged, report)
+        predicate = self._compile(rest)
+        planned = perf_counter()
+
+        scanned = _Tally(candidates)
+        matches = scanned if predicate is None else _Tally(filter(predicate, scanned))
+        if order is None or walk:
+            rows = list(islice(matches, offset, stop))
+            strategy = "walk" if walk else "stream"
+            read = sorted_at = perf_counter()
+        else:
+            matched = list(matches)
+            read = perf_counter()
+            key = self._sort_key(*order)
+            if stop is None:
+                strategy, ordered = "sort", sorted(matched, key=key, reverse=order[1])
+            elif order[1]:
+                strategy, ordered = "top-k", heapq.nlargest(stop, matched, key=key)
+            else:
+                strategy, ordered = "top-k", heapq.nsmallest(stop, matched, key=key)
+            rows = ordered[offset:]
+            sorted_at = perf_counter()
+        report.update(strategy=strategy, residual=rest, candidates=scanned.count,
+                      filtered=scanned.count - matches.count, rows=len(rows))
+        return {"plan": planned - start, "candidates": read - planned, "order": sorted_at - read}
+
+    def _explain_columnar(self, merged: List[Condition], window: Window, report: Dict[str, Any]) -> Dict[str, float]:
+        order, limit, offset = window
+        stop = None if limit is None else offset + limit
+        start = perf_counter()
+        rows = self.table.select(merged, LOOKUPS)
+        masked = perf_counter()
+        by_id = next((c for c in merged if c[0] == "id" and c[1] == "exact"), None)
+        candidates = 1 if by_id is not None else len(self._cache)
+        matched = len(rows)
+        strategy = "stream"
+        if order is not None:
+            rows = self.table.order(rows, order[0], order[1], stop)
+            strategy = "sort" if stop is None else "top-k"
+        rows = rows[offset:stop]
+        report.update(index="columnar", field="id" if by_id is not None else None, strategy=strategy,
+                      residual=merged, candidates=candidates, filtered=candidates - matched, rows=len(rows))
+        if by_id is not None:
+            report["indexed"] = [by_id]
+        return {"plan": 0.0, "candidates": masked - start, "order": perf_counter() - masked}
@@ -0,0 +1,181 @@
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+from fastjson_db.core.json_model import JsonModel
+from fastjson_db.core.json_table import JsonTable
+from fastjson_db.errors import OperationError
+from .query import Query
+from .rw_lock import combined_lock
+
+if TYPE_CHECKING:
+    from fastjson_db.core.json_querier import JsonQuerier
+
+class Relations:
+    """join() and prefetch_related() of a JsonQuerier: hash joins between two tables, resolved
+    from Field.foreign_key and probing the other side's primary-key map or indices.
+
+    Mixed into JsonQuerier, whose matches, locks and field map it uses.
+    """
+
+    def join(self, other: "JsonTable | JsonQuerier | Query", on: str | Tuple[str, str] | None = None,
+             **conditions) -> List[Tuple[JsonModel, JsonModel]]:
+        """Inner hash join of the matches with the rows of another table: [(row, other_row), ...].
+
+        'on' is a (field, other_field) pair, or a field whose Field.foreign_key names the other
+        model ("User.id", or "User" for its 'id'). Without it, the single field referencing the
+        other model is used. The other side is probed through its primary-key map or a
+        JsonQuerier index; only a filtered or unindexed other side is hashed first.
+        """
+        return self._join(self._query, other, on, conditions)
+
+    def prefetch_related(self, field_name: str, other: "JsonTable | JsonQuerier | Query",
+                         objects: Optional[Iterable[JsonModel]] = None) -> Dict[Any, JsonModel]:
+        """Resolve the foreign keys of a result set in one batch: {key: related row}.
+
+        'objects' defaults to the matches of the query. Distinct keys are looked up once each
+        in the other side's primary-key map (or unique index), instead of one get() per row.
+        """
+        return self._prefetch_related(self._query, field_name, other, objects)
+
+    def _join(self, query: Query, other: "JsonTable | JsonQuerier | Query", on: str | Tuple[str, str] | None,
+              conditions: Dict[str, Any]) -> List[Tuple[JsonModel, JsonModel]]:
+        window = self._window(query)
+        merged = self._conditions(query, conditions)
+        return self._join_objects(lambda: self._matches(merged, window), other, on)
+
+    def _join_objects(self, objects: Callable[[], Iterable[JsonModel]], other: "JsonTable | JsonQuerier | Query",
+                      on: str | Tuple[str, str] | None) -> List[Tuple[JsonModel, JsonModel]]:
+        """Hash join of the rows returned by 'objects()' (called under the read locks) with 'other'."""
+        other_table = self._other_table(other)
+        left_field, right_field = self._relation(other_table.model, on)
+        get = attrgetter(left_field)
+
+        def join():
+            with combined_lock(self.table.lock, other_table.lock).read():
+                probe = self._relation_probe(other, right_field)
+                pairs = []
+                for obj in objects():
+                    for related in probe(get(obj)):
+                        pairs.append((obj, related))
+                return pairs
+        return self._timed(join)
+
+    def _prefetch_related(self, query: Query, field_name: str, other: "JsonTable | JsonQuerier | Query",
+                          objects: Optional[Iterable[JsonModel]]) -> Dict[Any, JsonModel]:
+        other_table = self._other_table(other)
+        left_field, right_field = self._relation(other_table.model, field_name)
+
+        def prefetch(objects):
+            with combined_lock(self.table.lock, other_table.lock).read():
+                if objects is None:
+                    objects = self._matches(self._conditions(query, {}), self._window(query))
+                keys = {key for key in map(attrgetter(left_field), objects) if key is not None}
+                probe = self._relation_probe(other, right_field, unique=True)
+                related = {}
+                for key in keys:
+                    found = probe(key)
+                    if found:
+                        related[key] = found[0]
+                return related
+        return self._timed(prefetch, objects)
+
+    def _other_table(self, other: "JsonTable | JsonQuerier | Query") -> JsonTable:
+        if isinstance(other, Query):
+            return other.querier.table
+        return other.table if isinstance(other, Relations) else other
+
+    def _relation(self, other_model: type[JsonModel], on: str | Tuple[str, str] | None) -> Tuple[str, str]:
+        """(field, other field) of a relation, read from Field.foreign_key unless given as a pair."""
+        if isinstance(on, (tuple, list)):
+            if len(on) != 2:
+                raise OperationError("Join Error", "'on' pair must be (field, other_field)")
+            left_field, right_field = on
+        else:
+            if on is None:
+                candidates = [name for name, field in self._fields_map.items()
+                              if field.foreign_key and self._foreign_target(field.foreign_key)[0] == other_model.__name__]
+                if len(candidates) != 1:
+                    raise OperationError("Join Error", f"Expected one field referencing '{other_model.__name__}', "
+                                                       f"found {candidates}: pass 'on'")
+                on = candidates[0]
+            if on not in self._fields_map:
+                raise OperationError("Join Error", f"Field '{on}' does not exist in model")
+            reference = self._fields_map[on].foreign_key
+            if not reference:
+                raise OperationError("Join Error", f"Field '{on}' has no foreign_key: pass 'on' as a pair")
+            model_name, right_field = self._foreign_target(reference)
+            if model_name != other_model.__name__:
+                raise OperationError("Join Error", f"'{on}' references '{model_name}', not '{other_model.__name__}'")
+            left_field = on
+        if left_field not in self._fields_map:
+            raise OperationError("Join Error", f"Field '{left_field}' does not exist in model")
+        if right_field not in other_model._fields:
+            raise OperationError("Join Error", f"Field '{right_field}' does not exist in '{other_model.__name__}'")
+        return left_field, right_field
+
+    def _foreign_target(self, reference: str) -> Tuple[str, str]:
+        """'User.id' -> ('User', 'id'); a bare 'User' references its 'id'."""
+        model_name, _, field_name = reference.partition(".")
+        return model_name, field_name or "id"
+
+    def _relation_probe(self, other: "JsonTable | JsonQuerier | Query", field_name: str,
+                        unique: bool = False) -> Callable[[Any], List[JsonModel]]:
+        """Function mapping a key to the other side's rows holding it, backed by an index when one
+        exists (build side of the hash join)."""
+        if isinstance(other, Query):
+            query, querier = other, other.querier
+            if not isinstance(querier, Relations):
+                querier = None  # PartitionedQuerier: no single index to probe
+        elif isinstance(other, Relations):  # A JsonQuerier
+            query, querier = other._query, other
+        else:
+            query, querier = None, None
+        table = self._other_table(other)
+        field = table.model._fields[field_name]
+        if unique and not (field.primary_key or field.unique):
+            raise OperationError("Join Error", f"'{field_name}' is not unique in '{table.model.__name__}'")
+        serializer = field.serializer
+
+        if query is not None and query.filters:
+            rows = query.get()  # Only the filtered rows take part: hash them
+        elif querier is not None and field_name in querier._indices_hash:
+            index = querier._indices_hash[field_name]
+            def probe(key):
+                key = serializer(key) if serializer and key is not None else key
+                try:
+                    return [index[key]] if key in index else []
+                except TypeError:
+                    return []
+            return probe
+        elif querier is not None and field_name in querier._indices_btree:
+            btree = querier._indices_btree[field_name]
+            def probe(key):
+                if key is None:
+                    return []
+                try:
+                    return btree.search(serializer(key) if serializer else key)
+                except TypeError:
+                    return []
+            return probe
+        elif field_name == "id":
+            cache = table.cache  # Primary-key map of every table
+            def probe(key):
+                try:
+                    return [cache[key]] if key in cache else []
+                except TypeError:
+                    return []
+            return probe
+        else:
+            rows = table.cache.values()
+
+        built: Dict[Any, List[JsonModel]] = {}
+        get = attrgetter(field_name)
+        for obj in rows:
+            key = get(obj)
+            if key is not None:
+                built.setdefault(key, []).append(obj)
+        def probe(key):
+            try:
+                return built.get(key, [])
+            except TypeError:
+                return []
+        return probe
@@ -0,0 +1,211 @@
+import os
+import threading
+from contextlib import ExitStack, contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional
+from fastjson_db.errors import OperationError
+
+try:
+    import fcntl
+except ImportError:  # Not a POSIX system: no shared tables
+    fcntl = None
+
+class _Side:
+    """Context manager for one side (read or write) of an RWLock."""
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire: Callable[[], None], release: Callable[[], None]):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._release()
+
+class RWLock:
+    """Many concurrent readers or a single writer. Waiting writers block new readers.
+
+    Reentrant per thread: reads and writes nest, and a writer may read. A reader asking to
+    write raises OperationError instead of deadlocking.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}   # Thread ident -> read depth
+        self._writer: Optional[int] = None
+        self._writes = 0                     # Write depth of the writer
+        self._waiting = 0                    # Writers waiting for the readers to leave
+        self._read_side = _Side(self.acquire_read, self.release_read)
+        self._write_side = _Side(self.acquire_write, self.release_write)
+
+    def read(self) -> _Side:
+        return self._read_side
+
+    def write(self) -> _Side:
+        return self._write_side
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._waiting:
+                self._cond.wait()
+            self._readers[me] = 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers[me] - 1
+            if depth:
+                self._readers[me] = depth
+                return
+            del self._readers[me]
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writes += 1
+                return
+            if me in self._readers:
+                raise OperationError("Lock Error", "Cannot write to a table while reading it in the same thread")
+            self._waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting -= 1
+            self._writer, self._writes = me, 1
+
+    def release_write(self):
+        with self._cond:
+            self._writes -= 1
+            if not self._writes:
+                self._writer = None
+                self._cond.notify_all()
+
+class NoLock:
+    """Stand-in for RWLock on tables used from a single thread: both sides are no-ops."""
+    _side = nullcontext()
+
+    def read(self) -> nullcontext:
+        return self._side
+
+    def write(self) -> nullcontext:
+        return self._side
+
+class MultiLock:
+    """One side of several table locks at once, always taken in the same order (no deadlock
+    between two MultiLocks over the same tables)."""
+
+    def __init__(self, locks: List["RWLock | NoLock"]):
+        self.locks = locks
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with ExitStack() as stack:
+            for lock in self.locks:
+                stack.enter_context(lock.read())
+            yield
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with ExitStack() as stack:
+            for lock in self.locks:
+                stack.enter_context(lock.write())
+            yield
+
+def combined_lock(*locks: "RWLock | NoLock | MultiLock") -> MultiLock:
+    """One MultiLock over the locks of several tables (shards included), each taken once and in
+    a global order, so threads locking the same tables in opposite orders cannot deadlock."""
+    flat = {}
+    for lock in locks:
+        for inner in (lock.locks if isinstance(lock, MultiLock) else [lock]):
+            flat[id(inner)] = inner
+    return MultiLock([flat[key] for key in sorted(flat)])
+
+class ProcessLock:
+    """Table lock for tables shared by several processes: the write side also holds an exclusive
+    fcntl.flock on 'path', so one process at a time writes the table files. Reads only take the
+    in-process 'local' lock, since every process reads its own cache.
+    """
+
+    def __init__(self, path: str, local: "RWLock | NoLock"):
+        if fcntl is None:
+            raise OperationError("Lock Error", "Shared tables need fcntl (a POSIX system)")
+        self.path = path
+        self.local = local
+        self._mutex = threading.RLock()  # Threads of this process take turns on the file lock
+        self._depth = 0
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+
+    def read(self):
+        return self.local.read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self.exclusive(), self.local.write():
+            yield
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Only the file lock: other processes wait, readers of this process go on."""
+        if self._pid != os.getpid():
+            self._reopen()
+        with self._mutex:
+            if not self._depth:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _reopen(self):
+        """Own file descriptor per process: a forked child would share its parent's flock."""
+        if self._fd is not None:
+            os.close(self._fd)
+        self._mutex = threading.RLock()
+        self._depth = 0
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._pid = os.getpid()
+
+    def close(self):
+        if self._fd is not None and self._pid == os.getpid():
+            os.close(self._fd)
+        self._fd = self._pid = None
+
+def write_locked(method):
+    """Run a table method under the write side of 'self.lock'."""
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.write():
+            return method(self, *args, **kwargs)
+    return locked
+
+def read_locked(method):
+    """Run a table method under the read side of 'self.lock'."""
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+    return locked
+
+def compaction_locked(method):
+    """Run a table method under 'self._compaction_lock': no compaction swaps the base file and
+    deletes segments while it reads them."""
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._compaction_lock:
+            return method(self, *args, **kwargs)
+    return locked
@@ -1,29 +1,139 @@
-import orjson
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from fastjson_db.core import JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.core.gc_pause import paused_gc
+from fastjson_db.core.metrics import Metrics, MetricsHook
+from fastjson_db.log.parallel_load import snapshot_ranges
+from fastjson_db.errors import OperationError
+
+TABLE_SUFFIXES = (".json", ".jsonl")  # Files _discoverTables treats as tables
 
 class JsonApp():
     """Base engine for the FastJson-DB framework"""
-    def __init__(self):
-        """Starts the application"""
+    def __init__(self, data_dir: Optional[str | os.PathLike] = None, workers: Optional[int] = None):
+        """Starts the application
+
+        'data_dir' is the folder checked by _discoverTables. 'workers' is the number of processes
+        parsing large tables at load time (None: one per CPU; 0 or 1: parse in threads only).
+        """
+        if workers is not None and (not isinstance(workers, int) or workers < 0):
+            raise OperationError("JsonApp Creation Error", "'workers' must be an 'int' >= 0 or None")
+        self.data_dir = os.fspath(data_dir) if data_dir is not None else None
+        self.workers = workers
         self._TABLE_REGISTRY = {} # Stores all JsonTables with key-value (JsonModel, JsonTable)
+        self._QUERIERS: List[JsonQuerier] = [] # Queriers whose indices are built by _loadCache
         self._loadTables()
         self._loadCache()
         pass
-    
+
+    def loadDatabase(self, pause_gc: bool = True, freeze_gc: bool = False):
+        """Check the data folder, then load every table and build every querier's indices
+
+        With pause_gc=True the cyclic GC is paused meanwhile (its full passes over the new objects
+        take most of the hydration time). freeze_gc=True then freezes the loaded objects out of
+        later passes (see paused_gc: they are never collected).
+        """
+        self._discoverTables()
+        if not pause_gc:
+            self._loadTables()
+            self._loadCache()
+            return
+        with paused_gc(freeze_gc):
+            self._loadTables()
+            self._loadCache()
+
     def _loadCache(self):
-        """Loads the .json tables in cache"""
-        pass
-    
+        """Builds the indices of every registered JsonQuerier, in parallel threads"""
+        if not self._QUERIERS:
+            return
+        with ThreadPoolExecutor(max_workers=len(self._QUERIERS)) as threads:
+            # list() re-raises the first build error
+            list(threads.map(lambda querier: querier._load_cache(), self._QUERIERS))
+
     def _loadTables(self):
-        """Loads every .json table in _TABLE_REGISTRY in intialization"""
-        pass
-    
+        """Loads every .json table in _TABLE_REGISTRY in intialization
+
+        Tables load concurrently, largest file first. Large JSON Lines snapshots are split into
+        byte ranges parsed by a shared process pool.
+        """
+        tables = sorted(self._TABLE_REGISTRY.values(), key=self._tableSize, reverse=True)
+        if not tables:
+            return
+        pool = self._parserPool(tables)
+        try:
+            with ThreadPoolExecutor(max_workers=len(tables)) as threads:
+                list(threads.map(lambda table: table._load_cache(pool), tables))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def _parserPool(self, tables: List[JsonTable]) -> Optional[ProcessPoolExecutor]:
+        """Process pool for the load, or None when no table would be split or there is one CPU"""
+        workers = self.workers if self.workers is not None else (os.cpu_count() or 1)
+        if workers < 2 or not any(snapshot_ranges(table.path, table.file_format, workers) for table in tables):
+            return None
+        return ProcessPoolExecutor(max_workers=workers)
+
+    def _tableSize(self, table: JsonTable) -> int:
+        try:
+            return os.path.getsize(table.path)
+        except FileNotFoundError:
+            return 0
+
     def _flushDatabase(self):
-        """Load .log operations in the .json tables"""
-        pass
-    
-    def _discoverTables(self):
-        """Discover created .json files and assert they are registred in _TABLE_REGISTRY"""
-    
-    def registerTable(self):
-        """Add a new tabble to the _tables list and _tables registry"""
-        pass
\ No newline at end of file
+        """Flush the changed rows of every registered table as new segment files, returns rows written"""
+        return sum(table.flush() for table in self._TABLE_REGISTRY.values())
+
+    def pollDatabase(self) -> int:
+        """Apply the changes other processes made to the shared tables, returns changes applied"""
+        return sum(table.poll() for table in self._TABLE_REGISTRY.values() if table.shared)
+
+    def enableMetrics(self, hook: Optional[MetricsHook] = None) -> Dict[str, Metrics]:
+        """Enable metrics (see JsonTable.enable_metrics) on every registered table, all exporting
+        through 'hook'. Returns {model name: Metrics}."""
+        return {model.__name__: table.enable_metrics(hook) for model, table in self._TABLE_REGISTRY.items()}
+
+    def disableMetrics(self):
+        for table in self._TABLE_REGISTRY.values():
+            table.disable_metrics()
+
+    def _discoverTables(self) -> Dict[str, JsonTable]:
+        """Discover created .json files and assert they are registred in _TABLE_REGISTRY
+
+        Returns {path: table} for the table files found in 'data_dir' (nothing without one).
+        """
+        if self.data_dir is None:
+            return {}
+        registered = {os.path.abspath(table.path): table for table in self._TABLE_REGISTRY.values()}
+        found, unknown = {}, []
+        for entry in sorted(os.scandir(self.data_dir), key=lambda entry: entry.name):
+            if not entry.is_file() or not entry.name.endswith(TABLE_SUFFIXES):
+                continue
+            path = os.path.abspath(entry.path)
+            if path in registered:
+                found[path] = registered[path]
+            else:
+                unknown.append(entry.name)
+        if unknown:
+            raise OperationError("Discover Error", f"Table files without a registered table: {unknown}")
+        return found
+
+    def registerTable(self, table: JsonTable):
+        """Add a new table to the _TABLE_REGISTRY"""
+        if not isinstance(table, JsonTable):
+            raise OperationError("Register Error", "'table' must be a JsonTable")
+        if table.model in self._TABLE_REGISTRY:
+            raise OperationError("Register Error", f"A table for {table.model.__name__} is already registered")
+        self._TABLE_REGISTRY[table.model] = table
+        return table
+
+    def registerQuerier(self, querier: JsonQuerier):
+        """Add a JsonQuerier, over a registered table, whose indices _loadCache builds"""
+        if not isinstance(querier, JsonQuerier):
+            raise OperationError("Register Error", "'querier' must be a JsonQuerier")
+        if querier.table not in self._TABLE_REGISTRY.values():
+            raise OperationError("Register Error", "The querier's table must be registered first")
+        self._QUERIERS.append(querier)
+        return querier
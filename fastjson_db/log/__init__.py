@@ -0,0 +1,7 @@
+from .wal import WriteAheadLog
+from .json_journal import JsonJournal
+from .segment_store import SegmentStore, FlushStats
+from .record_file import RecordFile
+from .change_feed import ChangeFeed
+
+__all__ = ["WriteAheadLog", "JsonJournal", "SegmentStore", "FlushStats", "RecordFile", "ChangeFeed"]
@@ -0,0 +1,97 @@
+import os
+import orjson
+from typing import Any, Dict, List, Optional, Tuple
+
+class ChangeFeed:
+    """Follows a WriteAheadLog that other processes append to, by sequence number.
+
+    read() returns the records appended since the previous read, checkpoint markers included.
+    It must run under the table's process lock, so no writer appends or truncates meanwhile.
+    A truncation rewrites the log from its start, so its first line tells whether the offset
+    of the previous read still points into the same log (sizes may match by chance).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.seq: Optional[int] = None  # Last sequence number applied, None until mark()
+        self._offset = 0
+        self._stat: Optional[Tuple[int, int]] = None  # (size, mtime) at the last read
+        self._head = b""  # First line of the log at the last read
+
+    def mark(self, seq: int, rewritten: bool = True):
+        """Position the feed at the end of the log, which holds every record up to 'seq'.
+
+        rewritten=False when the log was only appended to since the last read or mark.
+        """
+        self.seq = seq
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            self._offset, self._stat, self._head = 0, None, b""
+            return
+        with f:
+            if rewritten:
+                self._head = f.readline()
+            stat = os.fstat(f.fileno())
+        self._offset, self._stat = stat.st_size, (stat.st_size, stat.st_mtime_ns)
+
+    def changed(self) -> bool:
+        """Whether the log was appended to or truncated since the last read (one stat, no lock)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self._stat is not None
+        return (stat.st_size, stat.st_mtime_ns) != self._stat
+
+    def read(self) -> Optional[List[Dict[str, Any]]]:
+        """Records logged after 'seq', oldest first, with the checkpoint markers met on the way.
+
+        None when a truncation dropped records never read: the caller must reload from disk.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return None if self._offset else []
+        with f:
+            stat = os.fstat(f.fileno())
+            head = f.readline()
+            if head == self._head and self._offset <= stat.st_size:
+                # Still the log read last time: only the appended records are new
+                f.seek(self._offset)
+                records, end = self._parse(f, self._offset)
+            else:
+                f.seek(0)
+                records, end = self._parse(f, 0)
+                if not records:
+                    return None  # Emptied by something else than the engine
+                first = records[0]
+                if (first["seq"] if first["op"] == "checkpoint" else first["seq"] - 1) > self.seq:
+                    return None
+                # Markers at 'seq' may be new: a flush right after the last record read
+                records = [r for r in records if r["seq"] > self.seq or
+                           (r["op"] == "checkpoint" and r["seq"] == self.seq)]
+        if end < stat.st_size:
+            # Torn record left by a writer that crashed: later appends must not follow it
+            os.truncate(self.path, end)
+            stat = os.stat(self.path)
+        if records:
+            self.seq = max(self.seq, records[-1]["seq"])
+        self._offset, self._stat, self._head = end, (stat.st_size, stat.st_mtime_ns), head
+        return records
+
+    @staticmethod
+    def _parse(f, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Complete records from the current position, and the offset after the last one."""
+        records = []
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                break
+            if not isinstance(record, dict) or "seq" not in record:
+                break
+            records.append(record)
+            offset += len(line)
+        return records, offset
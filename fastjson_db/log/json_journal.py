@@ -0,0 +1,84 @@
+import os
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+from .wal import WriteAheadLog
+
+def atomic_write(path: str, payload: bytes):
+    """Write bytes to 'path' through a fsynced temp file and an atomic rename."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+def _fsync_dir(directory: str):
+    """Persist a rename by syncing its directory (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_snapshot(path: str, payload: bytes):
+    """Atomically write a table snapshot plus its '<path>.crc32' sidecar."""
+    atomic_write(path, payload)
+    atomic_write(f"{path}.crc32", b"%08x" % zlib.crc32(payload))
+
+def verify_snapshot(path: str, payload: bytes) -> Optional[bool]:
+    """True if 'payload' matches the snapshot sidecar, False if it does not, None if there is none."""
+    try:
+        with open(f"{path}.crc32", "rb") as f:
+            expected = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return expected == b"%08x" % zlib.crc32(payload)
+
+class JsonJournal:
+    """Write-ahead '.log' of a JsonTable, holding the mutations not yet flushed to disk."""
+
+    def __init__(self, table_path: str, sync_every: int = 1, sync_interval_ms: Optional[float] = None):
+        self.table_path = table_path
+        self.wal = WriteAheadLog(f"{table_path}.log", sync_every=sync_every, sync_interval_ms=sync_interval_ms)
+
+    # ------------------ Logging ------------------ #
+    def record_put(self, key: Any, row: Dict[str, Any]) -> int:
+        """Log the full new state of a row (insert or update)."""
+        self.wal.open()
+        return self.wal.append("put", key, row)
+
+    def record_delete(self, key: Any) -> int:
+        """Log the removal of a row."""
+        self.wal.open()
+        return self.wal.append("delete", key)
+
+    # ------------------ Recovery ------------------ #
+    def replay(self) -> Iterator[Tuple[str, Any, Optional[Dict[str, Any]]]]:
+        """Yield (op, id, row) for every logged mutation since the last flush.
+
+        Every record carries the full row state, so replaying a log over a snapshot
+        that already contains part of it converges to the same table.
+        """
+        for record in self.wal.replay():
+            if record["op"] == "checkpoint":
+                continue
+            yield record["op"], record["id"], record.get("data")
+
+    def open(self):
+        self.wal.open()
+
+    def close(self):
+        self.wal.close()
+
+    def truncate(self, keep: bool = False):
+        """Drop every logged record once the changes are persisted elsewhere (segment or snapshot).
+
+        keep=True keeps the records since the previous truncation for change feed readers.
+        """
+        self.wal.truncate(keep)
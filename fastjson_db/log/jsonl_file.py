@@ -0,0 +1,71 @@
+import os
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import orjson
+from fastjson_db.errors import OperationError
+from .json_journal import _fsync_dir, atomic_write
+
+DEFAULT_CHUNK = 10_000   # Rows per chunk when streaming JSON Lines
+READ_BLOCK = 1 << 20     # Bytes per read when checksumming a file
+
+def iter_jsonl(path: str, chunk_size: int = DEFAULT_CHUNK) -> Iterator[List[Dict[str, Any]]]:
+    """Yield the rows of a JSON Lines file in lists of at most 'chunk_size', reading it line by line."""
+    chunk: List[Dict[str, Any]] = []
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                chunk.append(orjson.loads(line))
+            except orjson.JSONDecodeError as e:
+                raise OperationError("Load Error", f"'{path}' line {number} is not valid JSON: {e}") from e
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def write_jsonl(path: str, rows: Iterable[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK,
+                checksum: bool = False) -> int:
+    """Atomically write rows as JSON Lines, 'chunk_size' rows per write. Returns the row count.
+
+    With checksum=True a '<path>.crc32' sidecar is written too, as for a table snapshot.
+    """
+    tmp_path = f"{path}.tmp"
+    count, crc = 0, 0
+    buffer: List[bytes] = []
+    with open(tmp_path, "wb") as f:
+        for row in rows:
+            buffer.append(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE))
+            if len(buffer) >= chunk_size:
+                crc = _write_chunk(f, buffer, crc)
+                count += len(buffer)
+                buffer = []
+        if buffer:
+            crc = _write_chunk(f, buffer, crc)
+            count += len(buffer)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+    if checksum:
+        atomic_write(f"{path}.crc32", b"%08x" % crc)
+    return count
+
+def _write_chunk(f, buffer: List[bytes], crc: int) -> int:
+    data = b"".join(buffer)
+    f.write(data)
+    return zlib.crc32(data, crc)
+
+def verify_jsonl(path: str) -> Optional[bool]:
+    """True if the file matches its '.crc32' sidecar, False if not, None if there is none (streamed)."""
+    try:
+        with open(f"{path}.crc32", "rb") as f:
+            expected = f.read().strip()
+    except FileNotFoundError:
+        return None
+    crc = 0
+    with open(path, "rb") as f:
+        while block := f.read(READ_BLOCK):
+            crc = zlib.crc32(block, crc)
+    return expected == b"%08x" % crc
@@ -0,0 +1,77 @@
+import os
+from typing import Any, List, Optional, Tuple
+import orjson
+
+PARALLEL_MIN_BYTES = 4 << 20   # Smaller snapshots are parsed in the calling thread
+RANGE_MIN_BYTES = 2 << 20      # Smallest byte range of a JSON Lines file given to one worker
+
+Columns = List[List[Any]]      # One list of stored values per field, in model field order
+
+def snapshot_ranges(path: str, file_format: str, workers: int) -> List[Tuple[int, int]]:
+    """Byte ranges to parse in parallel, or [] when the file is missing or too small to be worth it.
+
+    Only JSON Lines files are split, into up to 'workers' ranges. A JSON array file is always []:
+    one worker parsing all of it, then pickling the rows back, is slower than the calling thread.
+    """
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return []
+    if file_format != "jsonl" or size < PARALLEL_MIN_BYTES:
+        return []
+    parts = max(1, min(workers, size // RANGE_MIN_BYTES))
+    step = -(-size // parts)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+def parse_range(path: str, start: int, end: int, names: List[str],
+                model: Optional[type] = None, verify_stride: int = 0) -> Columns:
+    """Worker side: parse the JSON Lines rows starting in [start, end) and return them as columns.
+
+    Lists of plain values pickle far smaller and faster than model objects; the parent hydrates
+    them with JsonModel._trusted_hydrate_values. Every 'verify_stride'-th row (1: all of them)
+    is fully validated with 'model' first. Errors are raised as ValueError, which always pickles.
+    """
+    rows = _read_rows(path, start, end)
+    if verify_stride:
+        for n in range(0, len(rows), verify_stride):
+            try:
+                model.from_json(rows[n])
+            except Exception as e:
+                raise ValueError(f"Row {rows[n].get('id')!r} failed verification: {e}") from None
+    return [[row.get(name) for row in rows] for name in names]
+
+def _read_rows(path: str, start: int, end: int) -> List[Any]:
+    """Rows of the lines starting in [start, end): a line crossing 'start' belongs to the range before."""
+    rows = []
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            position = start - 1 + len(f.readline())  # Skip to the first line starting at or after 'start'
+        else:
+            position = 0
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            if not line.strip():
+                continue
+            try:
+                rows.append(orjson.loads(line))
+            except orjson.JSONDecodeError as e:
+                # Same message as iter_jsonl, so a load fails the same way with or without a pool
+                number = _line_number(path, position - len(line))
+                raise ValueError(f"'{path}' line {number} is not valid JSON: {e}") from None
+    return rows
+
+def _line_number(path: str, offset: int) -> int:
+    """1-based number of the line starting at 'offset' (only computed on errors)."""
+    count = 0
+    with open(path, "rb") as f:
+        while offset > 0:
+            block = f.read(min(offset, 1 << 20))
+            if not block:
+                break
+            count += block.count(b"\n")
+            offset -= len(block)
+    return count + 1
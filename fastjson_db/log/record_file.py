@@ -0,0 +1,130 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+import orjson
+from fastjson_db.errors import OperationError
+from .json_journal import _fsync_dir
+
+MAGIC = b"FJDBMAP1"
+RECORD = struct.Struct("<I")        # Length prefix of one orjson row
+COUNT = struct.Struct("<Q")         # Number of rows, first field of the footer
+TRAILER = struct.Struct("<Q8s")     # Footer offset, magic
+
+class RecordFile:
+    """Read side of a binary table file, accessed through mmap.
+
+    Layout: MAGIC, then one [u32 length][orjson row] record per row sorted by ID, then a
+    footer ([u64 count][u64 offset per row][orjson list of IDs]) and a trailer pointing at it.
+    Only the footer is parsed when opening: rows are decoded one at a time on access.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ids: Any = []                  # Sorted IDs (an array('q') when they are all ints)
+        self.offsets = array("Q")           # Record offset of each ID
+        self._map: Optional[mmap.mmap] = None
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        m = self._map
+        if size < len(MAGIC) + COUNT.size + TRAILER.size or m[:len(MAGIC)] != MAGIC:
+            raise OperationError("Load Error", f"'{path}' is not a binary table file")
+        footer, magic = TRAILER.unpack_from(m, size - TRAILER.size)
+        if magic != MAGIC or footer >= size:
+            raise OperationError("Load Error", f"'{path}' has a damaged footer")
+        count, = COUNT.unpack_from(m, footer)
+        start = footer + COUNT.size
+        self.offsets.frombytes(m[start:start + 8 * count])
+        ids = orjson.loads(m[start + 8 * count:size - TRAILER.size])
+        if all(type(query_id) is int for query_id in ids):
+            try:
+                ids = array("q", ids)   # 8 bytes per ID instead of a list of int objects
+            except OverflowError:
+                pass
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def find(self, query_id: Any) -> int:
+        """Position of an ID (binary search), or -1."""
+        ids = self.ids
+        try:
+            i = bisect_left(ids, query_id)
+        except TypeError:
+            return -1   # ID of another type than the stored ones
+        return i if i < len(ids) and ids[i] == query_id else -1
+
+    def raw(self, position: int) -> bytes:
+        """orjson bytes of the row at a position."""
+        offset = self.offsets[position]
+        length, = RECORD.unpack_from(self._map, offset)
+        start = offset + RECORD.size
+        return self._map[start:start + length]
+
+    def row(self, position: int) -> Dict[str, Any]:
+        return orjson.loads(self.raw(position))
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+def merge_records(base: RecordFile, changes: Dict[Any, Optional[bytes]]) -> Iterator[Tuple[Any, bytes]]:
+    """(id, raw row) of 'base' with 'changes' applied (None deletes), in ID order.
+
+    Unchanged rows are copied as raw bytes, never decoded.
+    """
+    try:
+        changed = sorted(changes)
+    except TypeError as e:
+        raise OperationError("Write Error", f"IDs of a binary table must be mutually comparable: {e}") from e
+    j, n = 0, len(changed)
+    for position, query_id in enumerate(base.ids):
+        while j < n and changed[j] < query_id:
+            if changes[changed[j]] is not None:
+                yield changed[j], changes[changed[j]]
+            j += 1
+        if j < n and changed[j] == query_id:
+            if changes[query_id] is not None:
+                yield query_id, changes[query_id]
+            j += 1
+            continue
+        yield query_id, base.raw(position)
+    for query_id in changed[j:]:
+        if changes[query_id] is not None:
+            yield query_id, changes[query_id]
+
+def write_record_file(path: str, records: Iterable[Tuple[Any, bytes]]):
+    """Atomically write (id, raw row) pairs sorted by ID as a binary table file, streaming rows to disk."""
+    tmp_path = f"{path}.tmp"
+    ids, offsets = [], array("Q")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        position = len(MAGIC)
+        for query_id, raw in records:
+            if ids and not ids[-1] < query_id:
+                raise OperationError("Write Error", f"Binary table rows must be sorted by unique ID (at {query_id!r})")
+            ids.append(query_id)
+            offsets.append(position)
+            f.write(RECORD.pack(len(raw)))
+            f.write(raw)
+            position += RECORD.size + len(raw)
+        f.write(COUNT.pack(len(ids)))
+        f.write(offsets.tobytes())
+        f.write(orjson.dumps(ids))
+        f.write(TRAILER.pack(position, MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
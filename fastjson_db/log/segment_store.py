@@ -0,0 +1,157 @@
+import os
+import threading
+import orjson
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .json_journal import atomic_write, write_snapshot
+from .jsonl_file import iter_jsonl, write_jsonl
+
+class SegmentStore:
+    """Incremental flush files of a table: '<path>.seg.<N>', each holding the rows changed since the previous one.
+
+    A segment is a JSON list of records shaped like the WAL ones ({"op": "put", "id", "data"} or
+    {"op": "delete", "id"}). Loading applies the base table, then every segment in order.
+    Compaction folds segments into a fresh base table and deletes them.
+    """
+
+    def __init__(self, table_path: str, file_format: str = "json"):
+        self.table_path = table_path
+        self.file_format = file_format  # Format of the base table: "json" or "jsonl"
+        self._directory = os.path.dirname(os.path.abspath(table_path))
+        self._prefix = f"{os.path.basename(table_path)}.seg."
+        self._lock = threading.Lock()  # Guards segment numbering
+        self._next = max(self.segment_numbers(), default=0) + 1
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self._directory, f"{self._prefix}{number}")
+
+    def segment_numbers(self) -> List[int]:
+        """Numbers of the segments on disk, oldest first."""
+        numbers = []
+        try:
+            names = os.listdir(self._directory)
+        except FileNotFoundError:
+            return numbers
+        for name in names:
+            if name.startswith(self._prefix) and name[len(self._prefix):].isdigit():
+                numbers.append(int(name[len(self._prefix):]))
+        return sorted(numbers)
+
+    # ------------------ Write ------------------ #
+    def write(self, records: List[Dict[str, Any]]) -> int:
+        """Atomically write one segment (temp file, fsync, rename) and return its number.
+
+        Numbers stay above the segments on disk, which another process may have written.
+        """
+        with self._lock:
+            number = max(self._next, max(self.segment_numbers(), default=0) + 1)
+            self._next = number
+            self._next += 1
+        atomic_write(self._segment_path(number), orjson.dumps(records))
+        return number
+
+    # ------------------ Read ------------------ #
+    def read(self, number: int) -> List[Dict[str, Any]]:
+        with open(self._segment_path(number), "rb") as f:
+            return orjson.loads(f.read())
+
+    def replay(self, numbers: Optional[Iterable[int]] = None) -> Iterator[Tuple[str, Any, Optional[Dict[str, Any]]]]:
+        """Yield (op, id, row) from every segment (or the given ones), oldest first."""
+        for number in (self.segment_numbers() if numbers is None else numbers):
+            for record in self.read(number):
+                yield record["op"], record["id"], record.get("data")
+
+    # ------------------ Compaction ------------------ #
+    def discard(self, numbers: Iterable[int]):
+        """Delete segments already folded into the base table."""
+        for number in numbers:
+            try:
+                os.remove(self._segment_path(number))
+            except FileNotFoundError:
+                pass
+
+    def compact(self, numbers: Optional[List[int]] = None) -> int:
+        """Merge the base table and the given segments (default: all) on disk into a new base table.
+
+        Works on the files only, so the live table keeps taking writes and flushes meanwhile.
+        Returns the number of rows in the new base.
+        """
+        if numbers is None:
+            numbers = self.segment_numbers()
+        if self.file_format == "jsonl":
+            return self._compact_jsonl(numbers)
+        try:
+            with open(self.table_path, "rb") as f:
+                base = orjson.loads(f.read())
+        except FileNotFoundError:
+            base = []
+
+        rows: Dict[Any, Dict[str, Any]] = {row["id"]: row for row in base}
+        for op, key, row in self.replay(numbers):
+            if op == "put":
+                rows[key] = row
+            else:
+                rows.pop(key, None)
+
+        # Replaying an already-merged segment over the new base is idempotent, so a crash
+        # between the rename and the deletes below is harmless
+        write_snapshot(self.table_path, orjson.dumps(list(rows.values())))
+        self.discard(numbers)
+        return len(rows)
+
+    def _compact_jsonl(self, numbers: List[int]) -> int:
+        """Stream a JSON Lines base table through the segment changes: memory follows the changes only."""
+        changes: Dict[Any, Optional[Dict[str, Any]]] = {}
+        for op, key, row in self.replay(numbers):
+            changes[key] = row if op == "put" else None
+
+        def merged() -> Iterator[Dict[str, Any]]:
+            if os.path.exists(self.table_path):
+                for chunk in iter_jsonl(self.table_path):
+                    for row in chunk:
+                        key = row["id"]
+                        if key in changes:
+                            row = changes.pop(key)
+                            if row is None:
+                                continue
+                        yield row
+            for row in changes.values():
+                if row is not None:
+                    yield row
+
+        count = write_jsonl(self.table_path, merged(), checksum=True)
+        self.discard(numbers)
+        return count
+
+class FlushStats:
+    """Running latency figures for flushes and compactions of one table."""
+
+    def __init__(self):
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+        self.compactions = 0
+        self.last_compaction_seconds = 0.0
+        self.max_compaction_seconds = 0.0
+
+    def record_flush(self, rows: int, seconds: float):
+        self.flushes += 1
+        self.rows_flushed += rows
+        self.last_flush_seconds = seconds
+        self.max_flush_seconds = max(self.max_flush_seconds, seconds)
+        self.total_flush_seconds += seconds
+
+    def record_compaction(self, seconds: float):
+        self.compactions += 1
+        self.last_compaction_seconds = seconds
+        self.max_compaction_seconds = max(self.max_compaction_seconds, seconds)
+
+    @property
+    def avg_flush_seconds(self) -> float:
+        return self.total_flush_seconds / self.flushes if self.flushes else 0.0
+
+    def __repr__(self):
+        return (f"<FlushStats flushes={self.flushes} rows={self.rows_flushed} "
+                f"avg={self.avg_flush_seconds * 1000:.2f}ms max={self.max_flush_seconds * 1000:.2f}ms "
+                f"compactions={self.compactions}>")
@@ -0,0 +1,177 @@
+import os
+import threading
+import orjson
+from typing import Any, Dict, Iterator, Optional
+from fastjson_db.errors import OperationError
+
+class WriteAheadLog:
+    """Append-only JSON Lines log with group commit (fsync batching)."""
+
+    def __init__(self, path: str | os.PathLike, sync_every: int = 1, sync_interval_ms: Optional[float] = None):
+        if not isinstance(sync_every, int) or sync_every < 0:
+            raise OperationError("WAL Creation Error", "'sync_every' must be an 'int' >= 0")
+        if sync_interval_ms is not None and sync_interval_ms <= 0:
+            raise OperationError("WAL Creation Error", "'sync_interval_ms' must be > 0 or None")
+
+        self.path = os.fspath(path)
+        self.sync_every = sync_every                # fsync after N appends (0 disables)
+        self.sync_interval_ms = sync_interval_ms    # fsync at most T ms after an append (None disables)
+        self.seq = 0                                # last sequence number written
+        self.synced_seq = 0                         # last sequence number known to be on disk
+
+        self._file = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()          # Serializes sync(), whose fsync runs outside _lock
+        self._stop = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+
+    # ------------------ Open / Close ------------------ #
+    def open(self):
+        """Open the log for appending, starting a background syncer if interval commit is enabled."""
+        if self._file is not None:
+            return
+        self._file = open(self.path, "ab")
+        if self.sync_interval_ms is not None:
+            self._stop.clear()
+            self._syncer = threading.Thread(target=self._sync_loop, name=f"wal-sync:{self.path}", daemon=True)
+            self._syncer.start()
+
+    def close(self):
+        """Sync pending records and close the log."""
+        if self._syncer is not None:
+            self._stop.set()
+            self._syncer.join()
+            self._syncer = None
+        with self._sync_lock, self._lock:
+            if self._file is not None:
+                self._sync_locked()
+                self._file.close()
+                self._file = None
+
+    # ------------------ Append / Sync ------------------ #
+    def append(self, op: str, key: Any, data: Optional[Dict[str, Any]] = None) -> int:
+        """Append one record in O(1) and return its sequence number."""
+        with self._lock:
+            if self._file is None:
+                raise OperationError("WAL Error", f"Log '{self.path}' is not open")
+            self.seq += 1
+            record = {"seq": self.seq, "op": op, "id": key}
+            if data is not None:
+                record["data"] = data
+            self._file.write(orjson.dumps(record) + b"\n")
+            self._pending += 1
+            if self.sync_every and self._pending >= self.sync_every:
+                self._sync_locked()
+            return self.seq
+
+    def sync(self):
+        """Force every appended record to disk. Appends made during the fsync are not blocked."""
+        with self._sync_lock:
+            with self._lock:
+                if self._file is None or not self._pending:
+                    return
+                self._file.flush()
+                fd, seq = self._file.fileno(), self.seq
+                self._pending = 0
+            os.fsync(fd)
+            with self._lock:
+                self.synced_seq = max(self.synced_seq, seq)
+
+    def flush(self):
+        """Hand buffered records to the OS without an fsync: other processes can read them."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def follow(self, seq: int):
+        """Number the next record after 'seq', the last record appended by another process.
+
+        Their writer syncs those records, so once ours are on disk everything up to 'seq' is.
+        """
+        with self._lock:
+            self.seq = seq
+            if not self._pending:
+                self.synced_seq = max(self.synced_seq, seq)
+
+    def _sync_locked(self):
+        if self._file is None or not self._pending:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self.synced_seq = self.seq
+
+    def _sync_loop(self):
+        interval = self.sync_interval_ms / 1000
+        while not self._stop.wait(interval):
+            self.sync()
+
+    # ------------------ Recovery ------------------ #
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yield every complete record in order, cutting off a torn tail left by a crash."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        good_offset = 0
+        torn = False
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    torn = True
+                    break
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    torn = True
+                    break
+                good_offset += len(line)
+                self.seq = self.synced_seq = record["seq"]
+                yield record
+        if torn:
+            with open(self.path, "r+b") as f:
+                f.truncate(good_offset)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def truncate(self, keep: bool = False):
+        """Discard every record (called once they are folded into a snapshot), keeping the sequence.
+
+        With keep=True the records logged since the previous truncation stay ahead of the new
+        marker, so change feed readers one truncation behind can still follow the log.
+        """
+        with self._sync_lock, self._lock:
+            reopen = self._file is not None
+            if reopen:
+                self._file.close()
+            kept = self._last_generation() if keep else b""
+            with open(self.path, "wb") as f:
+                # A checkpoint marker keeps sequence numbers monotonic across restarts
+                f.write(kept + orjson.dumps({"seq": self.seq, "op": "checkpoint", "id": None}) + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending = 0
+            self.synced_seq = self.seq
+            if reopen:
+                self._file = open(self.path, "ab")
+
+    def _last_generation(self) -> bytes:
+        """Complete records after the last checkpoint marker."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return b""
+        start = end = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                break
+            end += len(line)
+            if record["op"] == "checkpoint":
+                start = end
+        return data[start:end]
@@ -0,0 +1,107 @@
+import random
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.errors import OperationError
+
+class Order(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    shop = Field(field_name="shop", type=str)
+    items = Field(field_name="items", type=int)
+    total = Field(field_name="total", type=float)
+
+FUNCS = {
+    "sum": sum,
+    "avg": lambda values: sum(values) / len(values) if values else None,
+    "min": lambda values: min(values, default=None),
+    "max": lambda values: max(values, default=None),
+    "count": len,
+    "distinct": lambda values: len(set(values)),
+}
+
+@pytest.fixture(scope="module")
+def orders(tmp_path_factory):
+    rng = random.Random(4)
+    table = JsonTable(Order, str(tmp_path_factory.mktemp("orders") / "orders.json"))
+    table._load_cache()
+    for i in range(2000):
+        row = {"id": i, "items": rng.randrange(1, 9)}
+        if i % 12:
+            row["shop"] = rng.choice(["a", "b", "c"])
+        if i % 7:
+            row["total"] = rng.randrange(1, 20000) / 100
+        table.insert(Order(**row))
+    querier = JsonQuerier(table)
+    querier._load_cache()
+    return table, querier
+
+def expected(rows, func, field_name):
+    if field_name == "*":
+        return len(rows)
+    return FUNCS[func]([v for v in (getattr(r, field_name) for r in rows) if v is not None])
+
+def check(result, wanted):
+    assert result.keys() == wanted.keys()
+    for key, value in wanted.items():
+        assert result[key] == pytest.approx(value), key
+
+SPECS = [("sum", "total"), ("avg", "total"), ("min", "items"), ("max", "total"), ("count", "shop"),
+         ("count", "*"), ("distinct", "items"), ("distinct", "shop"), ("avg", "items")]
+
+@pytest.mark.parametrize("conditions, keep", [
+    ({}, lambda r: True),
+    ({"shop": "b"}, lambda r: r.shop == "b"),
+    ({"items__gte": 7}, lambda r: r.items >= 7),
+    ({"total__lt": 10.0}, lambda r: r.total is not None and r.total < 10.0),
+    ({"shop": "a", "total__gt": 100.0}, lambda r: r.shop == "a" and r.total is not None and r.total > 100.0),
+    ({"id__lt": 0}, lambda r: False),
+])
+def test_aggregates_match_a_plain_fold(orders, conditions, keep):
+    table, querier = orders
+    query = querier.filter(**conditions)
+    rows = [r for r in table.cache.values() if keep(r)]
+    result = query.aggregate(**{func: [f for g, f in SPECS if g == func] for func, _ in SPECS})
+    check(result, {("count" if f == "*" else f"{f}__{func}"): expected(rows, func, f) for func, f in SPECS})
+    for func in ("sum", "avg", "min", "max"):
+        assert getattr(querier, func)("total", **conditions) == pytest.approx(expected(rows, func, "total"))
+
+def test_group_by_matches_a_plain_fold(orders):
+    table, querier = orders
+    groups = {}
+    for row in table.cache.values():
+        groups.setdefault(row.shop, []).append(row)
+    for query, rows_of in ((querier.group_by("shop"), groups),
+                           (querier.filter(items__lte=2).group_by("shop"),
+                            {k: [r for r in v if r.items <= 2] for k, v in groups.items()})):
+        result = query.aggregate(count="*", sum="total", max="items")
+        assert None in result  # Rows without a shop form their own group
+        assert result.keys() == {k for k, v in rows_of.items() if v}
+        for shop, values in result.items():
+            check(values, {"count": len(rows_of[shop]), "total__sum": expected(rows_of[shop], "sum", "total"),
+                           "items__max": expected(rows_of[shop], "max", "items")})
+
+def test_index_answers_match_the_fold(orders):
+    table, querier = orders
+    rows = list(table.cache.values())
+    # No conditions, or one on the aggregated field: read from the B-Tree alone
+    for func in ("min", "max", "count", "distinct"):
+        check(querier.aggregate(**{func: "items"}), {f"items__{func}": expected(rows, func, "items")})
+    low = [r for r in rows if r.total is not None and r.total > 150.0]
+    check(querier.filter(total__gt=150.0).aggregate(min="total", count="total", sum="total"),
+          {"total__min": expected(low, "min", "total"), "total__count": len(low),
+           "total__sum": expected(low, "sum", "total")})
+    counts = querier.group_by("items").aggregate(count="*")
+    assert {k: v["count"] for k, v in counts.items()} == \
+        {k: sum(r.items == k for r in rows) for k in {r.items for r in rows}}
+
+def test_empty_results(orders):
+    _, querier = orders
+    assert querier.filter(id__lt=0).aggregate(sum="total", avg="total", min="total", count="*") == \
+        {"total__sum": 0, "total__avg": None, "total__min": None, "count": 0}
+    assert querier.filter(id__lt=0).group_by("shop").aggregate(count="*") == {}
+
+@pytest.mark.parametrize("specs", [{}, {"median": "total"}, {"sum": "missing"}, {"sum": "*"}, {"sum": "shop"}])
+def test_bad_aggregates_raise(orders, specs):
+    _, querier = orders
+    with pytest.raises(OperationError):
+        querier.aggregate(**specs)
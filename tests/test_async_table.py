@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from fastjson_db import AsyncJsonTable, Field, JsonModel, JsonTable
+from fastjson_db.errors import OperationError
+
+class Note(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    text = Field(field_name="text", type=str)
+
+def test_rejects_wal_that_fsyncs_on_append(tmp_path):
+    path = str(tmp_path / "notes.json")
+    with pytest.raises(OperationError):
+        AsyncJsonTable(JsonTable(Note, path, wal=True, thread_safe=True))
+    with pytest.raises(OperationError):
+        AsyncJsonTable(JsonTable(Note, path, wal=True, sync_every=10, thread_safe=True))
+    AsyncJsonTable(JsonTable(Note, path, wal=True, sync_every=0, sync_interval_ms=5, thread_safe=True))
+    AsyncJsonTable(JsonTable(Note, path, thread_safe=True))
+
+def test_durable_writes_sync_in_executor(tmp_path):
+    path = str(tmp_path / "notes.json")
+
+    async def main():
+        notes = AsyncJsonTable(JsonTable(Note, path, wal=True, sync_every=0, thread_safe=True))
+        await notes.load()
+        await asyncio.gather(*(notes.insert(Note(id=i, text=f"t{i}")) for i in range(50)))
+        wal = notes.table.journal.wal
+        assert wal.synced_seq == wal.seq
+        await notes.flush()
+        await notes.close()
+
+    asyncio.run(main())
+    table = JsonTable(Note, path)
+    table._load_cache()
+    assert len(table.cache) == 50
+
+def test_commit_after_following_another_writer(tmp_path):
+    path = str(tmp_path / "notes.json")
+    other = JsonTable(Note, path, wal=True, shared=True)
+    other._load_cache()
+
+    async def main():
+        notes = AsyncJsonTable(JsonTable(Note, path, wal=True, sync_every=0, shared=True, thread_safe=True))
+        await notes.load()
+        other.insert(Note(id=1, text="theirs"))
+        assert await notes.poll() == 1
+        await asyncio.wait_for(notes.commit(), 5)  # Their records were synced by their writer
+        await notes.insert(Note(id=2, text="ours"))
+        await asyncio.wait_for(notes.commit(), 5)
+        wal = notes.table.journal.wal
+        assert wal.synced_seq == wal.seq == 2
+        await notes.close()
+
+    asyncio.run(main())
+    assert other.poll() == 1 and other.get(2).text == "ours"
+    other.close()
@@ -0,0 +1,97 @@
+import random
+import pytest
+from fastjson_db.core.b_tree import BTree, BTreeLeaf
+
+def check(tree, expected):
+    """Compare with a dict of key -> values and check the node invariants and the leaf chain."""
+    keys = sorted(expected)
+    assert len(tree) == len(keys)
+    assert [(k, list(v)) for k, v in tree.items()] == [(k, expected[k]) for k in keys]
+    assert [k for k, _ in tree.items(reverse=True)] == keys[::-1]
+
+    leaves = []
+    def walk(node, low, high, depth):
+        if node is not tree.root:
+            assert tree.min_keys <= len(node.keys) <= tree.order
+        assert all(low is None or low <= k for k in node.keys)
+        assert all(high is None or k < high for k in node.keys)
+        if isinstance(node, BTreeLeaf):
+            leaves.append((node, depth))
+            return
+        assert len(node.children) == len(node.keys) + 1
+        bounds = [low] + node.keys + [high]
+        for i, child in enumerate(node.children):
+            walk(child, bounds[i], bounds[i + 1], depth + 1)
+    walk(tree.root, None, None, 0)
+    assert len({depth for _, depth in leaves}) == 1
+
+    # Both directions of the chain visit the leaves in tree order
+    chain, leaf = [], tree._first_leaf()
+    while leaf is not None:
+        chain.append(leaf)
+        leaf = leaf.next
+    assert chain == [leaf for leaf, _ in leaves]
+    back, leaf = [], tree._last_leaf()
+    while leaf is not None:
+        back.append(leaf)
+        leaf = leaf.prev
+    assert back == chain[::-1]
+
+@pytest.mark.parametrize("order", [4, 5, 16])
+@pytest.mark.parametrize("seed", range(5))
+def test_random_inserts_and_deletes(order, seed):
+    rng = random.Random(seed)
+    if seed % 2:
+        start = sorted(rng.sample(range(1000), 300))
+        tree = BTree.bulk_load(((k, [f"v{k}"]) for k in start), order=order)
+        expected = {k: [f"v{k}"] for k in start}
+    else:
+        tree, expected = BTree(order), {}
+    check(tree, expected)
+    for step in range(3000):
+        key = rng.randrange(1000)
+        if rng.random() < 0.5:
+            value = f"v{key}.{step}"
+            tree.insert(key, value)
+            expected.setdefault(key, []).append(value)
+        elif key in expected:
+            if rng.random() < 0.5:
+                assert tree.delete(key)
+                del expected[key]
+            else:
+                value = rng.choice(expected[key])
+                value = next(v for v in tree.search(key) if v == value)  # By identity
+                assert tree.delete(key, value)
+                expected[key].remove(value)
+                if not expected[key]:
+                    del expected[key]
+        else:
+            assert not tree.delete(key)
+        if step % 100 == 0:
+            check(tree, expected)
+    check(tree, expected)
+
+    for key in list(expected):
+        assert tree.delete(key)
+    check(tree, {})
+    assert tree.min_key() is None and tree.max_key() is None
+
+def test_bounded_items_match_a_sorted_list():
+    rng = random.Random(7)
+    keys = sorted(rng.sample(range(0, 2000, 2), 400))
+    tree = BTree.bulk_load(((k, [k]) for k in keys), order=6)
+    for _ in range(200):
+        low, high = sorted(rng.randrange(-10, 2010) for _ in range(2))
+        for include_start in (True, False):
+            for include_end in (True, False):
+                wanted = [k for k in keys if (low < k or include_start and low == k)
+                          and (k < high or include_end and k == high)]
+                assert [k for k, _ in tree.items(low, high, include_start, include_end)] == wanted
+                assert [k for k, _ in tree.items(low, high, include_start, include_end, reverse=True)] == wanted[::-1]
+                assert tree.range_search(low, high, include_start, include_end) == wanted
+    assert tree.min_key() == keys[0] and tree.max_key() == keys[-1]
+    assert tree.search(keys[10]) == [keys[10]] and tree.search(1) == []
+
+def test_order_must_be_at_least_four():
+    with pytest.raises(ValueError):
+        BTree(3)
@@ -0,0 +1,99 @@
+import random
+import pytest
+from fastjson_db import ColumnarTable, Field, JsonModel, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+
+pytest.importorskip("numpy")
+
+class Sale(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    region = Field(field_name="region", type=str)
+    units = Field(field_name="units", type=int)
+    price = Field(field_name="price", type=float)
+
+def fill(table, rng):
+    for i in range(1500):
+        row = {"id": i, "region": rng.choice(["north", "south", "east", "west"])}
+        if i % 11:
+            row["units"] = rng.randrange(50)
+        if i % 13:
+            row["price"] = rng.randrange(10000) / 100
+        table.insert(Sale(**row))
+    for i in range(0, 1500, 7):
+        table.remove(i)
+    table.update(1, Sale(id=1, region="north", units=49, price=1.0))
+
+@pytest.fixture
+def pair(tmp_path):
+    queriers = []
+    for cls in (JsonTable, ColumnarTable):
+        table = cls(Sale, str(tmp_path / f"{cls.__name__}.json"))
+        table._load_cache()
+        fill(table, random.Random(5))
+        querier = JsonQuerier(table)
+        querier._load_cache()
+        queriers.append(querier)
+    return queriers
+
+def rows(result):
+    return [(obj.id, obj.region, obj.units, obj.price) for obj in result]
+
+@pytest.mark.parametrize("conditions", [
+    {},
+    {"id": 8},
+    {"region": "east"},
+    {"units__gte": 40, "region__in": ["north", "west"]},
+    {"price__between": (10.0, 20.0)},
+    {"price__lt": 5.0, "units__gt": 10},
+    {"region__startswith": "no", "units": 3},
+    {"units": None},
+])
+def test_filters_match_the_row_table(pair, conditions):
+    rows_querier, columnar = pair
+    assert sorted(rows(columnar.get(**conditions))) == sorted(rows(rows_querier.get(**conditions)))
+    assert columnar.count(**conditions) == rows_querier.count(**conditions)
+
+def test_aggregates_and_groups_match(pair):
+    rows_querier, columnar = pair
+    spec = {"sum": ["units", "price"], "avg": "price", "min": "units", "max": "price",
+            "count": "*", "distinct": "region"}
+    expected = rows_querier.filter(units__gt=5).aggregate(**spec)
+    result = columnar.filter(units__gt=5).aggregate(**spec)
+    assert result.keys() == expected.keys()
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value)
+    assert columnar.sum("price", region="west") == pytest.approx(rows_querier.sum("price", region="west"))
+    groups = columnar.group_by("region").aggregate(count="*", avg="units")
+    assert groups.keys() == rows_querier.group_by("region").aggregate(count="*", avg="units").keys()
+    for region, values in rows_querier.group_by("region").aggregate(count="*", avg="units").items():
+        assert groups[region]["count"] == values["count"]
+        assert groups[region]["units__avg"] == pytest.approx(values["units__avg"])
+
+def test_ordering_matches(pair):
+    rows_querier, columnar = pair
+    for desc in (False, True):
+        query = {"desc": desc}
+        expected = rows(rows_querier.filter(region="south").order_by("price", **query).offset(3).limit(20).get())
+        assert rows(columnar.filter(region="south").order_by("price", **query).offset(3).limit(20).get()) == expected
+    assert columnar.explain(region="south")["index"] == "columnar"
+
+def test_results_are_lazy_copies(pair):
+    _, columnar = pair
+    result = columnar.get(region="east")
+    first = result[0]
+    first.units = -1  # A copy: the table is not changed
+    assert columnar.table.get(first.id).units != -1
+    assert rows(result[:3]) == rows(list(result)[:3])
+    with pytest.raises(IndexError):
+        result[len(result)]
+
+def test_vacuum_and_reload_keep_rows(pair):
+    _, columnar = pair
+    table = columnar.table
+    before = sorted(rows(columnar.get()))
+    table.vacuum()
+    assert sorted(rows(columnar.get())) == before
+    table.checkpoint()
+    reloaded = ColumnarTable(Sale, table.path)
+    reloaded._load_cache()
+    assert sorted(rows(reloaded.cache.values())) == before
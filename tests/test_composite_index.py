@@ -0,0 +1,91 @@
+import random
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable
+from fastjson_db.core.composite_index import MAX, NULL, composite_key, prefix_bounds
+from fastjson_db.core.json_querier import JsonQuerier
+
+class Event(JsonModel, indexes=[("city", "year", "rating"), ("year", "city")]):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    city = Field(field_name="city", type=str)
+    year = Field(field_name="year", type=int)
+    rating = Field(field_name="rating", type=float)
+
+def test_sentinels_order_around_every_value():
+    keys = [("b", 2), ("a", None), ("a", 3), (None, 1), ("a", -5)]
+    ordered = sorted(composite_key(k) for k in keys)
+    assert ordered == [(NULL, 1), ("a", NULL), ("a", -5), ("a", 3), ("b", 2)]
+    assert NULL < "" < MAX and NULL < -10 ** 9 and MAX > "zzz" and NULL < MAX
+    assert not NULL < NULL and NULL <= NULL and MAX >= MAX and composite_key([None]) == (NULL,)
+    low, high, _, _ = prefix_bounds(("a",), None)
+    assert all(low <= k <= high for k in ordered if k[0] == "a")
+    assert not any(low <= k <= high for k in ordered if k[0] != "a")
+    # A range on the next column skips its NULL keys
+    low, high, _, _ = prefix_bounds(("a",), (None, 0, True, True))
+    assert [k for k in ordered if low <= k <= high] == [("a", -5)]
+
+@pytest.fixture(scope="module")
+def events(tmp_path_factory):
+    rng = random.Random(6)
+    table = JsonTable(Event, str(tmp_path_factory.mktemp("events") / "events.json"))
+    table._load_cache()
+    for i in range(3000):
+        row = {"id": i}
+        if i % 13:
+            row["city"] = rng.choice(["lima", "oslo", "rome", "kyiv"])
+        if i % 11:
+            row["year"] = rng.randrange(2000, 2025)
+        if i % 5:
+            row["rating"] = rng.randrange(0, 50) / 10
+        table.insert(Event(**row))
+    querier = JsonQuerier(table)
+    querier._load_cache()
+    return table, querier
+
+CASES = [
+    ({"city": "oslo"}, lambda e: e.city == "oslo"),
+    ({"city": "oslo", "year": 2010}, lambda e: e.city == "oslo" and e.year == 2010),
+    ({"city": "rome", "year": 2020, "rating__gte": 2.5},
+     lambda e: e.city == "rome" and e.year == 2020 and e.rating is not None and e.rating >= 2.5),
+    ({"city": "lima", "year__between": (2005, 2009)},
+     lambda e: e.city == "lima" and e.year is not None and 2005 <= e.year <= 2009),
+    ({"city": "kyiv", "year__lt": 2003}, lambda e: e.city == "kyiv" and e.year is not None and e.year < 2003),
+    ({"year": 2001, "city__startswith": "o"}, lambda e: e.year == 2001 and e.city is not None and e.city.startswith("o")),
+    ({"city": "oslo", "year": 2012, "rating": 1.5}, lambda e: (e.city, e.year, e.rating) == ("oslo", 2012, 1.5)),
+    ({"city": None, "year": 2015}, lambda e: e.city is None and e.year == 2015),
+]
+
+@pytest.mark.parametrize("conditions, keep", CASES)
+def test_slices_match_a_plain_filter(events, conditions, keep):
+    table, querier = events
+    wanted = sorted(e.id for e in table.cache.values() if keep(e))
+    assert sorted(e.id for e in querier.get(**conditions)) == wanted
+    assert querier.count(**conditions) == len(wanted)
+    assert sorted(querier.values("id", **conditions)) == [(i,) for i in wanted]
+
+def test_planner_reads_one_slice(events):
+    _, querier = events
+    plan = querier.explain(city="rome", year=2020, rating__gte=2.5)
+    assert plan["index"] == "composite" and plan["field"] == ("city", "year", "rating")
+    assert plan["residual"] == [] and plan["candidates"] == plan["rows"]
+    assert querier.explain(year=2001, city__startswith="o")["field"] == ("year", "city")
+
+def test_covering_projection_reads_index_keys(events):
+    table, querier = events
+    def key(values):
+        return [(v is None, v or 0) for v in values]
+    rows = [(e.year, e.rating) for e in table.cache.values() if e.city == "lima"]
+    # The NULL sentinel never leaks out of the index
+    assert sorted(querier.values("year", "rating", city="lima"), key=key) == sorted(rows, key=key)
+
+def test_writes_update_composite_indices(tmp_path):
+    table = JsonTable(Event, str(tmp_path / "events.json"))
+    table._load_cache()
+    querier = JsonQuerier(table)
+    querier._load_cache()
+    table.insert(Event(id=1, city="oslo", year=2001))
+    table.insert(Event(id=2, city="oslo", year=2001, rating=4.0))
+    assert [e.id for e in querier.get(city="oslo", year=2001, rating__gt=1.0)] == [2]
+    table.update(1, Event(id=1, city="oslo", year=2001, rating=3.0))
+    assert sorted(e.id for e in querier.get(city="oslo", year=2001, rating__gt=1.0)) == [1, 2]
+    table.remove(2)
+    assert querier.count(city="oslo", year__gte=2000) == 1
@@ -0,0 +1,28 @@
+import gc
+from fastjson_db.core.gc_pause import paused_gc
+
+def test_pause_does_not_freeze_by_default():
+    gc.unfreeze()
+    with paused_gc():
+        assert not gc.isenabled()
+        loaded = [[i] for i in range(1000)]
+    assert gc.isenabled()
+    assert gc.get_freeze_count() == 0
+    del loaded
+
+def test_freeze_is_opt_in_and_replaces_previous_freeze():
+    gc.unfreeze()
+    try:
+        with paused_gc(freeze=True):
+            with paused_gc():  # A concurrent load without freeze
+                loaded = [[i] for i in range(1000)]
+            assert gc.get_freeze_count() == 0  # Only once the last load ends
+        first = gc.get_freeze_count()
+        assert first >= 1000
+        del loaded
+        with paused_gc(freeze=True):
+            pass
+        assert gc.get_freeze_count() < first + 1000
+        assert gc.isenabled()
+    finally:
+        gc.unfreeze()
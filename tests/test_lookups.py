@@ -0,0 +1,104 @@
+import operator
+import random
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.errors import OperationError
+
+class Account(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    name = Field(field_name="name", type=str)
+    level = Field(field_name="level", type=int)
+    balance = Field(field_name="balance", type=float)
+
+def matches(obj, field_name, lookup, value):
+    """What each lookup means, row by row."""
+    v = getattr(obj, field_name)
+    if lookup == "exact":
+        return v == value
+    if v is None:
+        return False
+    if lookup == "between":
+        return value[0] <= v <= value[1]
+    if lookup == "in":
+        return v in value
+    if lookup == "startswith":
+        return v.startswith(value)
+    return {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}[lookup](v, value)
+
+@pytest.fixture
+def accounts(tmp_path):
+    rng = random.Random(3)
+    table = JsonTable(Account, str(tmp_path / "accounts.json"))
+    table._load_cache()
+    for i in range(2000):
+        row = {"id": i, "name": f"{rng.choice('abc')}{rng.randrange(100)}"}
+        level = rng.choice([None, 0, 1, 2, 3, 4])
+        if level is not None:  # Left out: stored as None
+            row["level"] = level
+        if i % 17:
+            row["balance"] = float(rng.randrange(1000))
+        table.insert(Account(**row))
+    querier = JsonQuerier(table)
+    querier._load_cache()
+    return table, querier
+
+CONDITIONS = [
+    {"id": 7},
+    {"id__in": [3, 5, 5000]},
+    {"id__gte": 1990},
+    {"level": 2},
+    {"level": None},
+    {"level__in": [0, 4]},
+    {"level__in": [1, None]},
+    {"balance__gt": 900.0},
+    {"balance__lte": 10.0},
+    {"balance__between": (100.0, 110.0)},
+    {"name__startswith": "b1"},
+    {"name": "a5", "level__lt": 3},
+    {"level": 3, "balance__lt": 300.0, "name__startswith": "c"},
+    {"id__lt": 500, "balance__gte": 500.0},
+]
+
+@pytest.mark.parametrize("conditions", CONDITIONS)
+def test_lookups_match_a_row_by_row_filter(accounts, conditions):
+    table, querier = accounts
+    parsed = [(key.rsplit("__", 1) + ["exact"])[:2] + [value] for key, value in conditions.items()]
+    expected = sorted(obj.id for obj in table.cache.values()
+                      if all(matches(obj, *cond) for cond in parsed))
+    assert sorted(obj.id for obj in querier.get(**conditions)) == expected
+    assert querier.count(**conditions) == len(expected)
+    first = querier.first(**conditions)
+    assert (first.id in expected) if expected else first is None
+
+def test_planner_uses_the_most_selective_index(accounts):
+    _, querier = accounts
+    assert querier.explain(id=7)["index"] == "hash"
+    assert querier.explain(id__in=[1, 2])["index"] == "hash"
+    plan = querier.explain(balance__between=(100.0, 101.0))
+    assert plan["index"] == "btree" and plan["field"] == "balance"
+    plan = querier.explain(level=2, name="a5")
+    assert plan["field"] == "name" and plan["residual"] == ["level=2"]
+    assert querier.explain(level=None)["index"] == "scan"  # Indices do not store None
+
+def test_indices_follow_table_writes(accounts):
+    table, querier = accounts
+    table.update(7, Account(id=7, name="zzz", level=9, balance=5000.0))
+    assert [obj.id for obj in querier.get(balance__gt=4999.0)] == [7]
+    assert [obj.id for obj in querier.get(name__startswith="zz")] == [7]
+    table.remove(7)
+    assert querier.get(level__in=[9]) == [] and querier.first(id=7) is None
+
+@pytest.mark.parametrize("conditions", [
+    {"level__near": 1},
+    {"missing": 1},
+    {"balance__between": 1.0},
+    {"balance__between": (1.0, 2.0, 3.0)},
+    {"name__in": "abc"},
+    {"level__in": 3},
+    {"name__startswith": 1},
+])
+def test_bad_conditions_raise(accounts, conditions):
+    _, querier = accounts
+    with pytest.raises(OperationError):
+        querier.get(**conditions)
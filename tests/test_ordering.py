@@ -0,0 +1,83 @@
+import random
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.errors import OperationError
+
+class Player(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    team = Field(field_name="team", type=str)
+    score = Field(field_name="score", type=int)
+
+@pytest.fixture(scope="module")
+def players(tmp_path_factory):
+    rng = random.Random(8)
+    table = JsonTable(Player, str(tmp_path_factory.mktemp("players") / "players.json"))
+    table._load_cache()
+    for i in range(3000):
+        row = {"id": i, "team": rng.choice(["red", "blue", "green"])}
+        if i % 10:
+            row["score"] = rng.randrange(500)  # Many ties, and some None
+        table.insert(Player(**row))
+    querier = JsonQuerier(table)
+    querier._load_cache()
+    return table, querier
+
+def expected_scores(table, desc, team=None):
+    """Scores in query order: None last in both directions."""
+    scores = [p.score for p in table.cache.values() if team is None or p.team == team]
+    values = sorted((s for s in scores if s is not None), reverse=desc)
+    return values + [None] * (len(scores) - len(values))
+
+@pytest.mark.parametrize("desc", [False, True])
+@pytest.mark.parametrize("team", [None, "red"])
+@pytest.mark.parametrize("offset, limit", [(0, None), (0, 10), (25, 10), (2690, 50), (5000, 5)])
+def test_pages_follow_the_order(players, desc, team, offset, limit):
+    table, querier = players
+    query = querier.order_by("score", desc=desc).offset(offset).limit(limit)
+    if team is not None:
+        query = query.filter(team=team)
+    page = query.get()
+    wanted = expected_scores(table, desc, team)
+    stop = None if limit is None else offset + limit
+    assert [p.score for p in page] == wanted[offset:stop]
+    assert len({p.id for p in page}) == len(page)
+    assert all(team is None or p.team == team for p in page)
+    assert query.count() == len(page)
+    assert [p.score for p in query.iter()] == [p.score for p in page]
+
+def test_id_order_and_first(players):
+    table, querier = players
+    assert [p.id for p in querier.order_by("id", desc=True).limit(3).get()] == [2999, 2998, 2997]
+    assert querier.order_by("score").first().score == 0
+    assert querier.order_by("score", desc=True).first(team="blue").score == \
+        max(p.score for p in table.cache.values() if p.team == "blue" and p.score is not None)
+    assert [p.id for p in querier.iter(limit=3, offset=1, team="green")] == \
+        [p.id for p in querier.filter(team="green").get()][1:4]
+
+def test_strategy_depends_on_the_index(players):
+    _, querier = players
+    assert querier.order_by("score").limit(10).explain()["strategy"] == "walk"
+    few = querier.filter(id__in=list(range(0, 3000, 300))).order_by("score")
+    assert few.limit(3).explain()["strategy"] == "top-k"
+    assert few.explain()["strategy"] == "sort"
+    assert querier.filter(team="red").explain()["strategy"] == "stream"
+
+def test_chaining_keeps_the_base_query(players):
+    _, querier = players
+    base = querier.filter(team="red").order_by("score")
+    page = base.limit(5)
+    assert base.window == (("score", False), None, 0)
+    assert page.offset(5).window == (("score", False), 5, 5)
+    assert len(base.get()) > 5 and len(page.get()) == 5
+
+@pytest.mark.parametrize("make", [
+    lambda q: q.order_by("missing"),
+    lambda q: q.limit(-1).get(),
+    lambda q: q.offset(-1).get(),
+    lambda q: q.limit(1.5).get(),
+])
+def test_bad_windows_raise(players, make):
+    _, querier = players
+    with pytest.raises(OperationError):
+        make(querier)
@@ -0,0 +1,68 @@
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from fastjson_db import ColumnarTable, Field, JsonModel, JsonTable
+from fastjson_db.errors import OperationError
+from fastjson_db.log import parallel_load
+from fastjson_db.log.jsonl_file import write_jsonl
+from fastjson_db.log.parallel_load import snapshot_ranges
+
+class Event(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    kind = Field(field_name="kind", type=str)
+    size = Field(field_name="size", type=float)
+
+@pytest.fixture
+def small_ranges(monkeypatch):
+    # Split even a small test file into several ranges
+    monkeypatch.setattr(parallel_load, "PARALLEL_MIN_BYTES", 1)
+    monkeypatch.setattr(parallel_load, "RANGE_MIN_BYTES", 4096)
+
+@pytest.fixture(scope="module")
+def pool():
+    with ProcessPoolExecutor(4) as executor:
+        yield executor
+
+def write_events(path, count=5000):
+    write_jsonl(path, ({"id": i, "kind": f"k{i % 7}", "size": i / 3} for i in range(count)), checksum=True)
+
+def load(cls, path, pool=None, **kwargs):
+    table = cls(Event, path, file_format="jsonl", **kwargs)
+    table._load_cache(pool)
+    return table
+
+def rows(table):
+    return sorted((obj.id, obj.kind, obj.size) for obj in table.cache.values())
+
+def test_only_json_lines_files_are_split(tmp_path, small_ranges):
+    path = str(tmp_path / "events.jsonl")
+    write_events(path)
+    assert snapshot_ranges(path, "json", 4) == []
+    ranges = snapshot_ranges(path, "jsonl", 4)
+    assert len(ranges) == 4
+    assert ranges[0][0] == 0 and all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+@pytest.mark.parametrize("cls", [JsonTable, ColumnarTable])
+@pytest.mark.parametrize("trusted", [None, False])
+def test_pool_loads_the_same_rows(tmp_path, small_ranges, pool, cls, trusted):
+    path = str(tmp_path / "events.jsonl")
+    write_events(path)
+    serial = load(cls, path, trusted=trusted)
+    parallel = load(cls, path, pool, trusted=trusted)
+    assert len(serial.cache) == 5000
+    assert rows(parallel) == rows(serial)
+
+def test_pool_fails_like_the_serial_load(tmp_path, small_ranges, pool):
+    path = str(tmp_path / "events.jsonl")
+    write_events(path)
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    lines[3210] = b'{"id": 3210, "kind": \n'
+    with open(path, "wb") as f:
+        f.writelines(lines)
+
+    with pytest.raises(OperationError) as serial:
+        load(JsonTable, path, trusted=True)
+    with pytest.raises(OperationError) as parallel:
+        load(JsonTable, path, pool, trusted=True)
+    assert "line 3211" in str(serial.value)
+    assert str(parallel.value) == str(serial.value)
@@ -0,0 +1,112 @@
+import os
+import random
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable, PartitionedTable
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.core.partitioned_querier import PartitionedQuerier
+from fastjson_db.errors import OperationError
+
+class Account(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    owner = Field(field_name="owner", type=str)
+    balance = Field(field_name="balance", type=float)
+
+def fill(table, rng):
+    for i in range(1200):
+        row = {"id": i, "owner": rng.choice(["ana", "bo", "cy"])}
+        if i % 9:
+            row["balance"] = rng.randrange(10000) / 100
+        table.insert(Account(**row))
+    for i in range(0, 1200, 17):
+        table.remove(i)
+    table.update(5, Account(id=5, owner="cy", balance=1.5))
+
+@pytest.fixture(params=[{}, {"scheme": "range", "bounds": [300, 600, 900]}], ids=["hash", "range"])
+def pair(request, tmp_path):
+    """A plain JsonTable and a 4-shard PartitionedTable with the same rows."""
+    plain = JsonTable(Account, str(tmp_path / "plain.json"))
+    plain._load_cache()
+    fill(plain, random.Random(3))
+    table = PartitionedTable(Account, str(tmp_path / "accounts.json"), partitions=4, **request.param)
+    table._load_cache()
+    fill(table, random.Random(3))
+    plain_querier, querier = JsonQuerier(plain), PartitionedQuerier(table)
+    plain_querier._load_cache()
+    querier._load_cache()
+    yield plain_querier, querier
+    table.close()
+
+def rows(result):
+    return [(obj.id, obj.owner, obj.balance) for obj in result]
+
+def test_rows_live_in_their_shard(pair):
+    plain, querier = pair
+    table = querier.table
+    for i, shard in enumerate(table.shards):
+        assert shard.cache and all(table.shard_of(query_id) == i for query_id in shard.cache)
+    if table.scheme == "range":
+        assert sorted(table.shards[1].cache) == sorted(i for i in plain.table.cache if 300 <= i < 600)
+    assert len(table) == len(plain.table.cache) and sorted(table.cache) == sorted(plain.table.cache)
+    assert table.get(5).balance == 1.5 and 17 not in table.cache
+
+@pytest.mark.parametrize("conditions, shards", [
+    ({"id": 601}, 1),
+    ({"id__in": [1, 2, 3, 400]}, None),
+    ({"id__lt": 250}, None),
+    ({"owner": "bo"}, 4),
+    ({"owner": "ana", "balance__gt": 50.0}, 4),
+    ({"balance": None}, 4),
+])
+def test_queries_match_a_plain_table(pair, conditions, shards):
+    plain, querier = pair
+    assert sorted(rows(querier.get(**conditions))) == sorted(rows(plain.get(**conditions)))
+    assert querier.count(**conditions) == plain.count(**conditions)
+    assert sorted(querier.values("id", **conditions)) == sorted(plain.values("id", **conditions))
+    if shards is not None:
+        assert len(querier.explain(**conditions)["shards"]) == shards
+
+def test_id_conditions_prune_shards(pair):
+    _, querier = pair
+    table = querier.table
+    assert querier.explain(id__in=[1, 5])["shards"] == sorted({table.shard_of(1), table.shard_of(5)})
+    routed = querier.explain(id__between=(320, 590))["shards"]
+    assert routed == ([1] if table.scheme == "range" else [0, 1, 2, 3])
+
+@pytest.mark.parametrize("desc", [False, True])
+@pytest.mark.parametrize("offset, limit", [(0, None), (0, 10), (40, 25), (1200, 5)])
+def test_ordered_pages_merge_across_shards(pair, desc, offset, limit):
+    plain, querier = pair
+    for base in (querier, querier.filter(owner="cy")):
+        other = plain if base is querier else plain.filter(owner="cy")
+        page = base.order_by("balance", desc=desc).offset(offset).limit(limit).get()
+        wanted = other.order_by("balance", desc=desc).offset(offset).limit(limit).get()
+        assert [obj.balance for obj in page] == [obj.balance for obj in wanted]
+    assert querier.order_by("id", desc=desc).first().id == plain.order_by("id", desc=desc).first().id
+
+def test_aggregates_merge_shard_partials(pair):
+    plain, querier = pair
+    spec = {"sum": "balance", "avg": "balance", "min": "balance", "max": "id", "count": "*", "distinct": "owner"}
+    for conditions in ({}, {"owner": "ana"}, {"id__gte": 700}, {"id": -1}):
+        expected = plain.filter(**conditions).aggregate(**spec)
+        result = querier.filter(**conditions).aggregate(**spec)
+        assert result.keys() == expected.keys()
+        for key, value in expected.items():
+            assert result[key] == pytest.approx(value), (conditions, key)
+    groups = querier.group_by("owner").aggregate(count="*", avg="balance")
+    expected = plain.group_by("owner").aggregate(count="*", avg="balance")
+    assert groups.keys() == expected.keys()
+    for owner, values in expected.items():
+        assert groups[owner]["count"] == values["count"]
+        assert groups[owner]["balance__avg"] == pytest.approx(values["balance__avg"])
+
+def test_flush_and_reload(pair):
+    plain, querier = pair
+    table = querier.table
+    table.flush()
+    assert os.path.exists(table.layout_path) and table.dirty_count == 0
+    reloaded = PartitionedTable(Account, table.path, partitions=4, scheme=table.scheme, bounds=table.bounds)
+    reloaded._load_cache()
+    assert sorted(rows(reloaded.cache.values())) == sorted(rows(plain.table.cache.values()))
+    reloaded.close()
+    with pytest.raises(OperationError):
+        PartitionedTable(Account, table.path, partitions=3)
@@ -0,0 +1,84 @@
+import random
+from datetime import date, timedelta
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.core.query import LOOKUPS
+
+class Visit(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    page = Field(field_name="page", type=str)
+    ms = Field(field_name="ms", type=float)
+    # Filters compare the serialized value (an ISO string)
+    day = Field(field_name="day", type=date, serializer=lambda d: d.isoformat() if d else "",
+                deserializer=lambda s: date.fromisoformat(s) if s else None, validator=lambda d: True)
+
+START = date(2024, 1, 1)
+
+@pytest.fixture(scope="module")
+def queriers(tmp_path_factory):
+    rng = random.Random(11)
+    table = JsonTable(Visit, str(tmp_path_factory.mktemp("visits") / "visits.json"))
+    table._load_cache()
+    for i in range(1000):
+        row = {"id": i, "page": f"/{rng.choice(['home', 'docs', 'blog'])}/{rng.randrange(20)}",
+               "day": START + timedelta(days=rng.randrange(60))}
+        if i % 9:
+            row["ms"] = float(rng.randrange(500))
+        table.insert(Visit(**row))
+    indexed = JsonQuerier(table)
+    indexed._load_cache()
+    return table, indexed, JsonQuerier(table)  # The second one never builds indices: full scans
+
+def serialized(value):
+    if isinstance(value, (tuple, list)):
+        return type(value)(serialized(v) for v in value)
+    return value.isoformat() if isinstance(value, date) else value
+
+def expected(table, conditions):
+    """Row-by-row evaluation with the LOOKUPS table (None matches nothing but 'exact')."""
+    ids = []
+    for obj in table.cache.values():
+        for field_name, lookup, value in conditions:
+            v, value = serialized(getattr(obj, field_name)), serialized(value)
+            if lookup == "between":
+                ok = v is not None and value[0] <= v <= value[1]
+            elif lookup == "exact":
+                ok = v == value
+            else:
+                ok = v is not None and LOOKUPS[lookup](v, value)
+            if not ok:
+                break
+        else:
+            ids.append(obj.id)
+    return sorted(ids)
+
+def random_conditions(rng):
+    picks = {
+        "page": lambda: rng.choice([("startswith", "/docs"), ("exact", "/home/3"), ("in", ["/blog/1", "/blog/2"])]),
+        "ms": lambda: rng.choice([("gt", 400.0), ("lte", 20.0), ("between", (100.0, 150.0)), ("exact", None)]),
+        "day": lambda: rng.choice([("gte", START + timedelta(days=50)), ("lt", START + timedelta(days=3)),
+                                   ("between", (START + timedelta(days=10), START + timedelta(days=12)))]),
+        "id": lambda: rng.choice([("lt", 300), ("in", [1, 2, 3, 999]), ("gte", 500)]),
+    }
+    fields = rng.sample(sorted(picks), rng.randint(1, 3))
+    return [(name,) + picks[name]() for name in fields]
+
+def test_compiled_predicates_match_row_by_row(queriers):
+    table, indexed, scan = queriers
+    rng = random.Random(2)
+    for _ in range(150):
+        conditions = random_conditions(rng)
+        kwargs = {name if lookup == "exact" else f"{name}__{lookup}": value for name, lookup, value in conditions}
+        wanted = expected(table, conditions)
+        assert sorted(obj.id for obj in indexed.get(**kwargs)) == wanted, kwargs
+        assert sorted(obj.id for obj in scan.get(**kwargs)) == wanted, kwargs
+
+def test_predicates_are_compiled_once_per_shape(queriers):
+    _, _, scan = queriers
+    scan._compiled.clear()
+    first = scan.count(page__startswith="/docs", ms__gt=100.0)
+    second = scan.count(page__startswith="/blog", ms__gt=400.0)
+    assert len(scan._compiled) == 1 and first != second
+    scan.count(page__in=["/docs/1"], ms__gt=100.0)
+    assert len(scan._compiled) == 2
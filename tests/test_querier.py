@@ -0,0 +1,46 @@
+from fastjson_db import Field, JsonModel, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+
+class User(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    name = Field(field_name="name", type=str)
+
+class Order(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    user_id = Field(field_name="user_id", type=int, foreign_key="User.id")
+    total = Field(field_name="total", type=float)
+
+def tables(tmp_path):
+    users = JsonTable(User, str(tmp_path / "users.json"))
+    users._load_cache()
+    for i in range(10):
+        users.insert(User(id=i, name=f"u{i}"))
+    orders = JsonTable(Order, str(tmp_path / "orders.json"))
+    orders._load_cache()
+    for i in range(100):
+        orders.insert(Order(id=i, user_id=i % 10, total=float(i)))
+    return users, orders
+
+def test_explain_reports_the_access_path(tmp_path):
+    _, orders = tables(tmp_path)
+    querier = JsonQuerier(orders)
+    querier._load_cache()
+    plan = querier.explain(id=5)
+    assert plan["index"] == "hash" and plan["rows"] == 1
+    plan = querier.filter(user_id=3, total__gt=50.0).explain()
+    assert plan["rows"] == len(querier.get(user_id=3, total__gt=50.0)) == 5
+
+def test_join_and_prefetch_related(tmp_path):
+    users, orders = tables(tmp_path)
+    querier = JsonQuerier(orders)
+    querier._load_cache()
+    users_querier = JsonQuerier(users)
+    users_querier._load_cache()
+
+    pairs = querier.join(users, total__lt=20.0)
+    assert sorted((o.id, u.name) for o, u in pairs) == [(i, f"u{i % 10}") for i in range(20)]
+    pairs = querier.join(users_querier.filter(id__lt=2), on="user_id")
+    assert sorted(o.id for o, _ in pairs) == [i for i in range(100) if i % 10 < 2]
+
+    related = querier.filter(total__gt=94.0).prefetch_related("user_id", users)
+    assert {key: user.name for key, user in related.items()} == {i: f"u{i}" for i in range(5, 10)}
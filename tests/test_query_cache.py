@@ -0,0 +1,90 @@
+import pytest
+from fastjson_db import ColumnarTable, Field, JsonModel, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.core.query_cache import MISS, QueryCache
+from fastjson_db.errors import OperationError
+
+class Item(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    kind = Field(field_name="kind", type=str)
+    price = Field(field_name="price", type=float)
+
+def querier(tmp_path, cls=JsonTable, rows=50):
+    table = cls(Item, str(tmp_path / "items.json"))
+    table._load_cache()
+    for i in range(rows):
+        table.insert(Item(id=i, kind=f"k{i % 5}", price=float(i)))
+    q = JsonQuerier(table, result_cache_size=16)
+    q._load_cache()
+    return table, q
+
+def test_lru_evicts_and_drops_on_new_version():
+    cache = QueryCache(2)
+    assert cache.get("a", 1) is MISS
+    cache.put("a", 1, 1)
+    cache.put("b", 1, 2)
+    assert cache.get("a", 1) == 1
+    cache.put("c", 1, 3)  # "b" is the least recently used
+    assert cache.get("b", 1) is MISS and cache.evictions == 1
+    assert cache.get("a", 2) is MISS and cache.get("c", 2) is MISS
+    with pytest.raises(OperationError):
+        QueryCache(0)
+
+def test_same_query_in_any_order_hits(tmp_path):
+    _, q = querier(tmp_path)
+    first = q.get(kind="k1", price__gt=10.0)
+    assert q.get(price__gt=10.0, kind="k1") == first
+    assert q.result_cache.hits == 1 and q.result_cache.misses == 1
+
+def test_writes_invalidate_results(tmp_path):
+    table, q = querier(tmp_path)
+    assert q.count(kind="k1") == 10
+    table.insert(Item(id=100, kind="k1", price=1.0))
+    assert q.count(kind="k1") == 11
+    table.update(100, Item(id=100, kind="k2", price=1.0))
+    assert q.count(kind="k1") == 10
+    table.remove(1)
+    assert q.count(kind="k1") == 9
+    result = q.get(kind="k1")
+    result.clear()  # Callers get their own list
+    assert len(q.get(kind="k1")) == 9
+
+def test_every_query_kind_is_cached_apart(tmp_path):
+    table, q = querier(tmp_path)
+    calls = [lambda: q.first(kind="k1"), lambda: q.count(kind="k1"), lambda: q.sum("price", kind="k1"),
+             lambda: q.filter(kind="k1").aggregate(max="price", count="*"),
+             lambda: q.group_by("kind").aggregate(count="*"),
+             lambda: q.values("price", kind="k1"), lambda: q.order_by("price").limit(3).get(kind="k1")]
+    first = [call() for call in calls]
+    assert [call() for call in calls] == first
+    assert q.result_cache.hits == len(calls) and q.result_cache.misses == len(calls)
+    assert first[1] == 10 and first[2] == sum(float(i) for i in range(1, 50, 5))
+
+    table.update(1, Item(id=1, kind="k1", price=1000.0))
+    assert q.sum("price", kind="k1") == first[2] + 999.0
+    assert q.result_cache.stats["invalidations"] == 1
+
+def test_reload_invalidates_results(tmp_path):
+    table, q = querier(tmp_path)
+    table.checkpoint()
+    assert q.count() == 50
+    table.insert(Item(id=100, kind="k1", price=1.0))  # Not flushed: the reload drops it
+    assert q.count() == 51
+    table._load_cache()
+    assert q.count() == 50
+
+def test_unhashable_conditions_bypass_the_cache(tmp_path):
+    _, q = querier(tmp_path)
+    assert [item.id for item in q.get(id__in=[[1], 2])] == [2]
+    assert [item.id for item in q.get(id__in=[[1], 2])] == [2]
+    assert q.result_cache.hits == 0
+
+def test_columnar_results_survive_vacuum(tmp_path):
+    table, q = querier(tmp_path, ColumnarTable)
+    stale = q.get(kind="k1")
+    table.remove(1)
+    assert len(q.get(kind="k1")) == 9
+    table.vacuum()
+    with pytest.raises(OperationError):
+        len(stale)
+    assert sorted(item.id for item in q.get(kind="k1")) == [6, 11, 16, 21, 26, 31, 36, 41, 46]
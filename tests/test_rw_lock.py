@@ -0,0 +1,172 @@
+import dataclasses
+import threading
+import time
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.core.rw_lock import MultiLock, NoLock, RWLock, combined_lock
+from fastjson_db.errors import OperationError
+
+class User(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    best_friend = Field(field_name="best_friend", type=int, foreign_key="Pet.id")
+
+class Pet(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    owner = Field(field_name="owner", type=int, foreign_key="User.id")
+
+def in_thread(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+# ------------------ RWLock ------------------ #
+def test_readers_share_and_writers_exclude():
+    lock = RWLock()
+    both_reading = threading.Barrier(2, timeout=5)
+    def read():
+        with lock.read():
+            both_reading.wait()  # Only returns if the two readers overlap
+    readers = [in_thread(read) for _ in range(2)]
+    for reader in readers:
+        reader.join(5)
+        assert not reader.is_alive()
+
+    events = []
+    def read_once():
+        with lock.read():
+            events.append("read")
+    with lock.write():
+        reader = in_thread(read_once)
+        time.sleep(0.05)
+        assert events == []  # Blocked by the writer
+    reader.join(5)
+    assert events == ["read"]
+
+def test_waiting_writer_goes_before_new_readers():
+    lock = RWLock()
+    order = []
+    lock.acquire_read()
+    def write():
+        with lock.write():
+            order.append("write")
+    def read():
+        with lock.read():
+            order.append("read")
+    writer = in_thread(write)
+    time.sleep(0.05)
+    reader = in_thread(read)  # Arrives while the writer waits for the first reader
+    time.sleep(0.05)
+    assert order == []
+    lock.release_read()
+    writer.join(5)
+    reader.join(5)
+    assert order == ["write", "read"]
+
+def test_lock_is_reentrant_but_never_upgrades():
+    lock = RWLock()
+    with lock.write(), lock.write(), lock.read():
+        pass
+    with lock.read(), lock.read():
+        with pytest.raises(OperationError):
+            lock.acquire_write()
+    with lock.write():  # Fully released above
+        pass
+    with NoLock().read(), NoLock().write():
+        pass
+
+def test_thread_safe_table_under_concurrent_writes(tmp_path):
+    table = JsonTable(User, str(tmp_path / "users.json"), thread_safe=True)
+    table._load_cache()
+    querier = JsonQuerier(table)
+    querier._load_cache()
+    errors = []
+    def write(k):
+        try:
+            for i in range(200):
+                table.insert(User(id=k * 1000 + i, best_friend=k))
+                if i % 3 == 0:
+                    table.remove(k * 1000 + i)
+        except Exception as e:  # Reported below
+            errors.append(e)
+    def read():
+        try:
+            for _ in range(200):
+                for k in range(4):
+                    assert all(u.best_friend == k for u in querier.get(best_friend=k))
+        except Exception as e:
+            errors.append(e)
+    threads = [in_thread(lambda k=k: write(k)) for k in range(4)] + [in_thread(read) for _ in range(2)]
+    for thread in threads:
+        thread.join(30)
+    assert errors == []
+    assert len(table.cache) == 4 * 133
+    assert {k: querier.count(best_friend=k) for k in range(4)} == {k: 133 for k in range(4)}
+
+# ------------------ Immutable Queries ------------------ #
+def test_queries_never_change(tmp_path):
+    table = JsonTable(Pet, str(tmp_path / "pets.json"))
+    table._load_cache()
+    for i in range(10):
+        table.insert(Pet(id=i, owner=i % 2))
+    querier = JsonQuerier(table)
+    querier._load_cache()
+    base = querier.filter(owner=1)
+    ordered = base.order_by("id", desc=True)
+    page = ordered.limit(2)
+    assert [p.id for p in page.get()] == [9, 7]
+    assert [p.id for p in ordered.get()] == [9, 7, 5, 3, 1]
+    assert [p.id for p in base.filter(id__lt=5).get()] == [1, 3]
+    assert len(base.get()) == 5 and querier.count() == 10  # Chaining left both untouched
+    assert querier._query.filters == () and base.window == (None, None, 0)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        base.filters = ()
+
+# ------------------ Joins ------------------ #
+class SlowReads(RWLock):
+    """Widens the window between a join's two lock acquisitions."""
+
+    def acquire_read(self):
+        super().acquire_read()
+        time.sleep(0.002)
+
+def test_combined_lock_has_one_order():
+    a, b, c = RWLock(), RWLock(), RWLock()
+    shards = MultiLock([c, a])
+    assert combined_lock(a, b).locks == combined_lock(b, a).locks
+    assert combined_lock(shards, b).locks == combined_lock(b, c, a, a).locks
+    assert len(combined_lock(shards, b).locks) == 3
+
+def test_crossed_joins_with_waiting_writers(tmp_path):
+    users = JsonTable(User, str(tmp_path / "users.json"), thread_safe=True)
+    pets = JsonTable(Pet, str(tmp_path / "pets.json"), thread_safe=True)
+    for table in (users, pets):
+        table._load_cache()
+        table.lock = SlowReads()
+    for i in range(50):
+        users.insert(User(id=i, best_friend=i))
+        pets.insert(Pet(id=i, owner=i))
+    user_querier, pet_querier = JsonQuerier(users), JsonQuerier(pets)
+    user_querier._load_cache()
+    pet_querier._load_cache()
+    stop = threading.Event()
+
+    def join(querier, other):
+        while not stop.is_set():
+            assert len(querier.join(other)) == 50
+
+    def write(table, row):
+        while not stop.is_set():
+            table.update(0, row)
+
+    threads = [threading.Thread(target=join, args=(user_querier, pets), daemon=True),
+               threading.Thread(target=join, args=(pet_querier, users), daemon=True),
+               threading.Thread(target=write, args=(users, User(id=0, best_friend=0)), daemon=True),
+               threading.Thread(target=write, args=(pets, Pet(id=0, owner=0)), daemon=True)]
+    for thread in threads:
+        thread.start()
+    stop.wait(1)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=5)
+        assert not thread.is_alive(), "deadlock"
@@ -0,0 +1,84 @@
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable
+from fastjson_db.core.json_querier import JsonQuerier
+
+class Account(JsonModel, indexes=[("team", "balance")]):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    username = Field(field_name="username", type=str, unique=True)
+    team = Field(field_name="team", type=str)
+    balance = Field(field_name="balance", type=int)
+
+def open_querier(path):
+    table = JsonTable(Account, path, wal=True, compact_after=0)
+    table._load_cache()
+    querier = JsonQuerier(table, persist_indices=True)
+    querier._load_cache()
+    return table, querier
+
+def rebuilt_fields(monkeypatch):
+    built = []
+    original = JsonQuerier._build_index
+    def build(self, field_name, field, objects):
+        built.append(field_name)
+        return original(self, field_name, field, objects)
+    monkeypatch.setattr(JsonQuerier, "_build_index", build)
+    return built
+
+def check(querier, table):
+    rows = list(table.cache.values())
+    for obj in rows:
+        assert querier.first(username=obj.username) is obj
+    assert sorted(o.id for o in querier.get(balance__gte=50)) == sorted(o.id for o in rows if o.balance >= 50)
+    assert sorted(o.id for o in querier.get(team="b", balance__lt=30)) == \
+        sorted(o.id for o in rows if o.team == "b" and o.balance < 30)
+
+@pytest.fixture
+def saved(tmp_path):
+    path = str(tmp_path / "accounts.json")
+    table, querier = open_querier(path)
+    for i in range(100):
+        table.insert(Account(id=i, username=f"u{i}", team="ab"[i % 2], balance=i))
+    table.flush()
+    assert querier.save_indices()
+    return path, table, querier
+
+def test_logged_writes_keep_saved_indices(saved, monkeypatch):
+    path, table, querier = saved
+    generation = table.storage_generation()
+    table.update(3, Account(id=3, username="renamed", team="b", balance=10))
+    table.remove(4)
+    table.insert(Account(id=200, username="u200", team="b", balance=99))
+    assert table.storage_generation() == generation
+    table.close()
+
+    built = rebuilt_fields(monkeypatch)
+    table, querier = open_querier(path)
+    assert built == []
+    assert querier.first(username="u3") is None
+    assert querier.first(username="u4") is None
+    check(querier, table)
+
+def test_saved_delta_is_patched_again(saved, monkeypatch):
+    path, table, querier = saved
+    table.update(5, Account(id=5, username="first", team="a", balance=70))
+    assert querier.save_indices()  # Saved with row 5 logged only
+    table.update(5, Account(id=5, username="second", team="b", balance=1))
+    table.close()
+
+    built = rebuilt_fields(monkeypatch)
+    table, querier = open_querier(path)
+    assert built == []
+    assert querier.first(username="first") is None
+    assert querier.first(username="second").balance == 1
+    check(querier, table)
+
+def test_flush_invalidates_saved_indices(saved, monkeypatch):
+    path, table, querier = saved
+    table.update(6, Account(id=6, username="flushed", team="a", balance=6))
+    table.flush()
+    table.close()
+
+    built = rebuilt_fields(monkeypatch)
+    table, querier = open_querier(path)
+    assert "username" in built
+    check(querier, table)
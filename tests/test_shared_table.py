@@ -0,0 +1,119 @@
+import multiprocessing
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable, MmapTable
+from fastjson_db.core.json_querier import JsonQuerier
+from fastjson_db.log.change_feed import ChangeFeed
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                                reason="shared tables need fcntl and fork")
+
+class Row(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    writer = Field(field_name="writer", type=int)
+    n = Field(field_name="n", type=int)
+
+WRITERS = 4
+ROWS = 120
+
+def writer(path, cls, k, barrier, results):
+    """Insert ROWS rows, bump a shared counter, and flush / checkpoint / poll along the way."""
+    table = cls(Row, path, wal=True, sync_every=0, shared=True)
+    table._load_cache()
+    querier = JsonQuerier(table)
+    querier._load_cache()
+    barrier.wait()
+    for i in range(ROWS):
+        table.insert(Row(id=(k + 1) * 1000 + i, writer=k, n=i))
+        with table.lock.write():  # Read-modify-write across processes
+            table.poll()
+            counter = table.get(0)
+            table.update(0, Row(id=0, writer=-1, n=counter.n + 1))
+        if i % 25 == 24:
+            if k % 2:
+                table.flush()
+            else:
+                table.checkpoint()  # Rewrites the base file and truncates the WAL (keeping one generation)
+        if i % 7 == 0:
+            table.poll()
+    barrier.wait()  # Every writer is done
+    table.poll()
+    seen = {w: len(querier.get(writer=w)) for w in range(WRITERS)}
+    results.put((k, len(table.cache), table.get(0).n, seen))
+    table.close()
+
+@pytest.mark.parametrize("cls", [JsonTable, MmapTable])
+def test_writers_see_every_row(tmp_path, cls):
+    path = str(tmp_path / "rows.json")
+    table = cls(Row, path, wal=True, shared=True)
+    table._load_cache()
+    table.insert(Row(id=0, writer=-1, n=0))
+    table.checkpoint()
+    table.close()
+
+    ctx = multiprocessing.get_context("fork")
+    barrier, results = ctx.Barrier(WRITERS), ctx.Queue()
+    processes = [ctx.Process(target=writer, args=(path, cls, k, barrier, results)) for k in range(WRITERS)]
+    for process in processes:
+        process.start()
+    seen = {}
+    for _ in processes:
+        k, rows, counter, per_writer = results.get(timeout=120)
+        seen[k] = (rows, counter, per_writer)
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    total = WRITERS * ROWS
+    for k, (rows, counter, per_writer) in seen.items():
+        assert rows == total + 1, k
+        assert counter == total, k
+        assert per_writer == {w: ROWS for w in range(WRITERS)}, k
+
+    # Fresh process state: base file, segments and what is left of the WAL
+    reloaded = cls(Row, path, wal=True, shared=True)
+    reloaded._load_cache()
+    assert len(reloaded.cache) == total + 1
+    assert reloaded.get(0).n == total
+    reloaded.checkpoint()  # Truncates the WAL down to the last generation
+    reloaded.close()
+    fresh = cls(Row, path)
+    fresh._load_cache()
+    assert len(fresh.cache) == total + 1
+    assert fresh.get(0).n == total
+
+def test_follower_one_truncation_behind(tmp_path):
+    path = str(tmp_path / "rows.json")
+    writer_table = JsonTable(Row, path, wal=True, shared=True)
+    writer_table._load_cache()
+    follower = JsonTable(Row, path, wal=True, shared=True)
+    follower._load_cache()
+    querier = JsonQuerier(follower)
+    querier._load_cache()
+
+    writer_table.insert(Row(id=1, writer=0, n=1))
+    writer_table.insert(Row(id=2, writer=0, n=2))
+    writer_table.checkpoint()  # The WAL keeps these records for followers
+    assert follower.poll() == 2
+    assert querier.first(n=2).id == 2
+
+    writer_table.update(1, Row(id=1, writer=0, n=10))
+    writer_table.flush()
+    writer_table.remove(2)
+    writer_table.checkpoint()  # Two truncations: the follower reloads
+    assert follower.poll() == 1
+    assert querier.first(n=10).id == 1 and querier.first(n=2) is None
+
+    follower.insert(Row(id=3, writer=1, n=3))
+    assert writer_table.poll() == 1
+    assert writer_table.get(3).n == 3
+    writer_table.close()
+    follower.close()
+
+def test_feed_detects_rewrite_of_the_same_size(tmp_path):
+    path = tmp_path / "rows.json.log"
+    path.write_bytes(b'{"seq":4,"op":"checkpoint","id":null}\n{"seq":5,"op":"put","id":5,"data":{}}\n')
+    feed = ChangeFeed(str(path))
+    feed.mark(5)
+    # Two truncations later the log is exactly as long as the offset read last time
+    path.write_bytes(b'{"seq":7,"op":"checkpoint","id":null}\n{"seq":8,"op":"put","id":8,"data":{}}\n')
+    assert feed.read() is None  # Records 6 and 7 are gone: reload
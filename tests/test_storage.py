@@ -0,0 +1,116 @@
+import pytest
+from fastjson_db import Field, JsonModel, JsonTable, MmapTable
+
+class Item(JsonModel):
+    id = Field(field_name="id", type=int, primary_key=True, unique=True)
+    name = Field(field_name="name", type=str)
+
+TABLES = [JsonTable, MmapTable]
+
+def open_table(cls, path, **kwargs):
+    table = cls(Item, path, **kwargs)
+    table._load_cache()
+    return table
+
+# ------------------ Flush ------------------ #
+@pytest.mark.parametrize("cls", TABLES)
+def test_flush_writes_changed_rows_as_segment(tmp_path, cls):
+    path = str(tmp_path / "items.json")
+    table = open_table(cls, path, wal=True, compact_after=0)
+    for i in range(10):
+        table.insert(Item(id=i, name=f"n{i}"))
+    assert table.flush() == 10
+    table.update(3, Item(id=3, name="changed"))
+    table.remove(4)
+    assert table.dirty_count == 2
+    assert table.flush() == 2
+    assert table.flush() == 0
+    assert len(table.segments.segment_numbers()) == 2
+    assert list(table.journal.replay()) == []  # Only the checkpoint marker is left
+    table.close()
+
+    reloaded = open_table(cls, path)
+    assert len(reloaded.cache) == 9
+    assert reloaded.get(3).name == "changed"
+    assert 4 not in reloaded.cache
+
+@pytest.mark.parametrize("cls", TABLES)
+def test_compaction_folds_segments(tmp_path, cls):
+    path = str(tmp_path / "items.json")
+    table = open_table(cls, path, compact_after=0)
+    for i in range(5):
+        table.insert(Item(id=i, name=f"n{i}"))
+        table.flush()
+    table.compact()
+    assert table.segments.segment_numbers() == []
+    assert table.flush_stats.compactions == 1
+    assert len(open_table(cls, path).cache) == 5
+
+# ------------------ Compaction During Load ------------------ #
+@pytest.mark.parametrize("cls", TABLES)
+def test_reload_during_background_compaction(tmp_path, cls):
+    path = str(tmp_path / "items.json")
+    table = open_table(cls, path, wal=True, sync_every=0, compact_after=1, thread_safe=True)
+    for i in range(20_000):
+        table.insert(Item(id=i, name=f"n{i}"))
+    table.checkpoint()
+    expected = 20_000
+    for round_ in range(30):
+        table.insert(Item(id=expected, name="new"))
+        expected += 1
+        table.flush()  # Starts a background compaction of the segment
+        table._load_cache()
+        assert len(table.cache) == expected, round_
+        assert table.storage_generation() is not None
+    table.wait_compaction()
+    table.close()
+    assert len(open_table(cls, path).cache) == expected
+
+# ------------------ Recovery ------------------ #
+@pytest.mark.parametrize("cls", TABLES)
+def test_replay_ignores_torn_segment_and_wal_tail(tmp_path, cls):
+    path = str(tmp_path / "items.json")
+    table = open_table(cls, path, wal=True, compact_after=0)
+    for i in range(3):
+        table.insert(Item(id=i, name=f"n{i}"))
+    table.flush()
+    table.insert(Item(id=3, name="logged"))
+    table.close()
+
+    # Crash while writing the next segment (temp file never renamed) and a WAL record
+    number = max(table.segments.segment_numbers()) + 1
+    with open(f"{path}.seg.{number}.tmp", "wb") as f:
+        f.write(b'[{"op": "put", "id": 9, "da')
+    with open(f"{path}.log", "ab") as f:
+        f.write(b'{"seq": 99, "op": "put", "id": 8, "data": {"id": 8, "na')
+
+    reloaded = open_table(cls, path, wal=True, compact_after=0)
+    assert sorted(reloaded.cache) == [0, 1, 2, 3]
+    # The torn tail is cut off, so new records are not appended after it
+    reloaded.insert(Item(id=4, name="after"))
+    reloaded.close()
+    assert sorted(open_table(cls, path, wal=True).cache) == [0, 1, 2, 3, 4]
+
+# ------------------ Binary File Mappings ------------------ #
+def test_mmap_table_closes_replaced_mappings(tmp_path):
+    path = str(tmp_path / "items.json")
+    table = open_table(MmapTable, path, compact_after=0)
+    for i in range(10):
+        table.insert(Item(id=i, name=f"n{i}"))
+    table.checkpoint()
+    loaded = table._file
+    table._load_cache()
+    assert loaded._map is None and table.get(3).name == "n3"
+
+    table.update(3, Item(id=3, name="changed"))
+    table.flush()
+    mapped = table._file
+    table.compact()  # Readers may still hold the old mapping: closed on the next swap
+    assert mapped._map is not None and table._retired == [mapped]
+    table.checkpoint()
+    assert mapped._map is None and table._retired == []
+    assert table.get(3).name == "changed"
+
+    current = table._file
+    table.close()
+    assert current._map is None